@@ -0,0 +1,171 @@
+import os
+import shutil
+
+from array import array
+from datetime import datetime, timedelta
+
+from libs import lib_pretable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Origem dos horários armazenados como segundos (epoch)
+EPOCH = datetime(1970, 1, 1)
+
+# Número de linhas convertidas em registros por vez durante a leitura
+COLUMNAR_CHUNK_SIZE = 65536
+
+# Colunas de texto armazenadas com codificação por dicionário (códigos + vocabulário)
+DICTIONARY_COLUMNS = tuple(c for c in lib_pretable.PRETABLE_COLUMNS if c != 'serverTime')
+
+
+def _check_numpy():
+    if np is None:
+        raise ImportError('O cache colunar de pré-tabelas requer o pacote numpy')
+
+
+def is_up_to_date(columnar_path: str, pretable_path: str):
+    """
+    Verifica se há cache colunar de uma pré-tabela e se ele é mais recente do que a pré-tabela
+
+    @param columnar_path: diretório do cache colunar
+    @param pretable_path: caminho da pré-tabela
+    @return: True se o cache pode ser usado, False caso contrário
+    """
+    return os.path.isdir(columnar_path) and os.path.getmtime(columnar_path) >= os.path.getmtime(pretable_path)
+
+
+def _save_vocabulary(dir_path, column, vocabulary):
+    """
+    Salva o vocabulário de uma coluna como bytes UTF-8 concatenados e deslocamentos de início de cada valor
+    """
+    encoded = [v.encode('utf-8') for v in vocabulary]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+    np.save(os.path.join(dir_path, column + '.offsets.npy'), offsets)
+    np.save(os.path.join(dir_path, column + '.values.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+
+class ColumnVocabulary:
+    """
+    Vocabulário de uma coluna do cache colunar, mapeado em memória. Os valores são decodificados sob demanda,
+    apenas para os códigos lidos, sem manter o vocabulário inteiro em memória como str
+    """
+    def __init__(self, dir_path, column):
+        self.offsets = np.load(os.path.join(dir_path, column + '.offsets.npy'))
+        self.values = memoryview(np.load(os.path.join(dir_path, column + '.values.npy'), mmap_mode='r'))
+
+    def decode(self, codes):
+        """
+        Decodifica os valores de um conjunto de códigos
+
+        @param codes: array de códigos
+        @return: lista de valores (str), na ordem dos códigos
+        """
+        values = self.values
+        return [str(values[start:end], 'utf-8') for start, end in zip(self.offsets[codes].tolist(), self.offsets[codes + 1].tolist())]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def write_columnar_pretable(records, columnar_path: str):
+    """
+    Converte registros de pré-tabela em cache colunar: um diretório com um arquivo .npy por coluna.
+    O horário é armazenado em segundos desde 1970-01-01 (int64) e as demais colunas são codificadas por dicionário
+    (códigos int32 e vocabulário). O cache é escrito em diretório temporário e movido para o destino ao final
+
+    @param records: iterável de objetos PretableRecord (ver lib_pretable.iter_records)
+    @param columnar_path: diretório do cache colunar
+    @return: número de linhas convertidas
+    """
+    _check_numpy()
+
+    server_times = array('q')
+    codes = {c: array('i') for c in DICTIONARY_COLUMNS}
+    vocabularies = {c: {} for c in DICTIONARY_COLUMNS}
+    epoch_seconds = {}
+
+    columns = [(lib_pretable.PRETABLE_COLUMNS.index(c), codes[c].append, vocabularies[c]) for c in DICTIONARY_COLUMNS]
+    append_server_time = server_times.append
+
+    for r in records:
+        seconds = epoch_seconds.get(r.serverTime)
+        if seconds is None:
+            seconds = int((lib_pretable.parse_server_time(r.serverTime) - EPOCH).total_seconds())
+            epoch_seconds[r.serverTime] = seconds
+        append_server_time(seconds)
+
+        for i, append_code, vocabulary in columns:
+            value = r[i]
+            code = vocabulary.get(value)
+            if code is None:
+                code = len(vocabulary)
+                vocabulary[value] = code
+            append_code(code)
+
+    columnar_tmp_path = columnar_path + '.tmp'
+    if os.path.exists(columnar_tmp_path):
+        shutil.rmtree(columnar_tmp_path)
+    os.makedirs(columnar_tmp_path)
+
+    try:
+        np.save(os.path.join(columnar_tmp_path, 'serverTime.npy'), np.frombuffer(server_times, dtype=np.int64))
+        for c in DICTIONARY_COLUMNS:
+            np.save(os.path.join(columnar_tmp_path, c + '.codes.npy'), np.frombuffer(codes[c], dtype=np.int32))
+            _save_vocabulary(columnar_tmp_path, c, vocabularies[c])
+
+        if os.path.exists(columnar_path):
+            shutil.rmtree(columnar_path)
+        os.replace(columnar_tmp_path, columnar_path)
+
+    finally:
+        if os.path.exists(columnar_tmp_path):
+            shutil.rmtree(columnar_tmp_path)
+
+    return len(server_times)
+
+
+def iter_columnar_records(columnar_path: str, chunk_size=COLUMNAR_CHUNK_SIZE):
+    """
+    Lê um cache colunar, com as colunas mapeadas em memória, e o converte em objetos PretableRecord.
+    O horário é fornecido como datetime, de modo que não há conversão de texto durante a leitura.
+    Em cada bloco, apenas os valores distintos de cada coluna são decodificados (ver ColumnVocabulary)
+
+    @param columnar_path: diretório do cache colunar
+    @param chunk_size: número de linhas convertidas por vez
+    @return: gerador de objetos PretableRecord
+    """
+    _check_numpy()
+
+    server_times = np.load(os.path.join(columnar_path, 'serverTime.npy'), mmap_mode='r')
+    codes = [np.load(os.path.join(columnar_path, c + '.codes.npy'), mmap_mode='r') for c in DICTIONARY_COLUMNS]
+    vocabularies = [ColumnVocabulary(columnar_path, c) for c in DICTIONARY_COLUMNS]
+
+    make_record = lib_pretable.PretableRecord
+
+    for start in range(0, len(server_times), chunk_size):
+        end = start + chunk_size
+
+        # Cada segundo distinto do bloco é convertido em datetime uma única vez
+        unique_seconds, inverse = np.unique(server_times[start:end], return_inverse=True)
+        unique_datetimes = [EPOCH + timedelta(seconds=s) for s in unique_seconds.tolist()]
+        chunk_datetimes = [unique_datetimes[i] for i in inverse.tolist()]
+
+        chunk_columns = [_decode_chunk(c[start:end], v) for c, v in zip(codes, vocabularies)]
+
+        yield from map(make_record, chunk_datetimes, *chunk_columns)
+
+
+def _decode_chunk(chunk_codes, vocabulary: ColumnVocabulary):
+    """
+    Decodifica os códigos de um bloco de uma coluna. Cada código distinto é decodificado uma única vez
+    """
+    unique_codes, inverse = np.unique(chunk_codes, return_inverse=True)
+    unique_values = vocabulary.decode(unique_codes)
+    return [unique_values[i] for i in inverse.tolist()]
@@ -39,6 +39,32 @@ def generate_session_id(ip: str, browser_name: str, browser_version: str, date:
     return '|'.join([ip, user_agent, date_slice])
 
 
+def generate_session_key(ip: str, browser_name: str, browser_version: str, date: datetime):
+    """
+    Gera uma chave de sessão compacta, equivalente ao ID de sessão, sem montagem de str.
+    A hora é representada pelo número de horas desde o dia 1 do calendário (ordinal do dia * 24 + hora)
+
+    :param ip: endereço IP
+    :param browser_name: nome do navegador
+    :param browser_version: versão do navegador
+    :param date: data e hora
+    :return: uma tupla (ip, nome do navegador, versão do navegador, hora ordinal)
+    """
+    return ip, browser_name, browser_version, date.toordinal() * 24 + date.hour
+
+
+def format_session_key(session_key: tuple):
+    """
+    Converte uma chave de sessão (ver generate_session_key) no ID de sessão em formato str (ver generate_session_id)
+
+    :param session_key: uma tupla (ip, nome do navegador, versão do navegador, hora ordinal)
+    :return: uma str que representa um ID de sessão
+    """
+    ip, browser_name, browser_version, hour_ordinal = session_key
+    date = datetime.fromordinal(hour_ordinal // 24).replace(hour=hour_ordinal % 24)
+    return generate_session_id(ip, browser_name, browser_version, date)
+
+
 def is_double_click(group, past_hit, current_hit):
     """
     Verifica se a ação atual (current_action) é um duplo-clique. É condição necessária que ambos os Hits possuam
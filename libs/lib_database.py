@@ -4,7 +4,7 @@ import logging
 from libs import lib_status
 from sqlalchemy import create_engine, and_, or_
 from sqlalchemy.exc import OperationalError, IntegrityError
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -696,6 +696,14 @@ def update_aggr_journal_geolocation_yop(db_session, data):
 
 
 def get_dates_able_to_extract(db_session, collection, number_of_days):
+    """
+    Obtém datas carregadas (status LOADED) cujos dias vizinhos também estão registrados
+
+    @param db_session: sessão de conexão com banco de dados
+    @param collection: acrônimo de coleção
+    @param number_of_days: número máximo de datas (0 desabilita o limite)
+    @return: lista de datas, da mais recente para a mais antiga
+    """
     dates = []
 
     try:
@@ -722,7 +730,7 @@ def get_dates_able_to_extract(db_session, collection, number_of_days):
                 dates.append(date)
                 days_counter += 1
 
-                if days_counter >= number_of_days:
+                if number_of_days and days_counter >= number_of_days:
                     break
 
     except NoResultFound:
@@ -734,3 +742,52 @@ def get_dates_able_to_extract(db_session, collection, number_of_days):
         dates = []
 
     return sorted(dates, reverse=True)
+
+
+MATOMO_PRETABLE_QUERY = '''
+    SELECT
+        matomo_log_link_visit_action.server_time AS serverTime,
+        matomo_log_visit.config_browser_name AS browserName,
+        matomo_log_visit.config_browser_version AS browserVersion,
+        matomo_log_visit.location_ip AS ip,
+        matomo_log_visit.location_latitude AS latitude,
+        matomo_log_visit.location_longitude AS longitude,
+        matomo_log_action.name AS actionName
+    FROM
+        matomo_log_link_visit_action
+    LEFT JOIN
+        matomo_log_visit ON matomo_log_visit.idvisit = matomo_log_link_visit_action.idvisit
+    LEFT JOIN
+        matomo_log_action ON matomo_log_action.idaction = matomo_log_link_visit_action.idaction_url
+    WHERE
+        matomo_log_link_visit_action.idsite = :id_site AND
+        matomo_log_link_visit_action.server_time >= :date_start AND
+        matomo_log_link_visit_action.server_time < :date_end
+    ORDER BY
+        matomo_log_visit.location_ip
+'''
+
+
+def get_matomo_pretable_rows(db_engine, id_site, date_start, date_end, batch_size):
+    """
+    Obtém, em lotes, as ações registradas pelo Matomo em um período, ordenadas por IP.
+    Usa cursor no servidor (SSCursor, em MySQL), de modo que o resultado não é carregado inteiro em memória.
+    O IP é obtido em formato binário (location_ip) e convertido fora da base de dados (ver lib_pretable.record_from_matomo_row)
+
+    @param db_engine: engine de conexão com a base de dados Matomo
+    @param id_site: identificador do site (coleção) no Matomo
+    @param date_start: data inicial (inclusive), no formato YYYY-MM-DD
+    @param date_end: data final (exclusive), no formato YYYY-MM-DD
+    @param batch_size: número de linhas por lote
+    @return: gerador de listas de linhas (serverTime, browserName, browserVersion, ip, latitude, longitude, actionName)
+    """
+    with db_engine.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(text(MATOMO_PRETABLE_QUERY),
+                                                                           {'id_site': id_site,
+                                                                            'date_start': date_start,
+                                                                            'date_end': date_end})
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
@@ -0,0 +1,419 @@
+import os
+import pickle
+import sqlite3
+
+from array import array
+from urllib.parse import quote
+
+
+# Extensão dos dicionários em formato de base de chaves (SQLite), em alternativa aos arquivos pickle (.data)
+STORE_EXTENSION = '.db'
+
+# Nome das tabelas compactas de pid-format-lang e pid-dates por coleção (por exemplo, pid-lookup-scl-YYYY-MM-DD.data)
+PID_LOOKUP_NAME = 'pid-lookup'
+
+# Dicionários representados pelas tabelas compactas
+PID_LOOKUP_DICTIONARIES = ('pid-format-lang', 'pid-dates')
+
+# Coleções cujas entradas de pid-format-lang são obtidas por inteiro (ver lib_hit.get_language_ssp) e que, por isso,
+# não são representadas em tabela compacta
+PID_LOOKUP_EXCLUDED_COLLECTIONS = ('spa', )
+
+# Número de linhas inseridas por vez na criação de uma base de chaves
+STORE_INSERT_BATCH_SIZE = 10000
+
+# Marcadores de chave ainda não consultada e de chave ausente na base (ver CollectionView.get)
+_NOT_CACHED = object()
+_MISSING = object()
+
+
+def write_dictionary_store(data: dict, store_path: str):
+    """
+    Salva um dicionário no formato coleção -> chave -> valor em uma base de chaves SQLite, uma linha por par
+    (coleção, chave), com o valor serializado via pickle. A base é escrita em arquivo temporário e movida para o
+    destino ao final
+
+    @param data: dicionário coleção -> chave -> valor
+    @param store_path: caminho da base de chaves
+    """
+    store_tmp_path = store_path + '.tmp'
+    if os.path.exists(store_tmp_path):
+        os.remove(store_tmp_path)
+
+    try:
+        conn = sqlite3.connect(store_tmp_path)
+
+        # Base temporária dispensa journal e sincronização: em caso de falha, é descartada
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+
+        conn.execute('CREATE TABLE entries (collection TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (collection, key)) WITHOUT ROWID')
+
+        # Coleções são registradas à parte, para que coleções sem chaves também constem em DictionaryStore.keys
+        conn.execute('CREATE TABLE collections (collection TEXT PRIMARY KEY) WITHOUT ROWID')
+        conn.executemany('INSERT INTO collections VALUES (?)', [(c, ) for c in data])
+
+        rows = []
+        for collection, values in sorted(data.items()):
+            # Inserção na ordem da chave primária evita a reorganização do índice
+            for key in sorted(values):
+                rows.append((collection, key, pickle.dumps(values[key], pickle.HIGHEST_PROTOCOL)))
+
+                if len(rows) >= STORE_INSERT_BATCH_SIZE:
+                    conn.executemany('INSERT INTO entries VALUES (?, ?, ?)', rows)
+                    rows = []
+
+        conn.executemany('INSERT INTO entries VALUES (?, ?, ?)', rows)
+        conn.commit()
+        conn.close()
+
+        os.replace(store_tmp_path, store_path)
+
+    finally:
+        if os.path.exists(store_tmp_path):
+            os.remove(store_tmp_path)
+
+
+class CollectionView:
+    """
+    Acesso somente leitura, semelhante a um dicionário, às chaves de uma coleção de uma base de chaves.
+    Os valores são lidos sob demanda e mantidos em cache, de modo que a memória ocupada é proporcional ao número de
+    chaves consultadas
+    """
+    def __init__(self, store, collection):
+        self.store = store
+        self.collection = collection
+        self.cache = {}
+
+    def get(self, key, default=None):
+        value = self.cache.get(key, _NOT_CACHED)
+
+        if value is _NOT_CACHED:
+            row = self.store.execute('SELECT value FROM entries WHERE collection = ? AND key = ?', (self.collection, key)).fetchone()
+            value = pickle.loads(row[0]) if row else _MISSING
+            self.cache[key] = value
+
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def items(self):
+        for key, value in self.store.execute('SELECT key, value FROM entries WHERE collection = ? ORDER BY key', (self.collection, )):
+            yield key, pickle.loads(value)
+
+    def keys(self):
+        for row in self.store.execute('SELECT key FROM entries WHERE collection = ? ORDER BY key', (self.collection, )):
+            yield row[0]
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self):
+        return self.store.execute('SELECT COUNT(*) FROM entries WHERE collection = ?', (self.collection, )).fetchone()[0]
+
+
+class DictionaryStore:
+    """
+    Acesso somente leitura, semelhante a um dicionário coleção -> chave -> valor, a uma base de chaves criada por
+    write_dictionary_store. A conexão é reaberta em processos criados via fork, que não podem compartilhá-la
+    """
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self.conn = None
+        self.conn_pid = None
+        self.views = {}
+        self.collections = [r[0] for r in self.execute('SELECT collection FROM collections ORDER BY collection')]
+
+    def execute(self, sql, parameters=()):
+        if self.conn is None or self.conn_pid != os.getpid():
+            self.conn = sqlite3.connect('file:%s?mode=ro' % quote(self.store_path), uri=True, check_same_thread=False)
+            self.conn_pid = os.getpid()
+        return self.conn.execute(sql, parameters)
+
+    def get(self, collection, default=None):
+        if collection not in self.collections:
+            return default
+
+        if collection not in self.views:
+            self.views[collection] = CollectionView(self, collection)
+
+        return self.views[collection]
+
+    def __getitem__(self, collection):
+        view = self.get(collection)
+        if view is None:
+            raise KeyError(collection)
+        return view
+
+    def __contains__(self, collection):
+        return collection in self.collections
+
+    def keys(self):
+        return list(self.collections)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.collections)
+
+    def items(self):
+        for collection in self.collections:
+            yield collection, self[collection]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['conn'] = None
+        state['conn_pid'] = None
+        return state
+
+
+class PidLookupTable:
+    """
+    Representação compacta dos dicionários pid-format-lang e pid-dates de uma coleção, para consulta durante o cálculo:
+    PIDs internados (PID -> id), idiomas codificados como inteiros pequenos, idiomas de cada formato como máscaras de
+    bits e ano de publicação como uint16. As demais datas de pid-dates não são mantidas (permanecem apenas nos arquivos
+    de dicionário)
+    """
+    # Códigos reservados de idioma padrão: PID ausente de pid-format-lang e PID sem idioma padrão
+    NO_PID = 0
+    NO_DEFAULT = 1
+
+    def __init__(self):
+        self.pid_ids = {}
+        self.languages = []
+        self.language_codes = {}
+        self.default_codes = array('H')
+        self.format_masks = {}
+        self.years = array('H')
+
+        # Anos que não podem ser representados como uint16 sem alterar seu valor (por exemplo, '0000' ou None)
+        self.other_years = {}
+
+    def _get_or_add_id(self, pid):
+        pid_id = self.pid_ids.get(pid)
+        if pid_id is None:
+            pid_id = len(self.pid_ids)
+            self.pid_ids[pid] = pid_id
+            self.default_codes.append(self.NO_PID)
+            self.years.append(0)
+            for masks in self.format_masks.values():
+                masks.append(0)
+        return pid_id
+
+    def _get_or_add_language(self, language):
+        code = self.language_codes.get(language)
+        if code is None:
+            code = len(self.languages)
+            self.languages.append(language)
+            self.language_codes[language] = code
+        return code
+
+    def _add_format_lang(self, pid, format_lang: dict):
+        pid_id = self._get_or_add_id(pid)
+
+        if 'default' in format_lang:
+            self.default_codes[pid_id] = self._get_or_add_language(format_lang['default']) + 2
+        else:
+            self.default_codes[pid_id] = self.NO_DEFAULT
+
+        for fmt, languages in format_lang.items():
+            if fmt == 'default':
+                continue
+
+            if fmt not in self.format_masks:
+                self.format_masks[fmt] = [0] * len(self.pid_ids)
+
+            mask = 0
+            for language in languages:
+                mask |= 1 << self._get_or_add_language(language)
+            self.format_masks[fmt][pid_id] = mask
+
+    def _add_dates(self, pid, dates: dict):
+        pid_id = self._get_or_add_id(pid)
+        year = dates.get('publication_year', '')
+
+        if isinstance(year, str) and year.isdigit() and str(int(year)) == year and 0 < int(year) < 65536:
+            self.years[pid_id] = int(year)
+        elif year != '':
+            self.other_years[pid_id] = year
+
+    def _pack_format_masks(self):
+        # Com até 64 idiomas, as máscaras cabem em uint64
+        if len(self.languages) <= 64:
+            self.format_masks = {fmt: array('Q', masks) for fmt, masks in self.format_masks.items()}
+
+    @staticmethod
+    def is_compactable(pid_format_lang: dict, pid_dates: dict):
+        """
+        Verifica se os dicionários de uma coleção têm a estrutura esperada (PID -> dicionário), com idiomas de cada
+        formato em coleções de valores (e não em texto, cujo teste de pertinência é por substring)
+        """
+        for format_lang in pid_format_lang.values():
+            if not isinstance(format_lang, dict):
+                return False
+
+            for fmt, languages in format_lang.items():
+                if fmt != 'default' and not isinstance(languages, (set, frozenset, list, tuple)):
+                    return False
+
+                if fmt == 'default' and not isinstance(languages, str):
+                    return False
+
+        return all(isinstance(dates, dict) for dates in pid_dates.values())
+
+    @classmethod
+    def from_dictionaries(cls, pid_format_lang: dict, pid_dates: dict):
+        """
+        Cria tabela a partir dos dicionários pid-format-lang e pid-dates de uma coleção (ver is_compactable)
+
+        @param pid_format_lang: dicionário PID -> {'default': idioma, formato: idiomas}
+        @param pid_dates: dicionário PID -> {'publication_year': ano, ...}
+        @return: um objeto PidLookupTable
+        """
+        table = cls()
+
+        for pid, format_lang in pid_format_lang.items():
+            table._add_format_lang(pid, format_lang)
+
+        for pid, dates in pid_dates.items():
+            table._add_dates(pid, dates)
+
+        table._pack_format_masks()
+
+        return table
+
+    def get_id(self, pid):
+        return self.pid_ids.get(pid)
+
+    def get(self, pid, default=None):
+        """
+        Obtém os dados de um PID com a mesma interface dos dicionários pid-format-lang e pid-dates
+        (ver PidLookupEntry), de modo que a tabela possa ser consultada como esses dicionários
+
+        @param pid: PID de um artigo
+        @param default: valor retornado se o PID não constar da tabela
+        @return: um objeto PidLookupEntry ou default
+        """
+        pid_id = self.pid_ids.get(pid)
+        if pid_id is None:
+            return default
+        return PidLookupEntry(self, pid_id)
+
+    def __contains__(self, pid):
+        """
+        Indica se o PID consta de pid-format-lang
+        """
+        pid_id = self.pid_ids.get(pid)
+        return pid_id is not None and self.default_codes[pid_id] != self.NO_PID
+
+    def get_default_language(self, pid_id, default):
+        """
+        Obtém o idioma padrão do PID, ou default se o PID não estiver em pid-format-lang ou não tiver idioma padrão
+        """
+        if pid_id is None:
+            return default
+
+        code = self.default_codes[pid_id]
+        if code < 2:
+            return default
+        return self.languages[code - 2]
+
+    def get_year(self, pid_id):
+        """
+        Obtém o ano de publicação do PID, ou string vazia se não houver
+        """
+        if pid_id is None:
+            return ''
+
+        year = self.years[pid_id]
+        if year:
+            return str(year)
+        return self.other_years.get(pid_id, '')
+
+
+class PidLookupEntry:
+    """
+    Dados de um PID em PidLookupTable, consultados como as entradas dos dicionários pid-format-lang e pid-dates:
+    get('default') obtém o idioma padrão, get('publication_year') o ano de publicação e get(formato) os idiomas do
+    formato (ver FormatLanguages). As demais datas de pid-dates não são mantidas na tabela
+    """
+    __slots__ = ('table', 'pid_id')
+
+    def __init__(self, table: PidLookupTable, pid_id):
+        self.table = table
+        self.pid_id = pid_id
+
+    def get(self, key, default=None):
+        if key == 'default':
+            return self.table.get_default_language(self.pid_id, default)
+
+        if key == 'publication_year':
+            year = self.table.get_year(self.pid_id)
+            return default if year == '' else year
+
+        masks = self.table.format_masks.get(key)
+        if masks is None or not masks[self.pid_id]:
+            return default
+        return FormatLanguages(self.table, masks[self.pid_id])
+
+
+class FormatLanguages:
+    """
+    Idiomas de um formato de um PID em PidLookupTable (máscara de bits), com teste de pertinência como o de um set
+    """
+    __slots__ = ('table', 'mask')
+
+    def __init__(self, table: PidLookupTable, mask):
+        self.table = table
+        self.mask = mask
+
+    def __contains__(self, language):
+        code = self.table.language_codes.get(language)
+        return code is not None and (self.mask >> code) & 1 == 1
+
+
+def compact_pid_dictionaries(pid_format_lang: dict, pid_dates: dict):
+    """
+    Substitui, nos dicionários pid-format-lang e pid-dates carregados em memória, os dados de cada coleção por uma
+    mesma tabela PidLookupTable. Coleções lidas de base de chaves (consultadas sob demanda), com estrutura inesperada
+    ou em PID_LOOKUP_EXCLUDED_COLLECTIONS são mantidas
+
+    @param pid_format_lang: dicionário coleção -> PID -> {'default': idioma, formato: idiomas}
+    @param pid_dates: dicionário coleção -> PID -> datas
+    @return: tupla (pid-format-lang, pid-dates) com as tabelas compactas
+    """
+    if not isinstance(pid_format_lang, dict) or not isinstance(pid_dates, dict):
+        return pid_format_lang, pid_dates
+
+    compact_format_lang = dict(pid_format_lang)
+    compact_dates = dict(pid_dates)
+
+    for collection in set(pid_format_lang) | set(pid_dates):
+        if collection in PID_LOOKUP_EXCLUDED_COLLECTIONS:
+            continue
+
+        collection_format_lang = pid_format_lang.get(collection, {})
+        collection_dates = pid_dates.get(collection, {})
+
+        if not isinstance(collection_format_lang, dict) or not isinstance(collection_dates, dict):
+            continue
+
+        if not PidLookupTable.is_compactable(collection_format_lang, collection_dates):
+            continue
+
+        table = PidLookupTable.from_dictionaries(collection_format_lang, collection_dates)
+
+        if collection in pid_format_lang:
+            compact_format_lang[collection] = table
+        if collection in pid_dates:
+            compact_dates[collection] = table
+
+    return compact_format_lang, compact_dates
@@ -7,6 +7,141 @@ from utils import map_actions as ma
 from utils import regular_expressions as rege
 
 
+def _compile_for_search(pattern: str):
+    """
+    Compila uma expressão regular usada apenas para verificar se há correspondência (re.search).
+    O prefixo .* é descartado, pois não altera o resultado da busca e a torna quadrática no tamanho da URL
+
+    @param pattern: expressão regular
+    @return: expressão regular compilada
+    """
+    if pattern.startswith('.*'):
+        pattern = pattern[2:]
+    return re.compile(pattern)
+
+
+# Expressões regulares compiladas uma única vez (usadas em buscas booleanas)
+SEARCH_ARTICLE_PDF_PATH = _compile_for_search(rege.REGEX_ARTICLE_PDF_PATH)
+SEARCH_ARTICLE_PDF_FULL_PATH = _compile_for_search(rege.REGEX_ARTICLE_PDF_FULL_PATH)
+SEARCH_PDF = _compile_for_search(rege.REGEX_PDF)
+
+SEARCH_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT)
+SEARCH_NEW_SCL_JOURNAL_ARTICLE = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE)
+SEARCH_NEW_SCL_JOURNAL_FEED = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL_FEED)
+SEARCH_NEW_SCL_JOURNAL_GRID = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL_GRID)
+SEARCH_NEW_SCL_JOURNAL_TOC = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL_TOC)
+SEARCH_NEW_SCL_JOURNAL = _compile_for_search(rege.REGEX_NEW_SCL_JOURNAL)
+SEARCH_NEW_SCL_JOURNALS_ALFAPHETIC = _compile_for_search(rege.REGEX_NEW_SCL_JOURNALS_ALFAPHETIC)
+SEARCH_NEW_SCL_JOURNALS_THEMATIC = _compile_for_search(rege.REGEX_NEW_SCL_JOURNALS_THEMATIC)
+SEARCH_NEW_SCL_RAW = _compile_for_search(rege.REGEX_NEW_SCL_RAW)
+
+# Une todas as expressões de URL nova em uma única alternância
+SEARCH_NEW_SCL_ANY = re.compile('|'.join(p.pattern for p in [SEARCH_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT,
+                                                             SEARCH_NEW_SCL_JOURNAL_ARTICLE,
+                                                             SEARCH_NEW_SCL_JOURNAL_FEED,
+                                                             SEARCH_NEW_SCL_JOURNAL_GRID,
+                                                             SEARCH_NEW_SCL_JOURNAL_TOC,
+                                                             SEARCH_NEW_SCL_JOURNAL,
+                                                             SEARCH_NEW_SCL_JOURNALS_ALFAPHETIC,
+                                                             SEARCH_NEW_SCL_JOURNALS_THEMATIC,
+                                                             SEARCH_NEW_SCL_RAW]))
+
+SEARCH_SSP_JOURNAL_ARTICLE_HTML = _compile_for_search(rege.REGEX_SSP_JOURNAL_ARTICLE_HTML)
+SEARCH_SSP_JOURNAL_ARTICLE_PDF = _compile_for_search(rege.REGEX_SSP_JOURNAL_ARTICLE_PDF)
+SEARCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS = _compile_for_search(rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS)
+SEARCH_SSP_JOURNAL = _compile_for_search(rege.REGEX_SSP_JOURNAL)
+SEARCH_SSP_JOURNAL_FEED = _compile_for_search(rege.REGEX_SSP_JOURNAL_FEED)
+SEARCH_SSP_JOURNAL_GRID = _compile_for_search(rege.REGEX_SSP_JOURNAL_GRID)
+SEARCH_SSP_JOURNAL_ABOUT = _compile_for_search(rege.REGEX_SSP_JOURNAL_ABOUT)
+SEARCH_SSP_JOURNAL_ISSUE = _compile_for_search(rege.REGEX_SSP_JOURNAL_ISSUE)
+SEARCH_SSP_JOURNAL_FEED_ISSUE = _compile_for_search(rege.REGEX_SSP_JOURNAL_FEED_ISSUE)
+SEARCH_SSP_JOURNALS_ALPHABETIC = _compile_for_search(rege.REGEX_SSP_JOURNALS_ALPHABETIC)
+SEARCH_SSP_JOURNALS_THEMATIC = _compile_for_search(rege.REGEX_SSP_JOURNALS_THEMATIC)
+SEARCH_SSP_PLATFORM = _compile_for_search(rege.REGEX_SSP_PLATFORM)
+SEARCH_SSP_PLATFORM_ABOUT = _compile_for_search(rege.REGEX_SSP_PLATFORM_ABOUT)
+
+# Expressões regulares compiladas uma única vez (usadas para extrair grupos)
+MATCH_ARTICLE_PID = re.compile(rege.REGEX_ARTICLE_PID)
+MATCH_ISSUE_PID = re.compile(rege.REGEX_ISSUE_PID)
+MATCH_JOURNAL_PID = re.compile(rege.REGEX_JOURNAL_PID)
+MATCH_ARTICLE_PID_YOP = re.compile(rege.REGEX_ARTICLE_PID_YOP)
+MATCH_ARTICLE_PDF_PATH = re.compile(rege.REGEX_ARTICLE_PDF_PATH)
+MATCH_ARTICLE_PDF_FULL_PATH = re.compile(rege.REGEX_ARTICLE_PDF_FULL_PATH)
+MATCH_ARTICLE_PDF_ACRONYM = re.compile(rege.REGEX_ARTICLE_PDF_ACRONYM)
+MATCH_JOURNAL_ACRONYM = [re.compile(p) for p in [rege.REGEX_JOURNAL_IMG_REVISTAS,
+                                                 rege.REGEX_JOURNAL_FBPE,
+                                                 rege.REGEX_JOURNAL_EDITORIAL_BOARD,
+                                                 rege.REGEX_JOURNAL_ABOUT,
+                                                 rege.REGEX_JOURNAL_INSTRUCTIONS,
+                                                 rege.REGEX_JOURNAL_SUBSCRIPTION,
+                                                 rege.REGEX_JOURNAL_REVISTAS]]
+MATCH_JOURNAL_SCRIPT_SCI_SERIAL = re.compile(rege.REGEX_JOURNAL_SCRIPT_SCI_SERIAL)
+MATCH_JOURNAL_SCRIPT_SCI_ISSUES = re.compile(rege.REGEX_JOURNAL_SCRIPT_SCI_ISSUES)
+MATCH_NEW_SCL_JOURNAL_ARTICLE = re.compile(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE)
+MATCH_NEW_SCL_RAW_DETAIL = re.compile(rege.REGEX_NEW_SCL_RAW_DETAIL)
+MATCH_SSP_JOURNAL_ARTICLE_HTML_DETAILS = re.compile(rege.REGEX_SSP_JOURNAL_ARTICLE_HTML_DETAILS)
+MATCH_SSP_JOURNAL_ARTICLE_PDF_DETAILS = re.compile(rege.REGEX_SSP_JOURNAL_ARTICLE_PDF_DETAILS)
+MATCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS = re.compile(rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS)
+MATCH_SSP_JOURNAL_ARTICLE_YEAR = re.compile(rege.REGEX_SSP_JOURNAL_ARTICLE_YEAR)
+MATCH_PREPRINT_ABSTRACT = [re.compile(p) for p in [rege.REGEX_PREPRINT_VIEW_ABSTRACT,
+                                                   rege.REGEX_PREPRINT_DOCUMENT_ABSTRACT,
+                                                   rege.REGEX_PREPRINT_VERSION_ABSTRACT]]
+MATCH_PREPRINT_PDF = [re.compile(p) for p in [rege.REGEX_PREPRINT_VIEW_PDF,
+                                              rege.REGEX_PREPRINT_DOWNLOAD_PDF,
+                                              rege.REGEX_PREPRINT_DOCUMENT_DOWNLOAD_PDF,
+                                              rege.REGEX_PREPRINT_VERSION_DOWNLOAD_PDF]]
+
+# Ordem de avaliação do tipo de Hit para URLs novas
+NEW_SCL_HIT_TYPE_PATTERNS = [(SEARCH_NEW_SCL_JOURNAL_ARTICLE, ma.HIT_TYPE_ARTICLE),
+                             (SEARCH_NEW_SCL_RAW, ma.HIT_TYPE_ARTICLE),
+                             (SEARCH_NEW_SCL_JOURNAL_FEED, ma.HIT_TYPE_JOURNAL),
+                             (SEARCH_NEW_SCL_JOURNAL_GRID, ma.HIT_TYPE_JOURNAL),
+                             (SEARCH_NEW_SCL_JOURNAL_TOC, ma.HIT_TYPE_JOURNAL),
+                             (SEARCH_NEW_SCL_JOURNAL, ma.HIT_TYPE_JOURNAL),
+                             (SEARCH_NEW_SCL_JOURNALS_ALFAPHETIC, ma.HIT_TYPE_PLATFORM),
+                             (SEARCH_NEW_SCL_JOURNALS_THEMATIC, ma.HIT_TYPE_PLATFORM)]
+
+# Ordem de avaliação do tipo de conteúdo (não artigo) para URLs novas
+NEW_SCL_CONTENT_TYPE_PATTERNS = [(SEARCH_NEW_SCL_JOURNAL_FEED, ma.HIT_CONTENT_NEW_SCL_JOURNAL_FEED, ma.HIT_TYPE_JOURNAL),
+                                 (SEARCH_NEW_SCL_JOURNAL_GRID, ma.HIT_CONTENT_NEW_SCL_JOURNAL_GRID, ma.HIT_TYPE_JOURNAL),
+                                 (SEARCH_NEW_SCL_JOURNAL_TOC, ma.HIT_CONTENT_NEW_SCL_JOURNAL_TOC, ma.HIT_TYPE_JOURNAL),
+                                 (SEARCH_NEW_SCL_JOURNAL, ma.HIT_CONTENT_NEW_SCL_JOURNAL, ma.HIT_TYPE_JOURNAL),
+                                 (SEARCH_NEW_SCL_JOURNALS_ALFAPHETIC, ma.HIT_CONTENT_NEW_SCL_JOURNALS_ALPHABETIC, ma.HIT_TYPE_PLATFORM),
+                                 (SEARCH_NEW_SCL_JOURNALS_THEMATIC, ma.HIT_CONTENT_NEW_SCL_JOURNALS_THEMATIC, ma.HIT_TYPE_PLATFORM)]
+
+# Mapeia fragmento de URL nova de artigo ao respectivo tipo de conteúdo
+NEW_SCL_FRAGMENT_TO_CONTENT_TYPE = {'modaltutors': ma.HIT_CONTENT_NEW_SCL_ARTICLE_AUTHORS,
+                                    'modaltablesfigures': ma.HIT_CONTENT_NEW_SCL_ARTICLE_TABLES_AND_FIGURES,
+                                    'modaldownloads': ma.HIT_CONTENT_NEW_SCL_ARTICLE_REQUEST_PDF,
+                                    'modalarticles': ma.HIT_CONTENT_NEW_SCL_ARTICLE_HOW_TO_CITE,
+                                    'modalversionstranslations': ma.HIT_CONTENT_NEW_SCL_ARTICLE_TRANSLATE}
+
+# Ordem de avaliação do tipo de Hit para URLs Public Health
+SSP_HIT_TYPE_PATTERNS = [(SEARCH_SSP_JOURNAL_ARTICLE_HTML, ma.HIT_TYPE_ARTICLE),
+                         (SEARCH_SSP_JOURNAL_ARTICLE_PDF, ma.HIT_TYPE_ARTICLE),
+                         (SEARCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS, ma.HIT_TYPE_ARTICLE),
+                         (SEARCH_SSP_JOURNAL_ABOUT, ma.HIT_TYPE_JOURNAL),
+                         (SEARCH_SSP_JOURNAL_GRID, ma.HIT_TYPE_JOURNAL),
+                         (SEARCH_SSP_JOURNAL_FEED, ma.HIT_TYPE_JOURNAL),
+                         (SEARCH_SSP_JOURNAL_ISSUE, ma.HIT_TYPE_ISSUE),
+                         (SEARCH_SSP_JOURNAL_FEED_ISSUE, ma.HIT_TYPE_ISSUE),
+                         (SEARCH_SSP_PLATFORM_ABOUT, ma.HIT_TYPE_PLATFORM),
+                         (SEARCH_SSP_JOURNALS_THEMATIC, ma.HIT_TYPE_PLATFORM),
+                         (SEARCH_SSP_JOURNALS_ALPHABETIC, ma.HIT_TYPE_PLATFORM),
+                         (SEARCH_SSP_PLATFORM, ma.HIT_TYPE_PLATFORM)]
+
+# Ordem de avaliação do tipo de conteúdo (não artigo) para URLs Public Health
+SSP_CONTENT_TYPE_PATTERNS = [(SEARCH_SSP_JOURNAL_ISSUE, ma.HIT_CONTENT_SSP_ISSUE),
+                             (SEARCH_SSP_JOURNAL_FEED_ISSUE, ma.HIT_CONTENT_SSP_ISSUE_RSS),
+                             (SEARCH_SSP_JOURNAL_FEED, ma.HIT_CONTENT_SSP_JOURNAL_RSS),
+                             (SEARCH_SSP_JOURNAL_GRID, ma.HIT_CONTENT_SSP_JOURNAL_ISSUES),
+                             (SEARCH_SSP_JOURNAL_ABOUT, ma.HIT_CONTENT_SSP_JOURNAL_ABOUT),
+                             (SEARCH_SSP_JOURNAL, ma.HIT_CONTENT_SSP_JOURNAL_MAIN_PAGE),
+                             (SEARCH_SSP_JOURNALS_ALPHABETIC, ma.HIT_CONTENT_SSP_PLATFORM_LIST_JOURNALS_ALPHABETIC),
+                             (SEARCH_SSP_JOURNALS_THEMATIC, ma.HIT_CONTENT_SSP_PLATFORM_LIST_JOURNALS_THEMATIC),
+                             (SEARCH_SSP_PLATFORM_ABOUT, ma.HIT_CONTENT_SSP_PLATFORM_ABOUT)]
+
+
 def article_pid_to_issue_code(pid: str):
     """
     Obtém o código de fascículo de um artigo, a partir de PID
@@ -18,6 +153,15 @@ def article_pid_to_issue_code(pid: str):
             return pid[1:18]
 
 
+def pid_contains_issn(pid: str):
+    """
+    Verifica se o PID segue o padrão S + ISSN + código, do qual o ISSN do periódico é obtido diretamente
+
+    @param pid: o PID de um artigo
+    """
+    return pid.startswith('S') and len(pid) == 23 and '-' in pid
+
+
 def article_pid_to_journal_issn(pid: str, pid_to_issn=None):
     """
     Obtém o ISSN do periódico em que o artigo foi publicado, a partir de seu PID
@@ -25,9 +169,8 @@ def article_pid_to_journal_issn(pid: str, pid_to_issn=None):
     @param pid_to_issn: dicionário que mapeia PID a ISSN
     @param pid: o PID de um artigo
     """
-    if pid.startswith('S'):
-        if len(pid) == 23 and '-' in pid:
-            return pid[1:10]
+    if pid_contains_issn(pid):
+        return pid[1:10]
 
     return sorted(pid_to_issn.get(pid, {''}))[0]
 
@@ -107,7 +250,7 @@ def get_url_params_from_action_new_url(action: str):
 def get_attrs_from_ssm_path(ssm_path: str):
     data = {}
 
-    match = re.search(rege.REGEX_NEW_SCL_RAW_DETAIL, ssm_path)
+    match = MATCH_NEW_SCL_RAW_DETAIL.search(ssm_path)
     if match and len(match.groups()) == 3:
         data['issn'] = match.group(1).upper()
         data['pid'] = match.group(2)
@@ -119,22 +262,9 @@ def get_attrs_from_ssm_path(ssm_path: str):
 
 
 def get_hit_type_new_url(action: str):
-    for pattern in [rege.REGEX_NEW_SCL_JOURNAL_ARTICLE,
-                    rege.REGEX_NEW_SCL_RAW]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_ARTICLE
-
-    for pattern in [rege.REGEX_NEW_SCL_JOURNAL_FEED,
-                    rege.REGEX_NEW_SCL_JOURNAL_GRID,
-                    rege.REGEX_NEW_SCL_JOURNAL_TOC,
-                    rege.REGEX_NEW_SCL_JOURNAL]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_JOURNAL
-
-    for pattern in [rege.REGEX_NEW_SCL_JOURNALS_ALFAPHETIC,
-                    rege.REGEX_NEW_SCL_JOURNALS_THEMATIC]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_PLATFORM
+    for pattern, hit_type in NEW_SCL_HIT_TYPE_PATTERNS:
+        if pattern.search(action):
+            return hit_type
 
     return ma.HIT_TYPE_OTHERS
 
@@ -146,14 +276,18 @@ def get_hit_type(hit):
     @param hit: um objeto Hit
     @return: o tipo de Hit
     """
+    return _get_hit_type(hit.pid, hit.issn, hit.content_type)
+
+
+def _get_hit_type(pid: str, issn: str, content_type: int):
     hit_type = None
 
     # Tenta obter o tipo de Hit a partir do PID
-    if hit.pid:
-        hit_type = _get_hit_type_from_pid_or_issn(hit.pid, hit.issn)
+    if pid:
+        hit_type = _get_hit_type_from_pid_or_issn(pid, issn)
 
     if not hit_type or hit_type == ma.HIT_TYPE_OTHERS:
-        hit_type = _get_hit_type_from_content_type(hit.content_type)
+        hit_type = _get_hit_type_from_content_type(content_type)
 
     return hit_type
 
@@ -165,13 +299,13 @@ def _get_hit_type_from_pid_or_issn(pid: str, issn: str):
     @param pid: atributo pid de um Hit
     @return: o tipo de Hit, se PID foi identificado, -1 caso contrário
     """
-    if re.match(rege.REGEX_ARTICLE_PID, pid):
+    if MATCH_ARTICLE_PID.match(pid):
         return ma.HIT_TYPE_ARTICLE
-    elif re.match(rege.REGEX_ISSUE_PID, pid):
+    elif MATCH_ISSUE_PID.match(pid):
         return ma.HIT_TYPE_ISSUE
-    elif re.match(rege.REGEX_JOURNAL_PID, pid):
+    elif MATCH_JOURNAL_PID.match(pid):
         return ma.HIT_TYPE_JOURNAL
-    elif re.match(rege.REGEX_JOURNAL_PID, issn):
+    elif MATCH_JOURNAL_PID.match(issn):
         return ma.HIT_TYPE_JOURNAL
 
     return ma.HIT_TYPE_OTHERS
@@ -223,25 +357,19 @@ def _get_journal_acronym_from_action(action: str):
     @param action: Hit.action
     @return: acrônimo de um periódico, caso identificado
     """
-    for pattern in {rege.REGEX_JOURNAL_IMG_REVISTAS,
-                    rege.REGEX_JOURNAL_FBPE,
-                    rege.REGEX_JOURNAL_EDITORIAL_BOARD,
-                    rege.REGEX_JOURNAL_ABOUT,
-                    rege.REGEX_JOURNAL_INSTRUCTIONS,
-                    rege.REGEX_JOURNAL_SUBSCRIPTION,
-                    rege.REGEX_JOURNAL_REVISTAS}:
-        matched_acronym = re.match(pattern, action)
+    for pattern in MATCH_JOURNAL_ACRONYM:
+        matched_acronym = pattern.match(action)
         if matched_acronym:
             if len(matched_acronym.groups()) == 1:
                 return matched_acronym.group(1)
 
-    matched_acronym = re.match(rege.REGEX_ARTICLE_PDF_ACRONYM, action)
+    matched_acronym = MATCH_ARTICLE_PDF_ACRONYM.match(action)
     if matched_acronym:
         return matched_acronym.group(1)
 
 
 def _get_acronym_and_pid_from_action_new_url(action: str):
-    match = re.search(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE, action)
+    match = MATCH_NEW_SCL_JOURNAL_ARTICLE.search(action)
     if match:
         if len(match.groups()) == 2:
             return match.group(1), match.group(2)
@@ -249,7 +377,21 @@ def _get_acronym_and_pid_from_action_new_url(action: str):
 
 
 def get_year_of_publication_new_url(hit, pid2yop: dict):
-    return pid2yop.get(hit.collection, {}).get(hit.pid, {}).get('publication_year', '')
+    return _get_publication_year(pid2yop, hit.collection, hit.pid)
+
+
+def _get_publication_year(pid2yop: dict, collection: str, pid: str):
+    """
+    Obtém o ano de publicação associado ao PID, em dicionário pid-dates (ou em tabela com a mesma interface)
+    """
+    return pid2yop.get(collection, {}).get(pid, {}).get('publication_year', '')
+
+
+def _get_default_language(pid2format2lang: dict, collection: str, pid: str):
+    """
+    Obtém o idioma padrão associado ao PID, em dicionário pid-format-lang (ou em tabela com a mesma interface)
+    """
+    return pid2format2lang.get(collection, {}).get(pid, {}).get('default', values.LANGUAGE_UNDEFINED)
 
 
 def get_year_of_publication(hit, pid2yop: dict):
@@ -260,7 +402,7 @@ def get_year_of_publication(hit, pid2yop: dict):
     @param pid2yop: dicionário que mapeia PID a ano de publicação (YOP)
     @return: o ano de publicação associado ao PID
     """
-    yop = pid2yop.get(hit.collection, {}).get(hit.pid, {}).get('publication_year', '')
+    yop = _get_publication_year(pid2yop, hit.collection, hit.pid)
 
     if not yop:
         yop = _get_year_of_publication_from_pid(hit.pid)
@@ -277,7 +419,7 @@ def _get_year_of_publication_from_pid(pid):
     @return: o ano de publicação associado ao PID
     """
     yop = ''
-    matched_yop = re.search(rege.REGEX_ARTICLE_PID_YOP, pid)
+    matched_yop = MATCH_ARTICLE_PID_YOP.search(pid)
     if matched_yop:
         if len(matched_yop.groups()) == 1:
             yop = matched_yop.group(1)
@@ -302,16 +444,16 @@ def get_pid_from_pdf_path(hit, pdf2pid: dict):
     pdf_path = url_parsed.path
 
     # Verifica se caminho é realmente de pdf
-    if not re.search(rege.REGEX_ARTICLE_PDF_PATH, pdf_path):
-        matched_pdf_path = re.search(rege.REGEX_ARTICLE_PDF_PATH, pdf_path)
+    if not SEARCH_ARTICLE_PDF_PATH.search(pdf_path):
+        matched_pdf_path = MATCH_ARTICLE_PDF_PATH.search(pdf_path)
         if matched_pdf_path:
             pdf_path = matched_pdf_path.group()
         else:
             return ''
 
     # Verifica se há prefixo scielo.br no caminho do pdf
-    if re.search(rege.REGEX_ARTICLE_PDF_FULL_PATH, pdf_path):
-        matched_pdf_full_path = re.search(rege.REGEX_ARTICLE_PDF_FULL_PATH, pdf_path)
+    if SEARCH_ARTICLE_PDF_FULL_PATH.search(pdf_path):
+        matched_pdf_full_path = MATCH_ARTICLE_PDF_FULL_PATH.search(pdf_path)
         if matched_pdf_full_path and len(matched_pdf_full_path.groups()) == 2:
             pdf_path = matched_pdf_full_path.group(2)
 
@@ -341,23 +483,23 @@ def get_issn(hit, acronym2pid: dict):
     @param acronym2pid: um dicionário Acrônimo:PID
     @return: ISSN ou string vazia 
     """
-    if re.search(rege.REGEX_JOURNAL_PID, hit.pid):
+    if MATCH_JOURNAL_PID.search(hit.pid):
         return hit.pid
-    elif re.search(rege.REGEX_ISSUE_PID, hit.pid):
+    elif MATCH_ISSUE_PID.search(hit.pid):
         return issue_code_to_journal_issn(hit.pid)
-    elif re.search(rege.REGEX_ARTICLE_PID, hit.pid):
+    elif MATCH_ARTICLE_PID.search(hit.pid):
         return article_pid_to_journal_issn(hit.pid)
 
     # Tenta obter ISSN a partir de trecho pid_(ISSN) de url
     if hit.content_type == ma.HIT_CONTENT_JOURNAL_SERIAL:
-        matched_script_sci_serial_issn = re.match(rege.REGEX_JOURNAL_SCRIPT_SCI_SERIAL, hit.action_name)
+        matched_script_sci_serial_issn = MATCH_JOURNAL_SCRIPT_SCI_SERIAL.match(hit.action_name)
         if matched_script_sci_serial_issn:
             if len(matched_script_sci_serial_issn.groups()) == 1:
                 return matched_script_sci_serial_issn.group(1)
 
     # Tenta obter ISSN a partir de trecho pid_(ISSN) de url
     if hit.content_type == ma.HIT_CONTENT_JOURNAL_ISSUES:
-        matched_script_sci_issues_issn = re.match(rege.REGEX_JOURNAL_SCRIPT_SCI_ISSUES, hit.action_name)
+        matched_script_sci_issues_issn = MATCH_JOURNAL_SCRIPT_SCI_ISSUES.match(hit.action_name)
         if matched_script_sci_issues_issn:
             if len(matched_script_sci_issues_issn.groups()) == 1:
                 return matched_script_sci_issues_issn.group(1)
@@ -366,153 +508,15 @@ def get_issn(hit, acronym2pid: dict):
 
 
 def get_content_type_new_url(hit):
-    action_lowered = hit.action_name.lower()
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_ARTICLE_ABSTRACT
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL_ARTICLE, action_lowered):
-        if hit.format == 'html':
-            if 'fragment' in hit.__dict__.keys():
-                if hit.fragment == 'modaltutors':
-                    return ma.HIT_CONTENT_NEW_SCL_ARTICLE_AUTHORS
-                if hit.fragment == 'modaltablesfigures':
-                    return ma.HIT_CONTENT_NEW_SCL_ARTICLE_TABLES_AND_FIGURES
-                if hit.fragment == 'modaldownloads':
-                    return ma.HIT_CONTENT_NEW_SCL_ARTICLE_REQUEST_PDF
-                if hit.fragment == 'modalarticles':
-                    return ma.HIT_CONTENT_NEW_SCL_ARTICLE_HOW_TO_CITE
-                if hit.fragment == 'modalversionstranslations':
-                    return ma.HIT_CONTENT_NEW_SCL_ARTICLE_TRANSLATE
-            return ma.HIT_CONTENT_NEW_SCL_ARTICLE_HTML
-
-        if hit.format == 'xml':
-            return ma.HIT_CONTENT_NEW_SCL_ARTICLE_XML
-
-        if hit.format == 'pdf':
-            return ma.HIT_CONTENT_NEW_SCL_ARTICLE_PDF
-
-    if re.search(rege.REGEX_NEW_SCL_RAW, action_lowered):
-        match = re.search(rege.REGEX_NEW_SCL_RAW_DETAIL, action_lowered)
-        if match and len(match.groups()) == 3:
-            if '.pdf' in match.group(3):
-                return ma.HIT_CONTENT_NEW_SCL_ARTICLE_PDF
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL_FEED, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNAL_FEED
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL_GRID, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNAL_GRID
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL_TOC, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNAL_TOC
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNAL, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNAL
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNALS_ALFAPHETIC, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNALS_ALPHABETIC
-
-    if re.search(rege.REGEX_NEW_SCL_JOURNALS_THEMATIC, action_lowered):
-        return ma.HIT_CONTENT_NEW_SCL_JOURNALS_THEMATIC
-
-    return ma.HIT_CONTENT_OTHERS
+    return get_url_classifier(hit.collection).classify_new_url(hit)[1]
 
 
 def get_content_type(hit):
-    possible_domains = dicts.collection_to_domain.get(hit.collection, [])
-
-    for scl_domain in possible_domains:
-        # É domínio/scielo.php
-        if re.search(ma.ACTION_SCLBR_SCLPHP.format(scl_domain), hit.action_name):
-            # Caso possua parâmero script
-            if hit.script:
-                return dicts.script_to_hit_content.get(hit.script, ma.HIT_CONTENT_OTHERS)
-
-            # Caso não possua parâmetro script
-            if '?download' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_DOWNLOAD_CITATION
-            if 'script_sci_issues' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_ISSUES
-            if 'script_sci_serial' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_SERIAL
-            return ma.HIT_CONTENT_PLATFORM_MAIN_PAGE
-
-        # É domínio/article_plus.php? + pid={}
-        if re.search(ma.ACTION_SCLBR_ARTICLE_PLUS.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_ARTICLE_PLUS
-
-        # É domínio/pdf/ + arquivo.pdf
-        if re.search(ma.ACTION_SCLBR_PDF.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_ARTICLE_PDF
-
-        # É domínio/pdf/readcube/epdf.php? + pid={}
-        if re.search(ma.ACTION_SCLBR_READCUBE_EPDF.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_ARTICLE_EXTERNAL_PDF
-
-        # É domínio/scieloorg/php/{} + pid={}
-        if re.search(ma.ACTION_SCLBR_SCLORG_PHP.format(scl_domain), hit.action_name):
-            if 'articlexml' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_ARTICLE_XML
-            if 'citedscielo' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_CITEDSCIELO
-            if 'reference' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_REFERENCE_LIST
-            if 'related' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_RELATED
-            if 'translate' in hit.action_name:
-                return ma.HIT_CONTENT_ARTICLE_TRANSLATE
-
-        # É domínio/rss? + pid={}
-        if re.search(ma.ACTION_SCLBR_RSS.format(scl_domain), hit.action_name):
-            if re.search(rege.REGEX_ISSUE_PID, hit.pid):
-                return ma.HIT_CONTENT_ISSUE_RSS
-            if re.search(rege.REGEX_JOURNAL_PID, hit.pid):
-                return ma.HIT_CONTENT_JOURNAL_RSS
-
-        # É domínio/revistas/ + página ou arquivo
-        if re.search(ma.ACTION_SCLBR_REVISTAS.format(scl_domain), hit.action_name):
-            if 'aboutj.htm' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_ABOUT
-            if 'edboard.htm' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_EDITORIAL
-            if 'instruc.htm' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_INSTRUCTIONS
-            if 'subscrp.htm' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_SUBSCRIPTION
-            return ma.HIT_CONTENT_JOURNAL_REVISTAS
-
-        # É domínio/google_metrics/get_h5_m5.php? + issn={}
-        if re.search(ma.ACTION_SCLBR_GOOGLE_METRICS_H5_M5.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_JOURNAL_GOOGLE_METRICS
-
-        # É domínio/img/{fbpe ou revistas} + acrônimo
-        if re.search(ma.ACTION_SCLBR_IMG.format(scl_domain), hit.action_name):
-            if 'fbpe' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_IMG_FBPE
-            if 'revistas' in hit.action_name:
-                return ma.HIT_CONTENT_JOURNAL_IMG_REVISTAS
-
-        # É domínio/statjournal.php? + issn={}
-        if re.search(ma.ACTION_SCLBR_STATJOURNAL.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_JOURNAL_STAT
-
-        # É domínio/avaliacao
-        if re.search(ma.ACTION_SCLBR_AVALIACAO.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_PLATFORM_EVALUATION
-
-        # É domínio/equipe
-        if re.search(ma.ACTION_SCLBR_EQUIPE.format(scl_domain), hit.action_name):
-            return ma.HIT_CONTENT_PLATFORM_TEAM
-
-        # É domínio (scielo.br, scielo.org.ar, ...)
-        if re.search(scl_domain, hit.action_name):
-            return ma.HIT_CONTENT_PLATFORM_HOME
-
-    return ma.HIT_CONTENT_OTHERS
+    return get_url_classifier(hit.collection).get_content_type(hit)
 
 
 def get_language_new_url(hit, pid2format2lang: dict):
-    return pid2format2lang.get(hit.collection, {}).get(hit.pid, {}).get('default', values.LANGUAGE_UNDEFINED)
+    return _get_default_language(pid2format2lang, hit.collection, hit.pid)
 
 
 def get_language(hit, pid2format2lang: dict):
@@ -523,15 +527,19 @@ def get_language(hit, pid2format2lang: dict):
     @param pid2format2lang: um dicionário que mapeia PID aos seus respectivos formatos e idiomas
     @return: o idioma associado ao Hit
     """
-    if hit.pid not in pid2format2lang.get(hit.collection, {}):
+    pids = pid2format2lang.get(hit.collection, {})
+
+    if hit.pid not in pids:
         logging.debug('PID não encontrado em PID-Formato-Idiomas (PID: %s, FMT: %s, ActionName: %s)' % (hit.pid, hit.format, hit.action_name))
         return values.LANGUAGE_UNDEFINED
 
-    if hit.lang in pid2format2lang.get(hit.collection, {}).get(hit.pid, {}).get(hit.format, set()):
+    pid_format_lang = pids.get(hit.pid, {})
+    if hit.lang in pid_format_lang.get(hit.format, set()):
         return hit.lang
-    else:
-        logging.debug('Idioma não consta em lista de idiomas associáveis ao PID e formato (PID: %s, FMT: %s, Lang: %s)' % (hit.pid, hit.format, hit.lang))
-        return pid2format2lang.get(hit.collection, {}).get(hit.pid, {}).get('default', values.LANGUAGE_UNDEFINED)
+    default_language = pid_format_lang.get('default', values.LANGUAGE_UNDEFINED)
+
+    logging.debug('Idioma não consta em lista de idiomas associáveis ao PID e formato (PID: %s, FMT: %s, Lang: %s)' % (hit.pid, hit.format, hit.lang))
+    return default_language
 
 
 def get_format(hit):
@@ -541,11 +549,13 @@ def get_format(hit):
     @param hit: um Hit
     @return: o formato associado ao Hit
     """
-    if hit.content_type:
-        if hit.content_type in {ma.HIT_CONTENT_ARTICLE_PDF,
-                                ma.HIT_CONTENT_ARTICLE_EXTERNAL_PDF} or re.search(rege.REGEX_PDF,
-                                                                                  hit.action_name) or re.search(rege.REGEX_ARTICLE_PDF_PATH,
-                                                                                                                hit.action_name):
+    return _get_format(hit.content_type, hit.action_name)
+
+
+def _get_format(content_type: int, action: str):
+    if content_type:
+        if content_type in {ma.HIT_CONTENT_ARTICLE_PDF,
+                            ma.HIT_CONTENT_ARTICLE_EXTERNAL_PDF} or SEARCH_PDF.search(action) or SEARCH_ARTICLE_PDF_PATH.search(action):
             hit_format = values.FORMAT_PDF
         else:
             hit_format = values.FORMAT_HTML
@@ -556,38 +566,34 @@ def get_format(hit):
 
 
 def is_new_url_format(action: str):
-    for pattern in [rege.REGEX_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT,
-                    rege.REGEX_NEW_SCL_JOURNAL_ARTICLE,
-                    rege.REGEX_NEW_SCL_JOURNAL_FEED,
-                    rege.REGEX_NEW_SCL_JOURNAL_GRID,
-                    rege.REGEX_NEW_SCL_JOURNAL_TOC,
-                    rege.REGEX_NEW_SCL_JOURNAL,
-                    rege.REGEX_NEW_SCL_JOURNALS_ALFAPHETIC,
-                    rege.REGEX_NEW_SCL_JOURNALS_THEMATIC,
-                    rege.REGEX_NEW_SCL_RAW]:
-        if re.search(pattern, action):
-            return True
+    if SEARCH_NEW_SCL_ANY.search(action):
+        return True
 
     return False
 
 
 def get_content_type_preprints(hit):
-    unquoted_action = parse.unquote(hit.action_name)
+    return _get_content_type_and_pid_preprints(parse.unquote(hit.action_name))[0]
+
 
-    for pattern in [rege.REGEX_PREPRINT_VIEW_ABSTRACT,
-                    rege.REGEX_PREPRINT_DOCUMENT_ABSTRACT,
-                    rege.REGEX_PREPRINT_VERSION_ABSTRACT]:
-        if re.search(pattern, unquoted_action):
-            return ma.HIT_CONTENT_TYPE_PREPRINT_ABSTRACT
+def _get_content_type_and_pid_preprints(unquoted_action: str):
+    """
+    Obtém, em uma única passagem pelas expressões regulares, o tipo de conteúdo e o PID de uma URL Preprints
 
-    for pattern in [rege.REGEX_PREPRINT_VIEW_PDF,
-                    rege.REGEX_PREPRINT_DOWNLOAD_PDF,
-                    rege.REGEX_PREPRINT_DOCUMENT_DOWNLOAD_PDF,
-                    rege.REGEX_PREPRINT_VERSION_DOWNLOAD_PDF]:
-        if re.search(pattern, unquoted_action):
-            return ma.HIT_CONTENT_TYPE_PREPRINT_PDF
+    @param unquoted_action: URL de ação decodificada
+    @return: uma tupla (tipo de conteúdo, PID)
+    """
+    for pattern in MATCH_PREPRINT_ABSTRACT:
+        match = pattern.search(unquoted_action)
+        if match:
+            return ma.HIT_CONTENT_TYPE_PREPRINT_ABSTRACT, match.group(1)
 
-    return ma.HIT_CONTENT_OTHERS
+    for pattern in MATCH_PREPRINT_PDF:
+        match = pattern.search(unquoted_action)
+        if match:
+            return ma.HIT_CONTENT_TYPE_PREPRINT_PDF, match.group(1)
+
+    return ma.HIT_CONTENT_OTHERS, None
 
 
 def get_format_preprints(hit):
@@ -600,96 +606,43 @@ def get_format_preprints(hit):
 
 
 def get_pid_preprint(hit):
-    unquoted_action = parse.unquote(hit.action_name)
-
-    for pattern in [rege.REGEX_PREPRINT_VIEW_ABSTRACT,
-                    rege.REGEX_PREPRINT_DOCUMENT_ABSTRACT,
-                    rege.REGEX_PREPRINT_VERSION_ABSTRACT,
-                    rege.REGEX_PREPRINT_VIEW_PDF,
-                    rege.REGEX_PREPRINT_DOWNLOAD_PDF,
-                    rege.REGEX_PREPRINT_DOCUMENT_DOWNLOAD_PDF,
-                    rege.REGEX_PREPRINT_VERSION_DOWNLOAD_PDF]:
-        match = re.search(pattern, unquoted_action)
-        if match:
-            return match.group(1)
+    return _get_content_type_and_pid_preprints(parse.unquote(hit.action_name))[1]
 
 
 def get_language_preprints(hit, pid2format2lang: dict):
-    return pid2format2lang.get(hit.collection, {}).get(hit.pid, {}).get('default', values.LANGUAGE_UNDEFINED)
+    return _get_default_language(pid2format2lang, hit.collection, hit.pid)
 
 
 def get_year_of_publication_preprints(hit, pid2yop: dict):
-    return pid2yop.get(hit.collection, {}).get(hit.pid, {}).get('publication_year', '')
+    return _get_publication_year(pid2yop, hit.collection, hit.pid)
 
 
 def get_hit_type_ssp(action: str):
-    for pattern in [rege.REGEX_SSP_JOURNAL_ARTICLE_HTML,
-                    rege.REGEX_SSP_JOURNAL_ARTICLE_PDF,
-                    rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_ARTICLE
-
-    for pattern in [rege.REGEX_SSP_JOURNAL_ABOUT,
-                    rege.REGEX_SSP_JOURNAL_GRID,
-                    rege.REGEX_SSP_JOURNAL_FEED]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_JOURNAL
-
-    for pattern in [rege.REGEX_SSP_JOURNAL_ISSUE,
-                    rege.REGEX_SSP_JOURNAL_FEED_ISSUE]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_ISSUE
-
-    for pattern in [rege.REGEX_SSP_PLATFORM_ABOUT,
-                    rege.REGEX_SSP_JOURNALS_THEMATIC,
-                    rege.REGEX_SSP_JOURNALS_ALPHABETIC]:
-        if re.search(pattern, action):
-            return ma.HIT_TYPE_PLATFORM
-
-    if re.search(rege.REGEX_SSP_PLATFORM, action):
-        return ma.HIT_TYPE_PLATFORM
+    for pattern, hit_type in SSP_HIT_TYPE_PATTERNS:
+        if pattern.search(action):
+            return hit_type
 
     return ma.HIT_TYPE_OTHERS
 
 
 def get_content_type_ssp_url(hit):
-    action_lowered = hit.action_name.lower()
-    if re.search(rege.REGEX_SSP_JOURNAL_ARTICLE_HTML, action_lowered):
+    return _get_content_type_ssp_url(hit.action_name.lower())
+
+
+def _get_content_type_ssp_url(action_lowered: str):
+    if SEARCH_SSP_JOURNAL_ARTICLE_HTML.search(action_lowered):
         return ma.HIT_CONTENT_SSP_ARTICLE_HTML
 
-    if re.search(rege.REGEX_SSP_JOURNAL_ARTICLE_PDF, action_lowered):
+    if SEARCH_SSP_JOURNAL_ARTICLE_PDF.search(action_lowered):
         return ma.HIT_CONTENT_SSP_ARTICLE_PDF
 
-    if re.search(rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS, action_lowered):
+    if SEARCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS.search(action_lowered):
         if action_lowered.endswith('.pdf'):
             return ma.HIT_CONTENT_SSP_ARTICLE_PDF
 
-    if re.search(rege.REGEX_SSP_JOURNAL_ISSUE, action_lowered):
-        return ma.HIT_CONTENT_SSP_ISSUE
-
-    if re.search(rege.REGEX_SSP_JOURNAL_FEED_ISSUE, action_lowered):
-        return ma.HIT_CONTENT_SSP_ISSUE_RSS
-
-    if re.search(rege.REGEX_SSP_JOURNAL_FEED, action_lowered):
-        return ma.HIT_CONTENT_SSP_JOURNAL_RSS
-
-    if re.search(rege.REGEX_SSP_JOURNAL_GRID, action_lowered):
-        return ma.HIT_CONTENT_SSP_JOURNAL_ISSUES
-
-    if re.search(rege.REGEX_SSP_JOURNAL_ABOUT, action_lowered):
-        return ma.HIT_CONTENT_SSP_JOURNAL_ABOUT
-
-    if re.search(rege.REGEX_SSP_JOURNAL, action_lowered):
-        return ma.HIT_CONTENT_SSP_JOURNAL_MAIN_PAGE
-
-    if re.search(rege.REGEX_SSP_JOURNALS_ALPHABETIC, action_lowered):
-        return ma.HIT_CONTENT_SSP_PLATFORM_LIST_JOURNALS_ALPHABETIC
-
-    if re.search(rege.REGEX_SSP_JOURNALS_THEMATIC, action_lowered):
-        return ma.HIT_CONTENT_SSP_PLATFORM_LIST_JOURNALS_THEMATIC
-
-    if re.search(rege.REGEX_SSP_PLATFORM_ABOUT, action_lowered):
-        return ma.HIT_CONTENT_SSP_PLATFORM_ABOUT
+    for pattern, content_type in SSP_CONTENT_TYPE_PATTERNS:
+        if pattern.search(action_lowered):
+            return content_type
 
     return ma.HIT_CONTENT_OTHERS
 
@@ -715,9 +668,9 @@ def get_url_params_from_action_ssp_url(action: str):
 
 
 def get_url_params_from_ssp_path(action_params, ssp_path):
-    for k, v in {values.FORMAT_HTML: rege.REGEX_SSP_JOURNAL_ARTICLE_HTML_DETAILS,
-                 values.FORMAT_PDF: rege.REGEX_SSP_JOURNAL_ARTICLE_PDF_DETAILS}.items():
-        match = re.search(v, ssp_path)
+    for k, v in ((values.FORMAT_HTML, MATCH_SSP_JOURNAL_ARTICLE_HTML_DETAILS),
+                 (values.FORMAT_PDF, MATCH_SSP_JOURNAL_ARTICLE_PDF_DETAILS)):
+        match = v.search(ssp_path)
 
         if match:
             action_params['format'] = k
@@ -728,7 +681,7 @@ def get_url_params_from_ssp_path(action_params, ssp_path):
 
             return
 
-    path_match_assets = re.match(rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS, ssp_path)
+    path_match_assets = MATCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS.match(ssp_path)
     if path_match_assets:
         action_params['acronym'] = path_match_assets.group(1)
         action_params['year_vol_issue'] = path_match_assets.group(2)
@@ -740,7 +693,7 @@ def get_url_params_from_ssp_path(action_params, ssp_path):
 
 def get_url_params_from_ssp_resource_path(action_params, ssp_path_query):
     resource_path = dict(parse.parse_qsl(ssp_path_query)).get('resource_ssm_path', '')
-    match = re.search(rege.REGEX_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS, resource_path)
+    match = MATCH_SSP_JOURNAL_ARTICLE_MEDIA_ASSETS_DETAILS.search(resource_path)
     if match:
         action_params['acronym'] = match.group(1)
         action_params['year_vol_issue'] = match.group(2)
@@ -769,7 +722,229 @@ def get_language_ssp(pid: str, pid2format2lang: dict):
 
 # ToDo: Integrar com dicionário ainda a ser construído
 def get_year_of_publication_ssp_pid(pid: str):
-    match = re.search(rege.REGEX_SSP_JOURNAL_ARTICLE_YEAR, pid)
+    match = MATCH_SSP_JOURNAL_ARTICLE_YEAR.search(pid)
     if match:
         return match.group(1)
     return ''
+
+
+class UrlClassifier:
+    """
+    Classificador de URLs de ação de uma coleção.
+    As expressões regulares, inclusive as que dependem dos domínios da coleção (map_actions.ACTION_SCLBR_*),
+    são compiladas uma única vez, na criação do objeto
+    """
+    def __init__(self, collection):
+        self.collection = collection
+        self.domains_patterns = [self._compile_domain_patterns(d) for d in dicts.collection_to_domain.get(collection, [])]
+
+    @staticmethod
+    def _compile_domain_patterns(scl_domain):
+        return {
+            'sclphp': re.compile(ma.ACTION_SCLBR_SCLPHP.format(scl_domain)),
+            'article_plus': re.compile(ma.ACTION_SCLBR_ARTICLE_PLUS.format(scl_domain)),
+            'pdf': re.compile(ma.ACTION_SCLBR_PDF.format(scl_domain)),
+            'readcube_epdf': re.compile(ma.ACTION_SCLBR_READCUBE_EPDF.format(scl_domain)),
+            'sclorg_php': re.compile(ma.ACTION_SCLBR_SCLORG_PHP.format(scl_domain)),
+            'rss': re.compile(ma.ACTION_SCLBR_RSS.format(scl_domain)),
+            'revistas': re.compile(ma.ACTION_SCLBR_REVISTAS.format(scl_domain)),
+            'google_metrics': re.compile(ma.ACTION_SCLBR_GOOGLE_METRICS_H5_M5.format(scl_domain)),
+            'img': re.compile(ma.ACTION_SCLBR_IMG.format(scl_domain)),
+            'statjournal': re.compile(ma.ACTION_SCLBR_STATJOURNAL.format(scl_domain)),
+            'avaliacao': re.compile(ma.ACTION_SCLBR_AVALIACAO.format(scl_domain)),
+            'equipe': re.compile(ma.ACTION_SCLBR_EQUIPE.format(scl_domain)),
+            'domain': re.compile(scl_domain),
+        }
+
+    def is_new_url_format(self, action_lowered: str):
+        return is_new_url_format(action_lowered)
+
+    def get_content_type(self, hit):
+        """
+        Obtém o tipo de conteúdo de um Hit em formato de URL clássica
+
+        @param hit: um Hit com os atributos action_name, script e pid definidos
+        @return: o tipo de conteúdo
+        """
+        action = hit.action_name
+
+        for patterns in self.domains_patterns:
+            # É domínio/scielo.php
+            if patterns['sclphp'].search(action):
+                # Caso possua parâmero script
+                if hit.script:
+                    return dicts.script_to_hit_content.get(hit.script, ma.HIT_CONTENT_OTHERS)
+
+                # Caso não possua parâmetro script
+                if '?download' in action:
+                    return ma.HIT_CONTENT_ARTICLE_DOWNLOAD_CITATION
+                if 'script_sci_issues' in action:
+                    return ma.HIT_CONTENT_JOURNAL_ISSUES
+                if 'script_sci_serial' in action:
+                    return ma.HIT_CONTENT_JOURNAL_SERIAL
+                return ma.HIT_CONTENT_PLATFORM_MAIN_PAGE
+
+            # É domínio/article_plus.php? + pid={}
+            if patterns['article_plus'].search(action):
+                return ma.HIT_CONTENT_ARTICLE_PLUS
+
+            # É domínio/pdf/ + arquivo.pdf
+            if patterns['pdf'].search(action):
+                return ma.HIT_CONTENT_ARTICLE_PDF
+
+            # É domínio/pdf/readcube/epdf.php? + pid={}
+            if patterns['readcube_epdf'].search(action):
+                return ma.HIT_CONTENT_ARTICLE_EXTERNAL_PDF
+
+            # É domínio/scieloorg/php/{} + pid={}
+            if patterns['sclorg_php'].search(action):
+                if 'articlexml' in action:
+                    return ma.HIT_CONTENT_ARTICLE_ARTICLE_XML
+                if 'citedscielo' in action:
+                    return ma.HIT_CONTENT_ARTICLE_CITEDSCIELO
+                if 'reference' in action:
+                    return ma.HIT_CONTENT_ARTICLE_REFERENCE_LIST
+                if 'related' in action:
+                    return ma.HIT_CONTENT_ARTICLE_RELATED
+                if 'translate' in action:
+                    return ma.HIT_CONTENT_ARTICLE_TRANSLATE
+
+            # É domínio/rss? + pid={}
+            if patterns['rss'].search(action):
+                if MATCH_ISSUE_PID.search(hit.pid):
+                    return ma.HIT_CONTENT_ISSUE_RSS
+                if MATCH_JOURNAL_PID.search(hit.pid):
+                    return ma.HIT_CONTENT_JOURNAL_RSS
+
+            # É domínio/revistas/ + página ou arquivo
+            if patterns['revistas'].search(action):
+                if 'aboutj.htm' in action:
+                    return ma.HIT_CONTENT_JOURNAL_ABOUT
+                if 'edboard.htm' in action:
+                    return ma.HIT_CONTENT_JOURNAL_EDITORIAL
+                if 'instruc.htm' in action:
+                    return ma.HIT_CONTENT_JOURNAL_INSTRUCTIONS
+                if 'subscrp.htm' in action:
+                    return ma.HIT_CONTENT_JOURNAL_SUBSCRIPTION
+                return ma.HIT_CONTENT_JOURNAL_REVISTAS
+
+            # É domínio/google_metrics/get_h5_m5.php? + issn={}
+            if patterns['google_metrics'].search(action):
+                return ma.HIT_CONTENT_JOURNAL_GOOGLE_METRICS
+
+            # É domínio/img/{fbpe ou revistas} + acrônimo
+            if patterns['img'].search(action):
+                if 'fbpe' in action:
+                    return ma.HIT_CONTENT_JOURNAL_IMG_FBPE
+                if 'revistas' in action:
+                    return ma.HIT_CONTENT_JOURNAL_IMG_REVISTAS
+
+            # É domínio/statjournal.php? + issn={}
+            if patterns['statjournal'].search(action):
+                return ma.HIT_CONTENT_JOURNAL_STAT
+
+            # É domínio/avaliacao
+            if patterns['avaliacao'].search(action):
+                return ma.HIT_CONTENT_PLATFORM_EVALUATION
+
+            # É domínio/equipe
+            if patterns['equipe'].search(action):
+                return ma.HIT_CONTENT_PLATFORM_TEAM
+
+            # É domínio (scielo.br, scielo.org.ar, ...)
+            if patterns['domain'].search(action):
+                return ma.HIT_CONTENT_PLATFORM_HOME
+
+        return ma.HIT_CONTENT_OTHERS
+
+    def classify_classic_url(self, hit):
+        """
+        Classifica um Hit em formato de URL clássica
+
+        @param hit: um Hit com os atributos action_name, script, pid e issn definidos
+        @return: uma tupla (tipo de Hit, tipo de conteúdo, formato)
+        """
+        content_type = self.get_content_type(hit)
+        hit_format = _get_format(content_type, hit.action_name)
+        hit_type = _get_hit_type(hit.pid, hit.issn, content_type)
+        return hit_type, content_type, hit_format
+
+    def classify_new_url(self, hit):
+        """
+        Classifica um Hit em formato de URL nova, avaliando cada expressão regular no máximo uma vez
+
+        @param hit: um Hit com os atributos action_name e format definidos
+        @return: uma tupla (tipo de Hit, tipo de conteúdo)
+        """
+        action_lowered = hit.action_name.lower()
+
+        is_article = SEARCH_NEW_SCL_JOURNAL_ARTICLE.search(action_lowered)
+        if is_article:
+            if SEARCH_NEW_SCL_JOURNAL_ARTICLE_ABSTRACT.search(action_lowered):
+                return ma.HIT_TYPE_ARTICLE, ma.HIT_CONTENT_NEW_SCL_ARTICLE_ABSTRACT
+
+            if hit.format == values.FORMAT_HTML:
+                return ma.HIT_TYPE_ARTICLE, NEW_SCL_FRAGMENT_TO_CONTENT_TYPE.get(hit.fragment, ma.HIT_CONTENT_NEW_SCL_ARTICLE_HTML)
+
+            if hit.format == values.FORMAT_XML:
+                return ma.HIT_TYPE_ARTICLE, ma.HIT_CONTENT_NEW_SCL_ARTICLE_XML
+
+            if hit.format == values.FORMAT_PDF:
+                return ma.HIT_TYPE_ARTICLE, ma.HIT_CONTENT_NEW_SCL_ARTICLE_PDF
+
+        is_raw = SEARCH_NEW_SCL_RAW.search(action_lowered)
+        if is_raw:
+            match = MATCH_NEW_SCL_RAW_DETAIL.search(action_lowered)
+            if match and len(match.groups()) == 3:
+                if '.pdf' in match.group(3):
+                    return ma.HIT_TYPE_ARTICLE, ma.HIT_CONTENT_NEW_SCL_ARTICLE_PDF
+
+        for pattern, content_type, hit_type in NEW_SCL_CONTENT_TYPE_PATTERNS:
+            if pattern.search(action_lowered):
+                if is_article or is_raw:
+                    return ma.HIT_TYPE_ARTICLE, content_type
+                return hit_type, content_type
+
+        if is_article or is_raw:
+            return ma.HIT_TYPE_ARTICLE, ma.HIT_CONTENT_OTHERS
+
+        return ma.HIT_TYPE_OTHERS, ma.HIT_CONTENT_OTHERS
+
+    def classify_ssp_url(self, action_lowered: str):
+        """
+        Classifica um Hit em formato de URL do site Public Health
+
+        @param action_lowered: URL de ação em caixa baixa
+        @return: uma tupla (tipo de Hit, tipo de conteúdo)
+        """
+        return get_hit_type_ssp(action_lowered), _get_content_type_ssp_url(action_lowered)
+
+    def classify_preprint_url(self, action: str):
+        """
+        Classifica um Hit em formato de URL Preprints
+
+        @param action: URL de ação
+        @return: uma tupla (tipo de Hit, tipo de conteúdo, PID)
+        """
+        content_type, pid = _get_content_type_and_pid_preprints(parse.unquote(action))
+
+        if pid:
+            return ma.HIT_TYPE_ARTICLE, content_type, pid
+
+        return ma.HIT_TYPE_OTHERS, content_type, pid
+
+
+# Classificadores de URL já construídos, um por coleção
+_url_classifiers = {}
+
+
+def get_url_classifier(collection: str):
+    """
+    Obtém o classificador de URLs de uma coleção. O classificador é construído apenas na primeira chamada
+
+    @param collection: acrônimo de coleção
+    @return: um objeto UrlClassifier
+    """
+    if collection not in _url_classifiers:
+        _url_classifiers[collection] = UrlClassifier(collection)
+    return _url_classifiers[collection]
@@ -0,0 +1,398 @@
+import codecs
+import gzip
+import io
+import ipaddress
+import queue
+import shutil
+import threading
+
+from collections import namedtuple
+from datetime import datetime
+from operator import itemgetter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Colunas de uma pré-tabela (ver scripts/extract_pretable.sh)
+PRETABLE_COLUMNS = ('serverTime', 'browserName', 'browserVersion', 'ip', 'latitude', 'longitude', 'actionName')
+
+# Tamanho de um horário no formato YYYY-MM-DD HH:MM:SS
+SERVER_TIME_LENGTH = 19
+
+# Número máximo de horários mantidos em cache por parse_server_time
+SERVER_TIME_CACHE_SIZE = 100000
+
+# Extensões de pré-tabelas comprimidas
+COMPRESSED_EXTENSIONS = ('.gz', '.zst')
+
+# Escape de caracteres especiais em campos de texto, como na saída do cliente mysql em modo batch
+MYSQL_BATCH_ESCAPE = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\0': '\\0'})
+
+# Níveis de compressão usados na escrita de pré-tabelas
+GZIP_COMPRESSION_LEVEL = 6
+ZSTD_COMPRESSION_LEVEL = 3
+
+# Tamanho dos blocos descomprimidos e número máximo de blocos em espera na fila de leitura
+DECOMPRESSION_BLOCK_SIZE = 1024 * 1024
+DECOMPRESSION_QUEUE_SIZE = 8
+
+_server_time_cache = {}
+
+
+class PretableRecord(namedtuple('PretableRecord', PRETABLE_COLUMNS)):
+    """
+    Registro (linha) de pré-tabela. Tupla leve que também oferece get e values, como o dicionário de csv.DictReader
+    """
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def values(self):
+        return self
+
+
+def parse_server_time(value: str):
+    """
+    Converte um horário no formato YYYY-MM-DD HH:MM:SS em datetime.
+    Usa fatiamento da str em vez de strptime e mantém em cache os horários já convertidos (chave por segundo)
+
+    @param value: horário em formato str
+    @return: um objeto datetime
+    """
+    server_time = _server_time_cache.get(value)
+
+    if server_time is None:
+        if len(value) == 19 and value[4] == '-' and value[7] == '-' and value[10] == ' ' and value[13] == ':' and value[16] == ':':
+            server_time = datetime(int(value[0:4]),
+                                   int(value[5:7]),
+                                   int(value[8:10]),
+                                   int(value[11:13]),
+                                   int(value[14:16]),
+                                   int(value[17:19]))
+        else:
+            server_time = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+
+        if len(_server_time_cache) >= SERVER_TIME_CACHE_SIZE:
+            _server_time_cache.clear()
+        _server_time_cache[value] = server_time
+
+    return server_time
+
+
+def _format_ip(value):
+    """
+    Converte o endereço IP binário do Matomo (location_ip) em str (IPv4 ou IPv6)
+    """
+    if value is None:
+        return 'NULL'
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        if len(value) in (4, 16):
+            return str(ipaddress.ip_address(value))
+        return value.hex()
+
+    return str(value)
+
+
+def _format_text(value):
+    if value is None:
+        return 'NULL'
+    return str(value).translate(MYSQL_BATCH_ESCAPE)
+
+
+def _format_value(value):
+    if value is None:
+        return 'NULL'
+    return str(value)
+
+
+def record_from_matomo_row(row):
+    """
+    Converte uma linha obtida da base de dados Matomo (ver lib_database.get_matomo_pretable_rows) em PretableRecord.
+    Os valores são formatados como na pré-tabela gerada pelo cliente mysql (NULL, escape de caracteres especiais)
+
+    @param row: tupla (serverTime, browserName, browserVersion, ip, latitude, longitude, actionName)
+    @return: um objeto PretableRecord
+    """
+    server_time, browser_name, browser_version, ip, latitude, longitude, action_name = row
+
+    return PretableRecord(_format_value(server_time),
+                          _format_text(browser_name),
+                          _format_text(browser_version),
+                          _format_ip(ip),
+                          _format_value(latitude),
+                          _format_value(longitude),
+                          _format_text(action_name))
+
+
+def format_record(record: PretableRecord, delimiter='\t'):
+    """
+    Converte um PretableRecord em linha de pré-tabela
+
+    @param record: um objeto PretableRecord
+    @param delimiter: separador de campos
+    @return: linha de pré-tabela
+    """
+    return delimiter.join(record) + '\n'
+
+
+def iter_records(lines, header=None, delimiter='\t'):
+    """
+    Lê linhas de pré-tabela e as converte em objetos PretableRecord.
+    Os campos são obtidos por posição, a partir do índice de cada coluna no cabeçalho
+
+    @param lines: iterável de linhas (str) de uma pré-tabela
+    @param header: lista de colunas; caso não seja informada, é obtida da primeira linha
+    @param delimiter: separador de campos
+    @return: gerador de objetos PretableRecord
+    """
+    lines = iter(lines)
+
+    if header is None:
+        header_line = next(lines, '')
+        header = header_line.rstrip('\r\n').split(delimiter)
+
+    column_index = {c: i for i, c in enumerate(header)}
+    n_columns = len(header)
+    padding = [''] * n_columns
+
+    # Colunas ausentes no cabeçalho são lidas de um campo vazio adicional, ao final da linha
+    has_missing_columns = any(c not in column_index for c in PRETABLE_COLUMNS)
+    get_fields = itemgetter(*[column_index.get(c, n_columns) for c in PRETABLE_COLUMNS])
+    make_record = PretableRecord._make
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+
+        fields = line.split(delimiter)
+        if len(fields) != n_columns:
+            fields = (fields + padding)[:n_columns]
+
+        if has_missing_columns:
+            fields.append('')
+
+        yield make_record(get_fields(fields))
+
+
+def iter_ips(lines, header, delimiter='\t'):
+    """
+    Lê apenas o campo ip das linhas de pré-tabela, nas mesmas linhas convertidas por iter_records (linhas vazias são
+    ignoradas)
+
+    @param lines: iterável de linhas (str) de uma pré-tabela, sem o cabeçalho
+    @param header: lista de colunas
+    @param delimiter: separador de campos
+    @return: gerador de IPs (str)
+    """
+    if 'ip' not in header:
+        for line in lines:
+            if line.rstrip('\r\n'):
+                yield ''
+        return
+
+    ip_index = header.index('ip')
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+
+        # Apenas os campos até o IP são separados
+        fields = line.split(delimiter, ip_index + 1)
+        yield fields[ip_index] if len(fields) > ip_index else ''
+
+
+def is_compressed(path: str):
+    """
+    Verifica se uma pré-tabela está comprimida (gzip ou zstd)
+
+    @param path: caminho da pré-tabela
+    @return: True se a pré-tabela está comprimida, False caso contrário
+    """
+    return path.endswith(COMPRESSED_EXTENSIONS)
+
+
+def _open_decompressed(path: str):
+    """
+    Abre uma pré-tabela comprimida como fluxo binário descomprimido
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+
+    if zstandard is None:
+        raise ImportError('A leitura de pré-tabelas .zst requer o pacote zstandard')
+
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+def decompress_pretable(path: str, target_path: str):
+    """
+    Grava uma pré-tabela comprimida (gzip ou zstd) descomprimida em outro arquivo, sem decodificar seu conteúdo, de modo
+    que a leitura do arquivo gravado (ver open_pretable) fornece as mesmas linhas da pré-tabela comprimida
+
+    @param path: caminho da pré-tabela comprimida
+    @param target_path: caminho do arquivo descomprimido
+    """
+    with _open_decompressed(path) as f_in, open(target_path, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out, DECOMPRESSION_BLOCK_SIZE)
+
+
+def get_text_encoding(path: str):
+    """
+    Obtém a codificação com que uma pré-tabela é lida em modo texto (a codificação padrão de open)
+    """
+    with open(path, errors='ignore') as f:
+        return f.encoding
+
+
+class DecompressedLines:
+    """
+    Lê as linhas de uma pré-tabela comprimida. A descompressão é executada em uma thread separada, que coloca blocos
+    descomprimidos em uma fila limitada, de modo que descompressão e processamento das linhas ocorram em paralelo.
+    As linhas são fornecidas como na leitura de uma pré-tabela não comprimida (ver open_pretable): mesma codificação,
+    caracteres inválidos ignorados e quebras de linha universais ('\n', '\r\n' e '\r', convertidas em '\n')
+    """
+    def __init__(self, path: str, block_size=DECOMPRESSION_BLOCK_SIZE, queue_size=DECOMPRESSION_QUEUE_SIZE):
+        self.path = path
+        self.encoding = get_text_encoding(path)
+        self.block_size = block_size
+        self.blocks = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._decompress, daemon=True)
+
+    def _put(self, block):
+        while not self.stopped.is_set():
+            try:
+                self.blocks.put(block, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self):
+        try:
+            with _open_decompressed(self.path) as f:
+                while True:
+                    block = f.read(self.block_size)
+                    if not block or not self._put(block):
+                        break
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stopped.set()
+        self.thread.join()
+
+    def __iter__(self):
+        # Mesma decodificação de io.TextIOWrapper com newline=None
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(self.encoding)(errors='ignore'), translate=True)
+        pending = ''
+
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                break
+
+            lines = (pending + decoder.decode(block)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + '\n'
+
+        if self.error:
+            raise self.error
+
+        # Um '\r' ao final do último bloco só é convertido em quebra de linha ao final da decodificação
+        lines = (pending + decoder.decode(b'', final=True)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+
+        if pending:
+            yield pending
+
+
+def open_pretable(path: str):
+    """
+    Abre uma pré-tabela para leitura de suas linhas. Pré-tabelas .gz e .zst são descomprimidas em fluxo,
+    sem arquivo intermediário em disco
+
+    @param path: caminho da pré-tabela
+    @return: gerenciador de contexto que fornece as linhas da pré-tabela
+    """
+    if is_compressed(path):
+        return DecompressedLines(path)
+
+    return open(path, errors='ignore')
+
+
+def _split_text_lines(text: str):
+    """
+    Divide um texto em linhas com quebras de linha universais ('\n', '\r\n' e '\r'), como na leitura em modo texto
+    """
+    return io.StringIO(text, newline=None).readlines()
+
+
+def iter_lines_with_offsets(path: str, start=0, end=None):
+    """
+    Lê as linhas de uma pré-tabela não comprimida tal como são fornecidas por open_pretable (mesma codificação,
+    caracteres inválidos ignorados e quebras de linha universais), informando a posição (byte) em que cada linha começa.
+    Linhas precedidas apenas por '\r' recebem posição None, pois não podem ser lidas a partir de uma posição do arquivo
+
+    @param path: caminho da pré-tabela
+    @param start: posição, no início de uma linha, a partir da qual as linhas são lidas
+    @param end: posição a partir da qual as linhas não são lidas (None lê até o final do arquivo)
+    @return: gerador de tuplas (posição ou None, linha)
+    """
+    encoding = get_text_encoding(path)
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+
+        for line in f:
+            if end is not None and position >= end:
+                break
+
+            text = line.decode(encoding, 'ignore')
+
+            if '\r' not in text:
+                yield position, text
+            else:
+                for i, text_line in enumerate(_split_text_lines(text)):
+                    yield position if i == 0 else None, text_line
+
+            position += len(line)
+
+
+def open_pretable_writer(path: str):
+    """
+    Abre uma pré-tabela para escrita. A compressão (gzip ou zstd) é definida pela extensão do arquivo
+
+    @param path: caminho da pré-tabela (.tsv, .tsv.gz ou .tsv.zst)
+    @return: arquivo texto para escrita
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', compresslevel=GZIP_COMPRESSION_LEVEL, encoding='utf-8')
+
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError('A escrita de pré-tabelas .zst requer o pacote zstandard')
+
+        writer = zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).stream_writer(open(path, 'wb'), closefd=True)
+        return io.TextIOWrapper(writer, encoding='utf-8')
+
+    return open(path, 'w', encoding='utf-8')
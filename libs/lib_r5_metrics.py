@@ -0,0 +1,145 @@
+import csv
+import struct
+
+
+# Colunas de um arquivo r5-metrics
+R5_METRICS_COLUMNS = (
+    'pid',
+    'format_name',
+    'language_name',
+    'latitude',
+    'longitude',
+    'year_of_publication',
+    'issn',
+    'year_month_day',
+    'total_item_investigations',
+    'total_item_requests',
+    'unique_item_investigations',
+    'unique_item_requests',
+)
+
+# Número de colunas de texto (as demais são contagens inteiras)
+TEXT_COLUMNS_N = 8
+
+# Extensão de arquivo associada a cada formato de r5-metrics
+FORMAT_TO_EXTENSION = {
+    'csv': '.csv',
+    'binary': '.bin',
+}
+
+# Formato binário: sequência de blocos independentes, cada um com cabeçalho (assinatura, número de textos, número de
+# linhas), tamanhos dos textos (uint32), textos em UTF-8 e linhas (índices dos textos e contagens, uint32).
+# Por serem independentes, blocos de arquivos distintos podem ser concatenados (ver merge_shard_results)
+BINARY_MAGIC = b'R5M1'
+BINARY_BLOCK_HEADER = struct.Struct('<4sII')
+BINARY_ROW = struct.Struct('<%dI' % len(R5_METRICS_COLUMNS))
+
+
+class R5MetricsTextWriter:
+    """
+    Escreve linhas r5-metrics em texto, com campos separados por barra vertical
+    """
+    def __init__(self, file):
+        self.file = file
+
+    def writerows(self, rows):
+        self.file.writelines(['|'.join(r[:TEXT_COLUMNS_N]) + '|%d|%d|%d|%d\n' % r[TEXT_COLUMNS_N:] for r in rows])
+
+
+class R5MetricsBinaryWriter:
+    """
+    Escreve linhas r5-metrics em formato binário, um bloco por chamada de writerows
+    """
+    def __init__(self, file):
+        self.file = file
+
+    def writerows(self, rows):
+        text_to_index = {}
+        packed_rows = bytearray()
+
+        for r in rows:
+            indexes = [text_to_index.setdefault(v, len(text_to_index)) for v in r[:TEXT_COLUMNS_N]]
+            packed_rows += BINARY_ROW.pack(*indexes, *r[TEXT_COLUMNS_N:])
+
+        encoded_texts = [t.encode('utf-8') for t in text_to_index]
+
+        self.file.write(BINARY_BLOCK_HEADER.pack(BINARY_MAGIC, len(encoded_texts), len(packed_rows) // BINARY_ROW.size))
+        self.file.write(struct.pack('<%dI' % len(encoded_texts), *[len(t) for t in encoded_texts]))
+        self.file.write(b''.join(encoded_texts))
+        self.file.write(packed_rows)
+
+
+FORMAT_TO_WRITER = {
+    'csv': R5MetricsTextWriter,
+    'binary': R5MetricsBinaryWriter,
+}
+
+
+def _read_exactly(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError('Arquivo r5-metrics binário incompleto')
+    return data
+
+
+def iter_binary_rows(file):
+    """
+    Lê linhas de um arquivo r5-metrics binário
+
+    @param file: arquivo aberto em modo binário
+    @return: gerador de tuplas com os textos (str) e as contagens (int) de cada linha, na ordem de R5_METRICS_COLUMNS
+    """
+    while True:
+        header = file.read(BINARY_BLOCK_HEADER.size)
+        if not header:
+            break
+
+        if len(header) != BINARY_BLOCK_HEADER.size:
+            raise ValueError('Arquivo r5-metrics binário incompleto')
+
+        magic, texts_n, rows_n = BINARY_BLOCK_HEADER.unpack(header)
+        if magic != BINARY_MAGIC:
+            raise ValueError('Arquivo r5-metrics binário inválido')
+
+        lengths = struct.unpack('<%dI' % texts_n, _read_exactly(file, 4 * texts_n))
+        data = _read_exactly(file, sum(lengths))
+
+        texts = []
+        start = 0
+        for length in lengths:
+            texts.append(data[start:start + length].decode('utf-8'))
+            start += length
+
+        for r in BINARY_ROW.iter_unpack(_read_exactly(file, BINARY_ROW.size * rows_n)):
+            yield tuple([texts[i] for i in r[:TEXT_COLUMNS_N]]) + r[TEXT_COLUMNS_N:]
+
+
+def iter_text_rows(file):
+    """
+    Lê linhas de um arquivo r5-metrics em texto
+
+    @param file: arquivo aberto em modo texto
+    @return: gerador de listas com os campos (str) de cada linha, na ordem de R5_METRICS_COLUMNS
+    """
+    for row in csv.reader(file, delimiter='|'):
+        if row:
+            yield row
+
+
+def is_binary(file_path):
+    return file_path.endswith(FORMAT_TO_EXTENSION['binary'])
+
+
+def iter_rows(file_path):
+    """
+    Lê linhas de um arquivo r5-metrics, em texto ou em formato binário (conforme a extensão do arquivo)
+
+    @param file_path: caminho do arquivo r5-metrics
+    @return: gerador de linhas, na ordem de R5_METRICS_COLUMNS
+    """
+    if is_binary(file_path):
+        with open(file_path, 'rb') as f:
+            yield from iter_binary_rows(f)
+    else:
+        with open(file_path) as f:
+            yield from iter_text_rows(f)
@@ -1,5 +1,22 @@
+import datetime
+
 from utils import dicts
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def format_ymd(date):
+    """
+    Formata uma data no padrão YYYY-MM-DD
+
+    :param date: um objeto date ou datetime
+    :return: uma str no formato YYYY-MM-DD
+    """
+    return '%d-%02d-%02d' % (date.year, date.month, date.day)
+
 
 class CounterStat:
     """
@@ -12,90 +29,64 @@ class CounterStat:
                         'platform': {},
                         'others': {}}
 
-    def _get_hits_by_session_and_content_type(self, hits: list):
+    def _get_metrics(self, hits: list, hit_type, item_requests, item_investigations):
         """
-        Obtém um mapa de sessão -> content_type -> [hits]
+        Obtém, em uma única passagem pelos hits, os números de acessos totais e únicos nos moldes COUNTER R5.
+        Um acesso único corresponde a um par distinto (sessão, content_type).
 
         :param hits: lista de hits
-        :return: um mapa de sessão para content_type e lista de hits
+        :param hit_type: tipo de hit a ser considerado (article, issue, journal, platform)
+        :param item_requests: conjunto de content_types válidos para métricas request
+        :param item_investigations: conjunto de content_types válidos para métricas investigation
+        :return: tupla (total_item_requests, total_item_investigations, unique_item_requests, unique_item_investigations)
         """
-        session_to_content_type_and_hits = {}
+        total_requests = 0
+        total_investigations = 0
+        unique_requests = set()
+        unique_investigations = set()
 
         for hit in hits:
-            if hit.session_id not in session_to_content_type_and_hits:
-                session_to_content_type_and_hits[hit.session_id] = {}
-
-            if hit.content_type not in session_to_content_type_and_hits[hit.session_id]:
-                session_to_content_type_and_hits[hit.session_id][hit.content_type] = []
+            if hit.hit_type != hit_type:
+                continue
 
-            session_to_content_type_and_hits[hit.session_id][hit.content_type].append(hit)
+            content_type = hit.content_type
 
-        return session_to_content_type_and_hits
+            if content_type in item_requests:
+                total_requests += 1
+                unique_requests.add((hit.session_id, content_type))
 
-    def _get_total(self, hits: list, hit_type, content_type_list):
-        """
-        Obtém o número total de acessos nos moldes COUNTER R5.
+            if content_type in item_investigations:
+                total_investigations += 1
+                unique_investigations.add((hit.session_id, content_type))
 
-        :param hits: lista de hits
-        :param hit_type: tipo de hit a ser considerado (article, issue, journal, platform)
-        :content_type_list: lista que contém content_types a serem considerados
-        :return: número total e acessos
-        """
-        return sum([1 for x in hits if x.hit_type == hit_type and x.content_type in content_type_list])
-
-    def _get_unique(self, hits: list, hit_type, content_type_list):
-        """
-        Obtém o número de acessos únicos nos moldes COUNTER R5.
-
-        :param hits: lista de hits
-        :param hit_type: tipo de hit a ser considerado (article, issue, journal, platform)
-        :content_type_list: lista que contém content_types a serem considerados
-        :return: número de acessos únicos
-        """
-        unique_requests = 0
-        valid_hits = [h for h in hits if h.hit_type == hit_type and h.content_type in content_type_list]
-
-        session_to_content_type_and_hits = self._get_hits_by_session_and_content_type(valid_hits)
-        for session, content_type in session_to_content_type_and_hits.items():
-            unique_requests += len(content_type)
-
-        return unique_requests
+        return total_requests, total_investigations, len(unique_requests), len(unique_investigations)
 
     def _calculate(self, datefied_hits: dict, key, target: dict, group: str):
         group_hit_type = dicts.group_to_hit_type[group]
         group_item_requests = dicts.group_to_item_requests[group]
         group_item_investigations = dicts.group_to_item_investigations[group]
 
-        for ymd in datefied_hits:
+        for ymd, hits in datefied_hits.items():
             if key not in target:
                 target[key] = {}
 
-            if ymd not in target[key]:
-                target[key][ymd] = dicts.counter_item_metrics.copy()
-
-            target[key][ymd]['total_item_requests'] += self._get_total(
-                datefied_hits[ymd],
-                group_hit_type,
-                group_item_requests)
-
-            target[key][ymd]['total_item_investigations'] += self._get_total(
-                datefied_hits[ymd],
+            total_requests, total_investigations, unique_requests, unique_investigations = self._get_metrics(
+                hits,
                 group_hit_type,
+                group_item_requests,
                 group_item_investigations)
 
-            target[key][ymd]['unique_item_requests'] += self._get_unique(
-                datefied_hits[ymd],
-                group_hit_type,
-                group_item_requests)
+            # Ignora valores nulos
+            if total_requests == 0 and total_investigations == 0:
+                continue
 
-            target[key][ymd]['unique_item_investigations'] += self._get_unique(
-                datefied_hits[ymd],
-                group_hit_type,
-                group_item_investigations)
+            if ymd not in target[key]:
+                target[key][ymd] = dicts.counter_item_metrics.copy()
 
-            # Remove valores nulos
-            if sum(target[key][ymd].values()) == 0:
-                del target[key][ymd]
+            target[key][ymd]['total_item_requests'] += total_requests
+            target[key][ymd]['total_item_investigations'] += total_investigations
+            target[key][ymd]['unique_item_requests'] += unique_requests
+            target[key][ymd]['unique_item_investigations'] += unique_investigations
 
     def calculate_metrics(self, data_content):
         """
@@ -119,14 +110,135 @@ class CounterStat:
         date_to_hits = {}
 
         for hit in hits:
-            year = hit.server_time.year
-            month = hit.server_time.month
-            day = hit.server_time.day
+            date = hit.server_time.date()
+
+            if date not in date_to_hits:
+                date_to_hits[date] = []
+            date_to_hits[date].append(hit)
+
+        return {format_ymd(date): date_hits for date, date_hits in date_to_hits.items()}
+
+
+class ColumnarCounterStat(CounterStat):
+    """
+    Variante de CounterStat que calcula as métricas COUNTER R5 de forma vetorizada (NumPy).
+    Os hits são codificados em colunas de inteiros (sessão, chave, dia, content_type) e as métricas
+    são obtidas por agrupamento (lexsort + unique), produzindo o mesmo resultado de CounterStat.
+    """
+    def __init__(self):
+        if np is None:
+            raise ImportError('O motor colunar de métricas COUNTER requer o pacote numpy')
+        super().__init__()
+
+    def _encode(self, session_key_hits: dict):
+        """
+        Codifica os hits de um grupo em colunas de inteiros, na ordem em que são percorridos por CounterStat
+
+        @param session_key_hits: dicionário sessão -> chave -> [hits]
+        @return: tupla (chaves, colunas) em que colunas contém arrays de sessão, chave, dia, content_type e hit_type
+        """
+        key_to_code = {}
+        sessions, key_codes, days, content_types, hit_types = [], [], [], [], []
+
+        for session_code, key_hits in enumerate(session_key_hits.values()):
+            for key, hits in key_hits.items():
+                if not hits:
+                    continue
+
+                key_code = key_to_code.setdefault(key, len(key_to_code))
+                n = len(hits)
 
-            year_month_day = '-'.join([str(year), str(month).zfill(2), str(day).zfill(2)])
+                sessions.extend([session_code] * n)
+                key_codes.extend([key_code] * n)
+                for hit in hits:
+                    days.append(hit.server_time.toordinal())
+                    content_types.append(hit.content_type)
+                    hit_types.append(hit.hit_type)
 
-            if year_month_day not in date_to_hits:
-                date_to_hits[year_month_day] = []
-            date_to_hits[year_month_day].append(hit)
+        columns = (np.array(sessions, dtype=np.int64),
+                   np.array(key_codes, dtype=np.int64),
+                   np.array(days, dtype=np.int64),
+                   np.array(content_types, dtype=np.int64),
+                   np.array(hit_types, dtype=np.int64))
 
-        return date_to_hits
+        return list(key_to_code), columns
+
+    def _count(self, bucket, session, content_type, mask, n_buckets):
+        """
+        Conta acessos totais e únicos por bucket (chave, dia)
+
+        @param bucket: código do bucket (chave, dia) de cada hit
+        @param session: código da sessão de cada hit
+        @param content_type: content_type de cada hit
+        @param mask: hits válidos para a métrica
+        @param n_buckets: número de buckets
+        @return: arrays de totais e de únicos por bucket
+        """
+        totals = np.bincount(bucket[mask], minlength=n_buckets)
+
+        m_bucket, m_session, m_content_type = bucket[mask], session[mask], content_type[mask]
+        order = np.lexsort((m_content_type, m_session, m_bucket))
+        m_bucket, m_session, m_content_type = m_bucket[order], m_session[order], m_content_type[order]
+
+        # Um acesso único corresponde a um par distinto (sessão, content_type) em um mesmo bucket
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (np.diff(m_bucket) != 0) | (np.diff(m_session) != 0) | (np.diff(m_content_type) != 0)
+        uniques = np.bincount(m_bucket[first], minlength=n_buckets)
+
+        return totals, uniques
+
+    def _calculate_group(self, session_key_hits: dict, target: dict, group: str):
+        keys, (session, key_code, day, content_type, hit_type) = self._encode(session_key_hits)
+        if not keys:
+            return
+
+        # Toda chave com hits é registrada, mesmo que não tenha métricas (como em CounterStat._calculate)
+        for key in keys:
+            if key not in target:
+                target[key] = {}
+
+        group_hit_type = dicts.group_to_hit_type[group]
+        mask_requests = (hit_type == group_hit_type) & np.isin(content_type, list(dicts.group_to_item_requests[group]))
+        mask_investigations = (hit_type == group_hit_type) & np.isin(content_type, list(dicts.group_to_item_investigations[group]))
+
+        days, day_code = np.unique(day, return_inverse=True)
+        day_code = day_code.reshape(-1)
+        bucket = key_code * len(days) + day_code
+        buckets, bucket = np.unique(bucket, return_inverse=True)
+        bucket = bucket.reshape(-1)
+        n_buckets = len(buckets)
+
+        total_requests, unique_requests = self._count(bucket, session, content_type, mask_requests, n_buckets)
+        total_investigations, unique_investigations = self._count(bucket, session, content_type, mask_investigations, n_buckets)
+
+        # Ordem de inserção dos dias: primeira linha de cada par (sessão, bucket) que contribui com alguma métrica
+        _, first_row, session_bucket = np.unique(session * n_buckets + bucket, return_index=True, return_inverse=True)
+        contributes = np.bincount(session_bucket.reshape(-1), weights=mask_requests | mask_investigations) > 0
+        first_row = first_row[contributes]
+
+        n_rows = len(bucket)
+        order = np.full(n_buckets, n_rows, dtype=np.int64)
+        np.minimum.at(order, bucket[first_row], first_row)
+
+        for b in np.argsort(order, kind='stable'):
+            if order[b] == n_rows:
+                break
+
+            key = keys[buckets[b] // len(days)]
+            ymd = format_ymd(datetime.date.fromordinal(int(days[buckets[b] % len(days)])))
+
+            metrics = target[key].setdefault(ymd, dicts.counter_item_metrics.copy())
+            metrics['total_item_requests'] += int(total_requests[b])
+            metrics['total_item_investigations'] += int(total_investigations[b])
+            metrics['unique_item_requests'] += int(unique_requests[b])
+            metrics['unique_item_investigations'] += int(unique_investigations[b])
+
+    def calculate_metrics(self, data_content):
+        """
+        Calcula métricas COUNTER de forma vetorizada e armazena os resultados no campo self.metrics[group: {}]
+
+        @param data_content: dicionário com o conteúdo os dados para cálculo
+        """
+        for group in data_content.keys():
+            if data_content[group]:
+                self._calculate_group(data_content[group], self.metrics[group], group)
@@ -1,47 +1,148 @@
 import logging
 
+from collections import OrderedDict
 from datetime import datetime
 from utils import map_actions as at
 from utils import values
-from libs import lib_hit, lib_counter
+from libs import lib_hit, lib_counter, lib_pretable
+from models.counter import CounterStat
 from urllib.parse import urljoin
 
 
+# Número máximo de URLs de ação mantidas na tabela de URLs do HitManager
+ACTION_TABLE_SIZE = 1000000
+
+
 class Hit:
     """
-    Classe que representa o acesso a uma página (ação)
+    Classe que representa o acesso a uma página (ação).
+    Usa __slots__ para que cada Hit tenha um esquema fixo e não mantenha um __dict__ próprio
     """
+    __slots__ = ('ip', 'latitude', 'longitude', 'server_time', 'browser_name', 'browser_version', 'domain',
+                 'action_id', 'action_table', 'valid', 'session_id', 'collection', 'action_params', 'fragment', 'pid', 'acronym',
+                 'format', 'lang', 'script', 'issn', 'content_type', 'hit_type', 'yop')
+
     def __init__(self, **kargs):
+        # Data e horário do acesso
+        server_time = kargs.get('serverTime', '')
+        if not isinstance(server_time, datetime):
+            server_time = lib_pretable.parse_server_time(server_time)
+
+        self._set_attrs(ip=kargs.get('ip', ''),
+                        latitude=kargs.get('latitude', ''),
+                        longitude=kargs.get('longitude', ''),
+                        server_time=server_time,
+                        browser_name=kargs.get('browserName', ''),
+                        browser_version=kargs.get('browserVersion', ''),
+                        domain=kargs.get('domain', ''),
+                        action_name=kargs.get('actionName', ''))
+
+    @classmethod
+    def from_record(cls, record, domain, action_table=None):
+        """
+        Cria Hit a partir de um registro de pré-tabela, sem dicionário intermediário
+
+        @param record: um objeto lib_pretable.PretableRecord
+        @param domain: domínio do arquivo de log
+        @param action_table: tabela de URLs de ação (ver ActionNameTable); se informada, o Hit guarda apenas o
+        identificador da URL, sem montá-la novamente
+        @return: um objeto Hit
+        """
+        server_time = record.serverTime
+        if not isinstance(server_time, datetime):
+            server_time = lib_pretable.parse_server_time(server_time)
+
+        action_id = None
+        action_name = record.actionName
+        if action_table is not None:
+            action_id = action_table.get_id(action_name)
+
+            # Tabela cheia: o Hit guarda a própria URL
+            if action_id is None:
+                action_table = None
+
+        hit = cls.__new__(cls)
+        hit._set_attrs(ip=record.ip,
+                       latitude=record.latitude,
+                       longitude=record.longitude,
+                       server_time=server_time,
+                       browser_name=record.browserName,
+                       browser_version=record.browserVersion,
+                       domain=domain,
+                       action_name=action_name,
+                       action_id=action_id,
+                       action_table=action_table)
+        return hit
+
+    def _set_attrs(self, ip, latitude, longitude, server_time, browser_name, browser_version, domain, action_name, action_id=None, action_table=None):
         # Endereço IP
-        self.ip = kargs.get('ip', '')
+        self.ip = ip
 
         # Localização associada ao IP
-        self.latitude = kargs.get('latitude', '')
-        self.longitude = kargs.get('longitude', '')
+        self.latitude = latitude
+        self.longitude = longitude
 
         # Data e horário do acesso
-        if isinstance(kargs.get('serverTime', ''), datetime):
-            self.server_time = kargs.get('serverTime')
-        else:
-            self.server_time = datetime.strptime(kargs.get('serverTime', ''), '%Y-%m-%d %H:%M:%S')
+        self.server_time = server_time
 
         # Nome do navegador utilizado
-        self.browser_name = kargs.get('browserName', '').lower()
+        self.browser_name = browser_name.lower()
 
         # Versão do navegador utilizado
-        self.browser_version = kargs.get('browserVersion', '').lower()
+        self.browser_version = browser_version.lower()
 
         # Domínio acessado
-        self.domain = kargs.get('domain', '')
-        
-        # URL da ação
-        self.action_name = kargs.get('actionName', '')
+        self.domain = domain
 
-        self._set_domain_to_action_name(self.domain, self.action_name)
+        # Identificador da URL da ação na tabela de URLs do HitManager (ver action_name)
+        self.action_id = action_id
+        self.action_table = action_table
+
+        if action_table is None:
+            self._set_domain_to_action_name(self.domain, action_name)
 
         # Um boleano que indica se o Hit é válido
         self.valid = True
 
+        # Atributos obtidos posteriormente pelo HitManager
+        self.session_id = ''
+        self.collection = ''
+        self.action_params = None
+        self.fragment = ''
+        self.pid = ''
+        self.acronym = ''
+        self.format = ''
+        self.lang = ''
+        self.script = ''
+        self.issn = ''
+        self.content_type = at.HIT_CONTENT_OTHERS
+        self.hit_type = at.HIT_TYPE_OTHERS
+        self.yop = ''
+
+    @property
+    def action_name(self):
+        """
+        URL da ação, unida ao domínio. É obtida da tabela de URLs ou, se o Hit não estiver em uma tabela, de action_id,
+        que guarda a própria URL
+        """
+        if self.action_table is None:
+            return self.action_id
+        return self.action_table.names[self.action_id]
+
+    @action_name.setter
+    def action_name(self, value):
+        if self.action_table is not None:
+            if self.action_table.names[self.action_id] == value:
+                return
+
+            action_id = self.action_table.get_name_id(value)
+            if action_id is not None:
+                self.action_id = action_id
+                return
+
+        self.action_table = None
+        self.action_id = value
+
     def _set_domain_to_action_name(self, domain, action_name):
         self.action_name = urljoin(domain, action_name)
 
@@ -53,7 +154,7 @@ class Hit:
         return False
 
     def _is_null_action(self):
-        if not self.action_name or self.action_name.lower() in {'', 'null'}:
+        if not self.action_name or (len(self.action_name) == 4 and self.action_name.lower() == 'null'):
             return True
         return False
 
@@ -115,13 +216,219 @@ class Hit:
         return False
 
 
+class CountedHit:
+    """
+    Forma reduzida de um Hit, com apenas os atributos usados na remoção de cliques duplos (ver
+    lib_counter.is_double_click) e no cálculo das métricas COUNTER. Usada pelo HitManager quando os hits não são
+    exportados, de modo que URL, navegador, parâmetros da ação e demais atributos do Hit não permaneçam em memória
+    """
+    __slots__ = ('server_time', 'session_id', 'pid', 'format', 'lang', 'issn', 'content_type', 'hit_type', 'action_name')
+
+    def __init__(self, hit: Hit):
+        self.server_time = hit.server_time
+        self.session_id = hit.session_id
+        self.pid = hit.pid
+        self.format = hit.format
+        self.lang = hit.lang
+        self.issn = hit.issn
+        self.content_type = hit.content_type
+        self.hit_type = hit.hit_type
+
+        # Usado apenas nos grupos platform e others
+        self.action_name = '' if hit.hit_type in (at.HIT_TYPE_ARTICLE, at.HIT_TYPE_ISSUE, at.HIT_TYPE_JOURNAL) else hit.action_name
+
+
+class ActionAttrsCache:
+    """
+    Cache LRU de atributos derivados da URL de ação de um Hit, indexado por (coleção, action_name)
+    """
+    # Atributos derivados exclusivamente da URL de ação e dos dicionários
+    ATTRS = ('action_name', 'action_params', 'pid', 'acronym', 'format', 'lang', 'script', 'issn',
+             'content_type', 'hit_type', 'yop', 'valid')
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.data = OrderedDict()
+        self.hit_counter = 0
+        self.miss_counter = 0
+
+    def get(self, key, pid_to_issn_version):
+        """
+        Obtém os atributos associados a uma chave
+
+        @param key: uma tupla (coleção, action_name)
+        @param pid_to_issn_version: versão atual do dicionário pid_to_issn
+        @return: uma tupla (atributos, URL associa PID a ISSN) ou None, caso a chave não esteja no cache ou o registro
+        esteja desatualizado
+        """
+        entry = self.data.get(key)
+
+        if entry is not None:
+            attrs, version, updates_pid_to_issn = entry
+
+            # Registros que dependem de pid_to_issn só são válidos para a versão em que foram gerados
+            if version is None or version == pid_to_issn_version:
+                self.data.move_to_end(key)
+                self.hit_counter += 1
+                return attrs, updates_pid_to_issn
+
+        self.miss_counter += 1
+
+    def put(self, key, attrs, pid_to_issn_version=None, updates_pid_to_issn=False):
+        """
+        Armazena os atributos associados a uma chave, descartando o registro usado há mais tempo se necessário
+
+        @param key: uma tupla (coleção, action_name)
+        @param attrs: uma tupla de atributos, na ordem de ActionAttrsCache.ATTRS
+        @param pid_to_issn_version: versão de pid_to_issn usada para obter os atributos, ou None se não foi usada
+        @param updates_pid_to_issn: indica se hits da URL associam PID a ISSN em pid_to_issn
+        """
+        self.data[key] = (attrs, pid_to_issn_version, updates_pid_to_issn)
+        self.data.move_to_end(key)
+
+        if len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+    def extract(self, hit):
+        return tuple(getattr(hit, a) for a in self.ATTRS)
+
+    def apply(self, hit, attrs):
+        for a, v in zip(self.ATTRS, attrs):
+            setattr(hit, a, v)
+
+    def log_stats(self):
+        """
+        Registra em log os contadores de acertos e falhas e os reinicia
+        """
+        total = self.hit_counter + self.miss_counter
+        ratio = 100 * self.hit_counter / total if total else 0.0
+        logging.info('Cache de ações: %d acertos, %d falhas (%.2f%%), %d registros' % (self.hit_counter,
+                                                                                     self.miss_counter,
+                                                                                     ratio,
+                                                                                     len(self.data)))
+        self.hit_counter = 0
+        self.miss_counter = 0
+
+
+class ActionNameTable:
+    """
+    Tabela de URLs de ação de um domínio. Associa cada URL, tal como registrada na pré-tabela, a um identificador
+    inteiro e guarda sua forma canônica (unida ao domínio). Hits guardam apenas o identificador e a tabela, e a união
+    ao domínio ocorre uma vez por URL. Outras formas da URL (por exemplo, em minúsculas) são registradas sob demanda,
+    com identificador próprio. Formas iguais compartilham o mesmo objeto str.
+    A tabela não é esvaziada: quando atinge o tamanho máximo, novas URLs deixam de ser registradas (ver
+    HitManager.reset, que descarta a tabela a cada descarga de hits, de modo que a próxima descarga usa uma nova tabela)
+    """
+    def __init__(self, domain, max_size):
+        self.domain = domain
+        self.max_size = max_size
+
+        # URL da pré-tabela -> identificador
+        self.ids = {}
+
+        # Forma registrada por get_name_id -> identificador
+        self.name_ids = {}
+
+        # Identificador -> URL
+        self.names = []
+
+        # Identificador -> identificador da forma em minúsculas
+        self.lower_ids = {}
+
+    def _add_name(self, name):
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def get_id(self, action_name):
+        """
+        Obtém o identificador de uma URL de ação, registrando-a caso seja nova
+
+        @param action_name: URL de ação, tal como registrada na pré-tabela
+        @return: identificador da URL ou None, se a tabela estiver cheia
+        """
+        action_id = self.ids.get(action_name)
+
+        if action_id is None:
+            if len(self.names) >= self.max_size:
+                return
+
+            name = urljoin(self.domain, action_name)
+            action_id = self._add_name(action_name if name == action_name else name)
+            self.ids[action_name] = action_id
+
+        return action_id
+
+    def get_name_id(self, name):
+        """
+        Obtém o identificador de uma forma de URL de ação já unida ao domínio, registrando-a caso seja nova
+
+        @param name: URL de ação
+        @return: identificador da URL ou None, se a tabela estiver cheia
+        """
+        action_id = self.name_ids.get(name)
+
+        if action_id is None:
+            if len(self.names) >= self.max_size:
+                return
+
+            action_id = self._add_name(name)
+            self.name_ids[name] = action_id
+
+        return action_id
+
+    def get_lower_id(self, action_id):
+        """
+        Obtém o identificador da forma em minúsculas de uma URL de ação
+
+        @param action_id: identificador da URL
+        @return: identificador da URL em minúsculas ou None, se a tabela estiver cheia
+        """
+        lower_id = self.lower_ids.get(action_id)
+
+        if lower_id is None:
+            name = self.names[action_id]
+            name_lower = name.lower()
+
+            lower_id = action_id if name_lower == name else self.get_name_id(name_lower)
+            if lower_id is None:
+                return
+
+            self.lower_ids[action_id] = lower_id
+
+        return lower_id
+
+    def __len__(self):
+        return len(self.names)
+
+
 class HitManager:
     """
     Classe que gerencia objetos Hit
     """
-    def __init__(self, path_pdf_to_pid, issn_to_acronym, pid_to_format_lang, pid_to_yop):
+    def __init__(self, path_pdf_to_pid, issn_to_acronym, pid_to_format_lang, pid_to_yop, action_cache_size=0, action_table_size=ACTION_TABLE_SIZE,
+                 streaming=False, keep_hits=True):
         self.hits = {'article': {}, 'issue': {}, 'journal': {}, 'platform': {}, 'others': {}}
 
+        # Modo streaming: as métricas são calculadas a cada troca de IP (ver count_ip_hits) e self.hits guarda apenas
+        # os hits do IP atual. Os hits já contabilizados são mantidos em counted_hits somente se keep_hits for True.
+        # Se keep_hits for False, os hits não são exportados e são guardados como CountedHit (ver add_hit)
+        self.streaming = streaming
+        self.keep_hits = keep_hits
+        self.current_ip = None
+        self.counter_stat = CounterStat()
+        self.counted_hits = {'article': {}, 'issue': {}, 'journal': {}, 'platform': {}, 'others': {}}
+        self.counted_hits_counter = 0
+
+        # Modo streaming: função que exporta os hits de artigos de cada IP contabilizado (sessão -> chave -> [hits]).
+        # Se definida, counted_hits guarda apenas os hits cujo ISSN depende de pid_to_issn (ver count_ip_hits)
+        self.hits_exporter = None
+
+        # Cliques duplos detectados em add_hit: (grupo, sessão, chave) -> posições dos hits a serem removidos
+        self.double_clicks = {}
+
+        # Listas (grupo, sessão, chave) cujos hits chegaram fora de ordem cronológica
+        self.unsorted_hits = set()
+
         # Dicionários para tratamento de PID
         self.pdf_path_to_pid = path_pdf_to_pid
         self.issn_to_acronym = issn_to_acronym
@@ -129,6 +436,21 @@ class HitManager:
         self.pid_to_yop = pid_to_yop
         self.pid_to_issn = {}
 
+        # Versão de pid_to_issn, incrementada a cada alteração do dicionário
+        self.pid_to_issn_version = 0
+
+        # Resultados das consultas a pid_to_issn (PID -> ISSNs obtidos), registrados apenas se não for None
+        # (ver reset_pid_to_issn)
+        self.pid_to_issn_lookups = None
+
+        # Cache de atributos derivados da URL de ação (desabilitado se tamanho for zero)
+        self.action_cache = ActionAttrsCache(action_cache_size) if action_cache_size > 0 else None
+
+        # Tabela de URLs de ação, criada para o domínio do primeiro Hit e descartada em reset (desabilitada se tamanho
+        # for zero)
+        self.action_table_size = action_table_size
+        self.action_table = None
+
         # Gera um dicionário reverso de acrônimos
         self.acronym_to_issn = self._generate_acronym_to_issn()
 
@@ -153,13 +475,16 @@ class HitManager:
         """
         Cria objeto Hit
 
-        @param row: um objeto LogLinkVisitAction
+        @param row: um objeto LogLinkVisitAction, um dicionário (linha de pré-tabela) ou um objeto PretableRecord
         @param mode: possui o valor `file` se crição é a partir de arquivo ou `sql` se é a partir de base de dados
         @param default_collection: coleção
         @return: um objeto Hit
         """
-        row.update({'domain': domain})
-        new_hit = Hit(**row)
+        if isinstance(row, lib_pretable.PretableRecord):
+            new_hit = Hit.from_record(row, domain, self._get_action_table(domain))
+        else:
+            row.update({'domain': domain})
+            new_hit = Hit(**row)
 
         if new_hit.is_valid_hit():
             # Caso Hit tenha um conteúdo válido, Obtém outros atributos
@@ -172,32 +497,117 @@ class HitManager:
         # Caso Hit seja ou inválido ou não rastreável
         return
 
+    def _get_action_table(self, domain):
+        """
+        Obtém a tabela de URLs de ação do domínio, recriando-a caso o domínio seja outro
+        """
+        if self.action_table_size <= 0:
+            return
+
+        if self.action_table is None or self.action_table.domain != domain:
+            self.action_table = ActionNameTable(domain, self.action_table_size)
+
+        return self.action_table
+
+    @staticmethod
+    def _get_action_name_lower(hit):
+        """
+        Obtém a URL de ação de um Hit em minúsculas, a partir da tabela de URLs quando o Hit está nela registrado
+        """
+        if hit.action_table is not None:
+            lower_id = hit.action_table.get_lower_id(hit.action_id)
+            if lower_id is not None:
+                return hit.action_table.names[lower_id]
+        return hit.action_name.lower()
+
+    @staticmethod
+    def _set_action_name_lower(hit):
+        """
+        Substitui a URL de ação de um Hit por sua forma em minúsculas
+        """
+        if hit.action_table is not None:
+            lower_id = hit.action_table.get_lower_id(hit.action_id)
+            if lower_id is not None:
+                hit.action_id = lower_id
+                return
+        hit.action_name = hit.action_name.lower()
+
     def set_hit_attrs(self, hit, default_collection):
         """
         Seta os atributos de um Hit usando dados do Hit Manager
 
         @hit: um objeto Hit
         """
-        # Gera um ID de sessão
-        hit.session_id = lib_counter.generate_session_id(hit.ip,
-                                                         hit.browser_name,
-                                                         hit.browser_version,
-                                                         hit.server_time)
+        # Gera uma chave de sessão (convertida em ID de sessão str apenas na exportação de hits)
+        hit.session_id = lib_counter.generate_session_key(hit.ip,
+                                                          hit.browser_name,
+                                                          hit.browser_version,
+                                                          hit.server_time)
 
         # Obtém coleção ao qual o Hit pertence
         hit.collection = default_collection
 
+        if self.action_cache is not None:
+            cache_key = (hit.collection, hit.action_name)
+            cached = self.action_cache.get(cache_key, self.pid_to_issn_version)
+
+            if cached is not None:
+                cached_attrs, updates_pid_to_issn = cached
+                self.action_cache.apply(hit, cached_attrs)
+
+                # pid_to_issn é esvaziado a cada pré-tabela (ver reset_pid_to_issn) e volta a ser preenchido também
+                # pelos hits cujos atributos estão em cache
+                if updates_pid_to_issn:
+                    self._update_pid_to_issn(hit.pid, hit.issn)
+                return
+
+        # Obtém classificador de URLs da coleção (construído uma única vez)
+        url_classifier = lib_hit.get_url_classifier(hit.collection)
+
+        # Indica se atributos dependem do conteúdo atual de pid_to_issn e se o Hit associa PID a ISSN em pid_to_issn
+        depends_on_pid_to_issn = False
+        updates_pid_to_issn = False
+
         if hit.collection == 'pre':
-            self._set_hit_attrs_preprint_url(hit)
+            self._set_hit_attrs_preprint_url(hit, url_classifier)
+            updates_pid_to_issn = bool(hit.pid)
         elif hit.collection == 'ssp':
-            self._set_hit_attrs_ssp_url(hit)
+            self._set_hit_attrs_ssp_url(hit, url_classifier)
+            updates_pid_to_issn = hit.hit_type == at.HIT_TYPE_ARTICLE
         else:
-            if lib_hit.is_new_url_format(hit.action_name.lower()):
-                self._set_hit_attrs_new_url(hit)
+            if url_classifier.is_new_url_format(self._get_action_name_lower(hit)):
+                self._set_hit_attrs_new_url(hit, url_classifier)
+                updates_pid_to_issn = hit.hit_type == at.HIT_TYPE_ARTICLE
             else:
-                self._set_hit_attrs_classic_url(hit)
+                self._set_hit_attrs_classic_url(hit, url_classifier)
+
+                # ISSN de PID fora do padrão S + ISSN + código é obtido por meio de pid_to_issn
+                depends_on_pid_to_issn = not lib_hit.pid_contains_issn(hit.pid)
+
+        if self.action_cache is not None:
+            self.action_cache.put(cache_key,
+                                  self.action_cache.extract(hit),
+                                  self.pid_to_issn_version if depends_on_pid_to_issn else None,
+                                  updates_pid_to_issn)
 
-    def _set_hit_attrs_new_url(self, hit):
+    def _update_pid_to_issn(self, pid, issn):
+        """
+        Associa um ISSN a um PID no dicionário pid_to_issn
+
+        @param pid: PID de um artigo
+        @param issn: ISSN do periódico do artigo
+        """
+        if pid not in self.pid_to_issn:
+            if issn:
+                self.pid_to_issn[pid] = {issn}
+                self.pid_to_issn_version += 1
+        elif issn not in self.pid_to_issn[pid]:
+            self.pid_to_issn[pid].add(issn)
+            self.pid_to_issn_version += 1
+            if len(self.pid_to_issn[pid]) > 2:
+                logging.warning('PID %s está associado a mais de dois ISSNs: %s' % (pid, self.pid_to_issn[pid]))
+
+    def _set_hit_attrs_new_url(self, hit, url_classifier):
         hit.action_params = lib_hit.get_url_params_from_action_new_url(hit.action_name)
 
         hit.pid = hit.action_params['pid']
@@ -217,30 +627,23 @@ class HitManager:
         if hit.pid not in self.pid_to_format_lang.get(hit.collection, {}):
             hit.valid = False
 
-        hit.content_type = lib_hit.get_content_type_new_url(hit)
-        hit.hit_type = lib_hit.get_hit_type_new_url(hit.action_name.lower())
+        hit.hit_type, hit.content_type = url_classifier.classify_new_url(hit)
 
         if hit.hit_type == at.HIT_TYPE_ARTICLE:
             # Dicionário de acrônimos não contém coleção nbr - os dados são idênticos ao da coleção scl
             collection_to_check = 'scl' if hit.collection == 'nbr' else hit.collection
 
-            if 'issn' not in hit.__dict__.keys() or not hit.issn:
+            if not hit.issn:
                 hit.issn = self.acronym_to_issn.get(collection_to_check, {}).get(hit.acronym, [''])[0].upper()
 
-            if hit.pid not in self.pid_to_issn:
-                if hit.issn:
-                    self.pid_to_issn[hit.pid] = {hit.issn}
-            else:
-                self.pid_to_issn[hit.pid].add(hit.issn)
-                if len(self.pid_to_issn[hit.pid]) > 2:
-                    logging.warning('PID %s está associado a mais de dois ISSNs: %s' % (hit.pid, self.pid_to_issn[hit.pid]))
+            self._update_pid_to_issn(hit.pid, hit.issn)
 
             hit.yop = lib_hit.get_year_of_publication_new_url(hit, self.pid_to_yop)
             if not hit.lang or not hit.has_valid_language():
                 hit.lang = lib_hit.get_language_new_url(hit, self.pid_to_format_lang)
 
-    def _set_hit_attrs_classic_url(self, hit):
-        hit.action_name = hit.action_name.lower()
+    def _set_hit_attrs_classic_url(self, hit, url_classifier):
+        self._set_action_name_lower(hit)
 
         # Extrai parâmetros da URL de ação de um Hit
         hit.action_params = lib_hit.get_url_params_from_action(hit.action_name)
@@ -255,16 +658,10 @@ class HitManager:
         if not hit.pid:
             hit.pid = lib_hit.get_pid_from_pdf_path(hit, self.pdf_path_to_pid)
 
-        # Obtém o tipo de conteúdo associado ao Hit
-        hit.content_type = lib_hit.get_content_type(hit)
-
-        # Obtém o formato do Hit (PDF ou HTML)
-        hit.format = lib_hit.get_format(hit)
-
-        # Obtém o tipo de Hit
-        hit.hit_type = lib_hit.get_hit_type(hit)
+        # Obtém o tipo de Hit, o tipo de conteúdo associado ao Hit e o formato do Hit (PDF ou HTML)
+        hit.hit_type, hit.content_type, hit.format = url_classifier.classify_classic_url(hit)
 
-        hit.issn = lib_hit.article_pid_to_journal_issn(hit.pid, self.pid_to_issn)
+        hit.issn = self.get_journal_issn(hit.pid)
         hit.acronym = lib_hit.get_journal_acronym(hit, self.issn_to_acronym)
         if not hit.issn:
             hit.issn = lib_hit.get_issn(hit, self.acronym_to_issn)
@@ -273,54 +670,161 @@ class HitManager:
             hit.yop = lib_hit.get_year_of_publication(hit, self.pid_to_yop)
             hit.lang = lib_hit.get_language(hit, self.pid_to_format_lang)
 
-    def _set_hit_attrs_preprint_url(self, hit):
+    def _set_hit_attrs_preprint_url(self, hit, url_classifier):
         hit.issn = values.GENERIC_ISSN
-        hit.pid = lib_hit.get_pid_preprint(hit)
+        hit.hit_type, hit.content_type, hit.pid = url_classifier.classify_preprint_url(hit.action_name)
 
         if hit.pid:
-            hit.hit_type = lib_hit.ma.HIT_TYPE_ARTICLE
             if hit.pid not in self.pid_to_issn:
                 self.pid_to_issn[hit.pid] = {hit.issn}
-        else:
-            hit.hit_type = lib_hit.ma.HIT_TYPE_OTHERS
+                self.pid_to_issn_version += 1
 
-        hit.content_type = lib_hit.get_content_type_preprints(hit)
         hit.format = lib_hit.get_format_preprints(hit)
         hit.lang = lib_hit.get_language_preprints(hit, self.pid_to_format_lang)
         hit.yop = lib_hit.get_year_of_publication_preprints(hit, self.pid_to_yop)
 
-    def _set_hit_attrs_ssp_url(self, hit):
+    def _set_hit_attrs_ssp_url(self, hit, url_classifier):
         hit.action_params = lib_hit.get_url_params_from_action_ssp_url(hit.action_name)
 
         hit.acronym = hit.action_params['acronym'].lower()
         hit.format = hit.action_params['format'].lower()
         hit.lang = hit.action_params['lang'].lower()
-        hit.content_type = lib_hit.get_content_type_ssp_url(hit)
-        hit.hit_type = lib_hit.get_hit_type_ssp(hit.action_name.lower())
+        hit.hit_type, hit.content_type = url_classifier.classify_ssp_url(self._get_action_name_lower(hit))
 
         if hit.hit_type == at.HIT_TYPE_ARTICLE:
             hit.pid = lib_hit.get_ssp_pid(hit.action_params)
             hit.issn = self.acronym_to_issn.get('spa', {}).get(hit.acronym, [''])[0].upper()
 
-            if hit.pid not in self.pid_to_issn:
-                if hit.issn:
-                    self.pid_to_issn[hit.pid] = {hit.issn}
-            else:
-                self.pid_to_issn[hit.pid].add(hit.issn)
-                if len(self.pid_to_issn[hit.pid]) > 2:
-                    logging.warning('PID %s está associado a mais de dois ISSNs: %s' %(hit.pid, self.pid_to_issn[hit.pid]))
+            self._update_pid_to_issn(hit.pid, hit.issn)
 
             hit.yop = lib_hit.get_year_of_publication_ssp_pid(hit.pid)
             if not hit.lang or not hit.has_valid_language():
                 hit.lang = lib_hit.get_language_ssp(hit.pid, self.pid_to_format_lang)
 
+    def get_journal_issn(self, pid):
+        """
+        Obtém o ISSN do periódico de um artigo (ver lib_hit.article_pid_to_journal_issn), registrando em
+        pid_to_issn_lookups o resultado das consultas a pid_to_issn
+
+        @param pid: o PID de um artigo
+        @return: o ISSN do periódico ou str vazia
+        """
+        issn = lib_hit.article_pid_to_journal_issn(pid, self.pid_to_issn)
+
+        if self.pid_to_issn_lookups is not None and not lib_hit.pid_contains_issn(pid):
+            self.pid_to_issn_lookups.setdefault(pid, set()).add(issn)
+
+        return issn
+
+    def reset_pid_to_issn(self, track_lookups=False):
+        """
+        Esvazia o dicionário pid_to_issn, obtido a partir dos hits, para que os resultados de uma pré-tabela (ou data)
+        não dependam das pré-tabelas computadas antes pelo mesmo processo. A versão do dicionário continua a ser
+        incrementada, invalidando os registros do cache de ações que dependem dele
+
+        @param track_lookups: registra as consultas a pid_to_issn em pid_to_issn_lookups (ver get_journal_issn)
+        """
+        self.pid_to_issn = {}
+        self.pid_to_issn_version += 1
+        self.pid_to_issn_lookups = {} if track_lookups else None
+
     def reset(self):
         """
         Limpa registros do HitManager
         """
         self.hits = {'article': {}, 'issue': {}, 'journal': {}, 'platform': {}, 'others': {}}
+        self.double_clicks = {}
+        self.unsorted_hits = set()
+
+        self.current_ip = None
+        self.counter_stat = CounterStat()
+        self.counted_hits = {'article': {}, 'issue': {}, 'journal': {}, 'platform': {}, 'others': {}}
+        self.counted_hits_counter = 0
+
+        # Hits já criados mantêm a tabela de URLs em que foram registrados
+        self.action_table = None
+
+    def count_hits(self):
+        """
+        Obtém o número de hits registrados no HitManager (no modo streaming, inclui os hits já contabilizados)
+        """
+        return self.counted_hits_counter + sum([len(hits) for session_key_hits in self.hits.values() for key_hits in session_key_hits.values() for hits in key_hits.values()])
+
+    def count_ip_hits(self):
+        """
+        Modo streaming: remove cliques duplos dos hits do IP atual e os contabiliza em self.counter_stat.
+        Como as pré-tabelas são ordenadas por IP, as sessões (IP, agente de usuário e hora) de um IP estão completas
+        na troca de IP. Em seguida, se keep_hits for True, os hits são exportados por hits_exporter ou, se não houver
+        exportador, movidos para counted_hits; caso contrário, são descartados
+        """
+        self.counted_hits_counter = self.count_hits()
+
+        self.remove_double_clicks()
+        self.counter_stat.calculate_metrics(self.hits)
+
+        if self.keep_hits:
+            if self.hits_exporter is not None:
+                self._export_ip_hits()
+            else:
+                self._keep_counted_hits(self.hits)
+
+        self.hits = {'article': {}, 'issue': {}, 'journal': {}, 'platform': {}, 'others': {}}
+
+    def _export_ip_hits(self):
+        """
+        Modo streaming: exporta os hits de artigos do IP atual por meio de hits_exporter. Hits de PIDs fora do padrão
+        S + ISSN + código são mantidos em counted_hits até a descarga, pois seu ISSN é obtido de pid_to_issn, que
+        depende dos demais hits do bucket
+        """
+        ready_hits = {}
+        pending_hits = {}
+
+        for session, key_hits in self.hits['article'].items():
+            for key, hits in key_hits.items():
+                target = ready_hits if lib_hit.pid_contains_issn(key[0]) else pending_hits
+                target.setdefault(session, {})[key] = hits
+
+        if ready_hits:
+            self.hits_exporter(ready_hits)
+
+        if pending_hits:
+            self._keep_counted_hits({'article': pending_hits})
+
+    def _keep_counted_hits(self, hits):
+        """
+        Modo streaming: move hits já contabilizados para counted_hits
+        """
+        for group, session_key_hits in hits.items():
+            counted_session_key_hits = self.counted_hits[group]
+
+            for session, key_hits in session_key_hits.items():
+                if session not in counted_session_key_hits:
+                    counted_session_key_hits[session] = key_hits
+                else:
+                    for key, hits_list in key_hits.items():
+                        counted_session_key_hits[session].setdefault(key, []).extend(hits_list)
+
+    def log_action_cache_stats(self):
+        """
+        Registra em log as estatísticas do cache de ações, caso esteja habilitado
+        """
+        if self.action_cache is not None:
+            self.action_cache.log_stats()
 
     def add_hit(self, hit: Hit):
+        """
+        Adiciona um Hit ao HitManager, agrupado por sessão e chave.
+        Cliques duplos são detectados à medida que os hits são adicionados: como as pré-tabelas são ordenadas por IP
+        e os hits de um IP chegam, em geral, em ordem cronológica, cada hit é comparado apenas ao anterior da mesma lista.
+        Listas com hits fora de ordem são ordenadas e tratadas por completo em remove_double_clicks.
+        Se os hits não forem exportados (keep_hits for False), é guardada apenas sua forma reduzida (ver CountedHit)
+
+        @param hit: um objeto Hit
+        """
+        if self.streaming and hit.ip != self.current_ip:
+            self.count_ip_hits()
+            self.current_ip = hit.ip
+
         if hit.hit_type == at.HIT_TYPE_ARTICLE:
             key = (hit.pid, hit.format, hit.lang, hit.latitude, hit.longitude, hit.yop)
             group = 'article'
@@ -338,37 +842,68 @@ class HitManager:
             key = ('others', hit.latitude, hit.longitude)
             group = 'others'
 
-        if hit.session_id not in self.hits[group]:
-            self.hits[group][hit.session_id] = {}
+        if not self.keep_hits:
+            hit = CountedHit(hit)
+
+        key_hits = self.hits[group].get(hit.session_id)
+        if key_hits is None:
+            key_hits = self.hits[group][hit.session_id] = {}
 
-        if key not in self.hits[group][hit.session_id]:
-            self.hits[group][hit.session_id][key] = []
+        hits = key_hits.get(key)
+        if hits is None:
+            key_hits[key] = [hit]
+            return
 
-        self.hits[group][hit.session_id][key].append(hit)
+        past_hit = hits[-1]
+
+        if hit.server_time < past_hit.server_time:
+            self.unsorted_hits.add((group, hit.session_id, key))
+
+        elif lib_counter.is_double_click(group, past_hit, hit):
+            # O hit anterior é um clique duplo do atual e será removido
+            self.double_clicks.setdefault((group, hit.session_id, key), []).append(len(hits) - 1)
+
+        hits.append(hit)
 
     def remove_double_clicks(self):
         """
         Remove cliques duplos. São comparados os hits dentro de uma sessão.
+        Apenas as listas com cliques duplos detectados em add_hit ou com hits fora de ordem são alteradas
         """
-        for group, session_key_hits in self.hits.items():
-            for session, key_hits in session_key_hits.items():
-                for key, hits in key_hits.items():
-                    cleaned_hits = []
-
-                    if len(hits) > 1:
-                        sorted_hits = sorted(hits, key=lambda x: x.server_time)
-
-                        for i in range(len(sorted_hits) - 1):
-                            past_hit = sorted_hits[i]
-                            current_hit = sorted_hits[i + 1]
-
-                            if not lib_counter.is_double_click(group, past_hit, current_hit):
-                                cleaned_hits.append(past_hit)
-                                if i + 2 == len(sorted_hits):
-                                    cleaned_hits.append(current_hit)
-                            elif i + 2 == len(sorted_hits):
-                                cleaned_hits.append(current_hit)
-                    else:
-                        cleaned_hits.extend(hits)
-
-                    key_hits[key] = cleaned_hits
+        for group, session, key in self.unsorted_hits:
+            key_hits = self.hits[group][session]
+            key_hits[key] = self._remove_double_clicks_from_unsorted_hits(group, key_hits[key])
+
+        for hits_key, positions in self.double_clicks.items():
+            if hits_key in self.unsorted_hits:
+                continue
+
+            group, session, key = hits_key
+            key_hits = self.hits[group][session]
+
+            removed = set(positions)
+            key_hits[key] = [h for i, h in enumerate(key_hits[key]) if i not in removed]
+
+        self.double_clicks = {}
+        self.unsorted_hits = set()
+
+    def _remove_double_clicks_from_unsorted_hits(self, group, hits):
+        """
+        Ordena hits por horário e remove cliques duplos, comparando cada hit ao seguinte
+        """
+        cleaned_hits = []
+
+        sorted_hits = sorted(hits, key=lambda x: x.server_time)
+
+        for i in range(len(sorted_hits) - 1):
+            past_hit = sorted_hits[i]
+            current_hit = sorted_hits[i + 1]
+
+            if not lib_counter.is_double_click(group, past_hit, current_hit):
+                cleaned_hits.append(past_hit)
+                if i + 2 == len(sorted_hits):
+                    cleaned_hits.append(current_hit)
+            elif i + 2 == len(sorted_hits):
+                cleaned_hits.append(current_hit)
+
+        return cleaned_hits
@@ -0,0 +1,141 @@
+"""
+Micro-benchmark do cálculo de métricas COUNTER (CounterStat) sobre um conjunto sintético de hits.
+
+Compara a implementação anterior (quatro passagens por bucket, listas de content_types e datas com zfill)
+com a implementação atual em passagem única e, se numpy estiver instalado, com o motor colunar.
+
+Uso (a partir da raiz do repositório):
+    python -m others.benchmark_counter --hits 1000000
+"""
+import argparse
+import datetime
+import random
+
+from time import time
+
+from models.counter import CounterStat, ColumnarCounterStat, np
+from utils import dicts, map_metrics as mm
+
+
+class SyntheticHit:
+    __slots__ = ('session_id', 'content_type', 'hit_type', 'server_time')
+
+    def __init__(self, session_id, content_type, hit_type, server_time):
+        self.session_id = session_id
+        self.content_type = content_type
+        self.hit_type = hit_type
+        self.server_time = server_time
+
+
+class LegacyCounterStat(CounterStat):
+    """
+    Reprodução da implementação anterior de CounterStat, usada como referência
+    """
+    LEGACY_ITEM_REQUESTS = {'article': mm.COUNTER_ARTICLE_ITEM_REQUESTS}
+    LEGACY_ITEM_INVESTIGATIONS = {'article': mm.COUNTER_ARTICLE_ITEM_INVESTIGATIONS}
+
+    def _get_total(self, hits, hit_type, content_type_list):
+        return sum([1 for x in hits if x.hit_type == hit_type and x.content_type in content_type_list])
+
+    def _get_unique(self, hits, hit_type, content_type_list):
+        session_to_content_types = {}
+        for h in [h for h in hits if h.hit_type == hit_type and h.content_type in content_type_list]:
+            session_to_content_types.setdefault(h.session_id, {}).setdefault(h.content_type, []).append(h)
+        return sum([len(v) for v in session_to_content_types.values()])
+
+    def _calculate(self, datefied_hits, key, target, group):
+        group_hit_type = dicts.group_to_hit_type[group]
+        group_item_requests = self.LEGACY_ITEM_REQUESTS[group]
+        group_item_investigations = self.LEGACY_ITEM_INVESTIGATIONS[group]
+
+        for ymd in datefied_hits:
+            if key not in target:
+                target[key] = {}
+
+            if ymd not in target[key]:
+                target[key][ymd] = dicts.counter_item_metrics.copy()
+
+            hits = datefied_hits[ymd]
+            target[key][ymd]['total_item_requests'] += self._get_total(hits, group_hit_type, group_item_requests)
+            target[key][ymd]['total_item_investigations'] += self._get_total(hits, group_hit_type, group_item_investigations)
+            target[key][ymd]['unique_item_requests'] += self._get_unique(hits, group_hit_type, group_item_requests)
+            target[key][ymd]['unique_item_investigations'] += self._get_unique(hits, group_hit_type, group_item_investigations)
+
+            if sum(target[key][ymd].values()) == 0:
+                del target[key][ymd]
+
+    def get_datefied_hits(self, hits):
+        date_to_hits = {}
+        for hit in hits:
+            year_month_day = '-'.join([str(hit.server_time.year),
+                                       str(hit.server_time.month).zfill(2),
+                                       str(hit.server_time.day).zfill(2)])
+            date_to_hits.setdefault(year_month_day, []).append(hit)
+        return date_to_hits
+
+
+def generate_hits(n_hits, n_keys, n_days, seed):
+    """
+    Gera hits sintéticos do grupo article no formato sessão -> chave -> [hits]
+
+    @param n_hits: número de hits
+    @param n_keys: número de chaves (artigos) distintas
+    @param n_days: número de dias distintos
+    @param seed: semente do gerador aleatório
+    @return: dicionário no formato de HitManager.hits
+    """
+    random.seed(seed)
+
+    content_types = sorted(dicts.group_to_item_investigations['article']) + [-1]
+    hit_type = dicts.group_to_hit_type['article']
+    start = datetime.datetime(2021, 1, 1)
+
+    data = {'article': {}}
+    n = 0
+    while n < n_hits:
+        session_id = 'ip-%d|agent|%d' % (n, random.randint(0, 23))
+        key_hits = data['article'].setdefault(session_id, {})
+
+        for _ in range(random.randint(1, 4)):
+            key = ('pid-%d' % random.randint(0, n_keys), 'html', 'pt', '', '', '2020')
+            hits = key_hits.setdefault(key, [])
+
+            for _ in range(random.randint(1, 6)):
+                server_time = start + datetime.timedelta(days=random.randint(0, n_days - 1), seconds=random.randint(0, 86399))
+                hits.append(SyntheticHit(session_id, random.choice(content_types), hit_type, server_time))
+                n += 1
+
+    return data, n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hits', type=int, default=1000000, help='Número de hits sintéticos')
+    parser.add_argument('--keys', type=int, default=50000, help='Número de chaves (artigos) distintas')
+    parser.add_argument('--days', type=int, default=3, help='Número de dias distintos')
+    parser.add_argument('--seed', type=int, default=1)
+    params = parser.parse_args()
+
+    data, n = generate_hits(params.hits, params.keys, params.days, params.seed)
+    print('Hits gerados: %d' % n)
+
+    engines = [('anterior', LegacyCounterStat), ('passagem única', CounterStat)]
+    if np is not None:
+        engines.append(('colunar (numpy)', ColumnarCounterStat))
+
+    reference = None
+    reference_time = None
+    for name, engine in engines:
+        cs = engine()
+        time_start = time()
+        cs.calculate_metrics(data)
+        elapsed = time() - time_start
+
+        if reference is None:
+            reference, reference_time = cs.metrics, elapsed
+
+        print('%-16s %7.2fs  speedup %5.2fx  resultado idêntico: %s' % (name, elapsed, reference_time / elapsed, cs.metrics == reference))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark da leitura de pré-tabelas: csv.DictReader + Hit(**linha) com strptime (caminho anterior)
+versus lib_pretable.iter_records + Hit.from_record e, se numpy estiver instalado, versus cache colunar
+(lib_columnar.iter_columnar_records + Hit.from_record).
+
+Uso (a partir da raiz do repositório):
+    python -m others.benchmark_pretable_reader --lines 5000000
+    python -m others.benchmark_pretable_reader --file /app/data/pretables/2021-03-01.tsv
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import tempfile
+
+from datetime import datetime
+from time import time
+
+from libs import lib_columnar, lib_pretable
+from models.hit import Hit
+
+
+ACTIONS = ['http://www.scielo.br/scielo.php?script=sci_arttext&pid=S0102-311X2020000100001&tlng=pt',
+           'http://www.scielo.br/scielo.php?script=sci_pdf&pid=S0034-89102019000200003&lng=en',
+           'https://www.scielo.br/j/csp/a/abcDEF123/?lang=pt&format=html',
+           'https://www.scielo.br/j/rsp/i/2020.v36n1/',
+           'http://www.scielo.br/pdf/csp/v36n1/1678-4464-csp-36-01-e001.pdf']
+
+
+def generate_pretable(path, n_lines, seed):
+    """
+    Gera uma pré-tabela sintética, ordenada por IP, no formato de scripts/extract_pretable.sh
+    """
+    random.seed(seed)
+
+    with open(path, 'w') as f:
+        f.write('\t'.join(lib_pretable.PRETABLE_COLUMNS) + '\n')
+        for i in range(n_lines):
+            f.write('\t'.join(['2021-03-01 %02d:%02d:%02d' % (random.randint(0, 23), random.randint(0, 59), random.randint(0, 59)),
+                               random.choice(['Chrome', 'Firefox', 'Safari']),
+                               random.choice(['90.0', '88.0', '14.1']),
+                               '10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i >> 2 & 255),
+                               '-23.5',
+                               '-46.6',
+                               random.choice(ACTIONS)]) + '\n')
+
+
+def read_with_dict_reader(path, domain):
+    n = 0
+    with open(path, errors='ignore') as data:
+        for row in csv.DictReader(data, delimiter='\t'):
+            row['serverTime'] = datetime.strptime(row['serverTime'], '%Y-%m-%d %H:%M:%S')
+            row.update({'domain': domain})
+            Hit(**row)
+            n += 1
+    return n
+
+
+def read_with_records(path, domain):
+    n = 0
+    with open(path, errors='ignore') as data:
+        for record in lib_pretable.iter_records(data):
+            Hit.from_record(record, domain)
+            n += 1
+    return n
+
+
+def read_with_columnar_cache(path, domain):
+    n = 0
+    for record in lib_columnar.iter_columnar_records(path + '.columnar'):
+        Hit.from_record(record, domain)
+        n += 1
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=5000000, help='Número de linhas da pré-tabela sintética')
+    parser.add_argument('--file', help='Pré-tabela existente (dispensa a geração de arquivo sintético)')
+    parser.add_argument('--domain', default='www.scielo.br')
+    parser.add_argument('--seed', type=int, default=1)
+    params = parser.parse_args()
+
+    path = params.file
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), '2021-03-01.tsv')
+        print('Gerando pré-tabela sintética com %d linhas em %s...' % (params.lines, path))
+        generate_pretable(path, params.lines, params.seed)
+
+    readers = [('csv.DictReader', read_with_dict_reader), ('iter_records', read_with_records)]
+
+    if lib_columnar.np is not None:
+        time_start = time()
+        with open(path, errors='ignore') as data:
+            lib_columnar.write_columnar_pretable(lib_pretable.iter_records(data), path + '.columnar')
+        print('Conversão em cache colunar: %.2fs' % (time() - time_start))
+        readers.append(('cache colunar', read_with_columnar_cache))
+
+    try:
+        reference_time = None
+        for name, reader in readers:
+            time_start = time()
+            n = reader(path, params.domain)
+            elapsed = time() - time_start
+
+            if reference_time is None:
+                reference_time = elapsed
+
+            print('%-16s %d linhas %8.2fs  %9.0f linhas/s  speedup %5.2fx' % (name, n, elapsed, n / elapsed, reference_time / elapsed))
+    finally:
+        if os.path.isdir(path + '.columnar'):
+            shutil.rmtree(path + '.columnar')
+
+        if not params.file:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -75,8 +75,12 @@ def save(response, filename):
     if not os.path.exists(DIR_DICTIONARIES):
         os.makedirs(DIR_DICTIONARIES)
 
+    # Um documento por linha (JSON Lines), lido documento a documento por create_dictionaries
     try:
-        json.dump(response, open(filepath, 'w'))
+        with open(filepath + '.tmp', 'w') as fout:
+            for doc in response.get('objects', []):
+                fout.write(json.dumps(doc) + '\n')
+        os.replace(filepath + '.tmp', filepath)
     except FileExistsError:
         logging.error('Arquivo %s já existe' % filepath)
 
@@ -92,7 +96,7 @@ def _extract_total_and_limit(response):
 
 
 def _generate_filename(prefix, from_date, until_date, offset):
-    return f'{prefix}-{from_date}-{until_date}-offset-{str(offset)}.json'
+    return f'{prefix}-{from_date}-{until_date}-offset-{str(offset)}.jsonl'
 
 
 def _collect_and_save(from_date, until_date, offset, prefix):
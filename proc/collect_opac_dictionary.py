@@ -67,14 +67,18 @@ def save(response, filename):
     if not os.path.exists(DIR_DICTIONARIES):
         os.makedirs(DIR_DICTIONARIES)
 
+    # Um documento por linha (JSON Lines, registros {pid: dados}), lido documento a documento por create_dictionaries
     try:
-        json.dump(response, open(filepath, 'w'))
+        with open(filepath + '.tmp', 'w') as fout:
+            for pid, values in response.get('documents', {}).items():
+                fout.write(json.dumps({pid: values}) + '\n')
+        os.replace(filepath + '.tmp', filepath)
     except FileExistsError:
         logging.error('Arquivo %s já existe' % filepath)
 
 
 def _generate_filename(prefix, from_date, until_date, page):
-    return f'{prefix}-{from_date}-{until_date}-page-{str(page)}.json'
+    return f'{prefix}-{from_date}-{until_date}-page-{str(page)}.jsonl'
 
 
 def _collect_and_save(from_date, until_date, page, prefix):
@@ -44,7 +44,7 @@ def _extract_doi(identifiers):
 
 
 def _generate_filename(prefix, from_date, until_date):
-    return f'{prefix}-{from_date}-{until_date}.json'
+    return f'{prefix}-{from_date}-{until_date}.jsonl'
 
 
 def parse(record):
@@ -60,14 +60,19 @@ def parse(record):
     }
 
 
-def save(data, filename):
+def save(records, filename):
     filepath = os.path.join(DIR_DICTIONARIES, filename)
 
     if not os.path.exists(DIR_DICTIONARIES):
         os.makedirs(DIR_DICTIONARIES)
 
+    # Um registro {pid: dados} por linha (JSON Lines), gravado à medida que é coletado e lido da mesma forma por
+    # create_dictionaries
     try:
-        json.dump(data, open(filepath, 'w'))
+        with open(filepath + '.tmp', 'w') as fout:
+            for r in records:
+                fout.write(json.dumps(parse(r)) + '\n')
+        os.replace(filepath + '.tmp', filepath)
     except FileExistsError:
         logging.error('Arquivo %s já existe' % filepath)
 
@@ -90,9 +95,5 @@ def main():
     })
 
     logging.info('Obtendo dados do OAI-PMH Preprints para (%s,%s)' % (params.from_date, params.until_date))
-    data = {}
-    for r in records:
-        data.update(parse(r))
-
     filename = _generate_filename(PREPRINT_DICTIONARY_PREFIX, params.from_date, params.until_date)
-    save(data, filename)
+    save(records, filename)
@@ -1,8 +1,10 @@
 import argparse
 import datetime
+import itertools
 import logging
 import os
 
+from libs import lib_dictionary
 from utils import dict_utils, dict_validator, file_utils
 
 
@@ -36,6 +38,207 @@ PREPRINT_DICTIONARY_PREFIX = os.environ.get(
     r'^pre-counter-dict'
 )
 
+DICTIONARY_NAMES = [
+    'pid-issn', 
+    'pid-format-lang',
+    'pdf-pid',
+    'issn-acronym',
+    'pid-dates',
+]
+
+
+def get_new_source_files(files, manifest):
+    """
+    Obtém os arquivos JSON ainda não aplicados (novos ou alterados desde a versão descrita no manifesto)
+
+    @param files: lista de caminhos de arquivos JSON
+    @param manifest: manifesto da versão atual dos dicionários
+    @return: lista de caminhos de arquivos a serem aplicados
+    """
+    applied_sources = manifest.get('sources', {})
+    descriptions = file_utils.describe_files(files)
+
+    return [f for f in files if applied_sources.get(os.path.basename(f)) != descriptions[os.path.basename(f)]]
+
+
+def get_source_collections(opac_files, preprint_files, am_files):
+    """
+    Obtém as coleções dos documentos de arquivos JSON de OPAC, de Preprints e de Articlemeta, lidos um por vez
+
+    @param opac_files: arquivos de OPAC
+    @param preprint_files: arquivos de Preprints
+    @param am_files: arquivos de Articlemeta
+    @return: conjunto de acrônimos de coleção
+    """
+    documents = itertools.chain(
+        file_utils.iter_opac_documents(opac_files),
+        file_utils.iter_preprint_documents(preprint_files),
+        file_utils.iter_articlemeta_documents(am_files),
+    )
+
+    return {collection.lower() for collection, _, _ in documents}
+
+
+def apply_source_files(current_dicts, opac_files, preprint_files, am_files):
+    """
+    Aplica aos dicionários os documentos de arquivos JSON de OPAC, de Preprints e de Articlemeta, um por vez, à medida
+    que são lidos (sem manter em memória o conteúdo dos arquivos)
+
+    @param current_dicts: dicionários
+    @param opac_files: arquivos de OPAC
+    @param preprint_files: arquivos de Preprints
+    @param am_files: arquivos de Articlemeta
+    """
+    logging.info('Carregando dados de OPAC')
+    dict_utils.add_info_from_documents(current_dicts, file_utils.iter_opac_documents(opac_files))
+
+    logging.info('Carregando dados de Preprints')
+    dict_utils.add_info_from_documents(current_dicts, file_utils.iter_preprint_documents(preprint_files))
+
+    logging.info('Carregando dados de Articlemeta')
+    dict_utils.update_dicts_with_am_counter_dict_documents(current_dicts, file_utils.iter_articlemeta_documents(am_files))
+
+
+def write_collection_dictionaries(current_dicts, collections, version):
+    """
+    Grava as partições por coleção (pickle e base de chaves) e as tabelas compactas de consulta
+
+    @param current_dicts: dicionários
+    @param collections: coleções a serem gravadas
+    @param version: versão dos dicionários (YYYY-MM-DD)
+    """
+    for d_name in DICTIONARY_NAMES:
+        # Partições por coleção (pickle e base de chaves), lidas por calculate_metrics apenas para a coleção computada
+        for collection in sorted(c for c in current_dicts[d_name] if c in collections):
+            collection_data = {collection: current_dicts[d_name][collection]}
+            collection_name = f'{d_name}-{collection}'
+
+            new_collection_dict_path = file_utils.generate_file_path(DIR_DICTIONARIES, collection_name, version, '.data')
+            logging.info(f'Gravando dicionário {collection_name} em {new_collection_dict_path}')
+            file_utils.save(collection_data, new_collection_dict_path)
+
+            new_store_path = file_utils.generate_file_path(DIR_DICTIONARIES, collection_name, version, lib_dictionary.STORE_EXTENSION)
+            logging.info(f'Gravando base de chaves {collection_name} em {new_store_path}')
+            lib_dictionary.write_dictionary_store(collection_data, new_store_path)
+
+    # Tabelas compactas de consulta (idiomas e ano de publicação por PID) lidas por calculate_metrics em lugar das
+    # partições de pid-format-lang e pid-dates
+    for collection in sorted(c for c in set(current_dicts['pid-format-lang']) | set(current_dicts['pid-dates']) if c in collections):
+        if collection in lib_dictionary.PID_LOOKUP_EXCLUDED_COLLECTIONS:
+            continue
+
+        collection_format_lang = current_dicts['pid-format-lang'].get(collection, {})
+        collection_dates = current_dicts['pid-dates'].get(collection, {})
+
+        if not lib_dictionary.PidLookupTable.is_compactable(collection_format_lang, collection_dates):
+            logging.info(f'Dicionários de {collection} não podem ser representados em tabela compacta')
+            continue
+
+        collection_name = f'{lib_dictionary.PID_LOOKUP_NAME}-{collection}'
+        new_lookup_path = file_utils.generate_file_path(DIR_DICTIONARIES, collection_name, version, '.data')
+        logging.info(f'Gravando tabela compacta {collection_name} em {new_lookup_path}')
+        file_utils.save(lib_dictionary.PidLookupTable.from_dictionaries(collection_format_lang, collection_dates), new_lookup_path)
+
+
+def link_collection_dictionaries(collections, current_version, new_version):
+    """
+    Disponibiliza na nova versão, sem regravá-los, os arquivos por coleção da versão atual
+
+    @param collections: coleções não alteradas
+    @param current_version: versão atual dos dicionários (YYYY-MM-DD)
+    @param new_version: nova versão dos dicionários (YYYY-MM-DD)
+    """
+    for collection in sorted(collections):
+        for d_name in DICTIONARY_NAMES + [lib_dictionary.PID_LOOKUP_NAME]:
+            for extension in ['.data', lib_dictionary.STORE_EXTENSION]:
+                collection_name = f'{d_name}-{collection}'
+                current_path = file_utils.generate_file_path(DIR_DICTIONARIES, collection_name, current_version, extension)
+
+                if os.path.exists(current_path):
+                    new_path = file_utils.generate_file_path(DIR_DICTIONARIES, collection_name, new_version, extension)
+                    logging.debug(f'Reaproveitando {current_path} em {new_path}')
+                    file_utils.link_file(current_path, new_path)
+
+
+def create_dictionaries(current_version, new_version, incremental=False):
+    """
+    Cria uma nova versão dos dicionários a partir da versão atual e dos arquivos JSON de OPAC, de Preprints e de
+    Articlemeta, e grava o manifesto da nova versão
+
+    @param current_version: versão atual dos dicionários (YYYY-MM-DD)
+    @param new_version: nova versão dos dicionários (YYYY-MM-DD)
+    @param incremental: aplica apenas os arquivos JSON novos ou alterados e regrava apenas as coleções afetadas
+    @return: manifesto da nova versão
+    """
+    if not os.path.exists(DIR_DICTIONARIES):
+        os.makedirs(DIR_DICTIONARIES)
+
+    opac_files = file_utils.discover_files(DIR_DICTIONARIES, OPAC_DICTIONARY_PREFIX)
+    preprint_files = file_utils.discover_files(DIR_DICTIONARIES, PREPRINT_DICTIONARY_PREFIX)
+    am_files = file_utils.discover_files(DIR_DICTIONARIES, ARTICLEMETA_PREFIX_PREFIX)
+
+    current_manifest = None
+    if incremental:
+        current_manifest = file_utils.load_manifest(DIR_DICTIONARIES, current_version)
+        if current_manifest is None:
+            logging.warning(f'Não há manifesto para a versão {current_version}. Os dicionários serão criados por completo')
+
+    incremental = current_manifest is not None
+    sources = file_utils.describe_files(opac_files + preprint_files + am_files)
+
+    if incremental:
+        opac_files = get_new_source_files(opac_files, current_manifest)
+        preprint_files = get_new_source_files(preprint_files, current_manifest)
+        am_files = get_new_source_files(am_files, current_manifest)
+        sources = {**current_manifest.get('sources', {}), **sources}
+
+        # Coleções alteradas pelos arquivos aplicados (as demais são reaproveitadas da versão atual)
+        updated_collections = get_source_collections(opac_files, preprint_files, am_files)
+        logging.info(f'Aplicando {len(opac_files) + len(preprint_files) + len(am_files)} arquivos novos ou alterados às coleções {sorted(updated_collections)}')
+
+        logging.info('Carregando dados de dicionários atuais')
+        current_dicts = file_utils.load_dictionaries(DIR_DICTIONARIES, current_version, updated_collections)
+
+    else:
+        logging.info('Carregando dados de dicionários atuais')
+        current_dicts = file_utils.load_dictionaries(DIR_DICTIONARIES, current_version)
+
+    apply_source_files(current_dicts, opac_files, preprint_files, am_files)
+
+    logging.info('Removendo dados inválidos')
+    dict_validator.clean(current_dicts)
+
+    if incremental:
+        all_collections = set(current_manifest.get('collections', [])) | updated_collections
+
+        # Dicionários completos não são gravados; a nova versão é formada pelas partições por coleção
+        write_collection_dictionaries(current_dicts, updated_collections, new_version)
+        link_collection_dictionaries(all_collections - updated_collections, current_version, new_version)
+    else:
+        all_collections = {c for d_name in DICTIONARY_NAMES for c in current_dicts[d_name]}
+        updated_collections = all_collections
+
+        for d_name in DICTIONARY_NAMES:
+            new_dict_path = file_utils.generate_file_path(DIR_DICTIONARIES, d_name, new_version, '.data')
+            logging.info(f'Gravando dicionário {d_name} em {new_dict_path}')
+            file_utils.save(current_dicts[d_name], new_dict_path)
+
+        write_collection_dictionaries(current_dicts, all_collections, new_version)
+
+    # Manifesto: arquivos JSON incorporados à nova versão e coleções regravadas
+    manifest = {
+        'version': new_version,
+        'base_version': current_version,
+        'incremental': incremental,
+        'sources': sources,
+        'collections': sorted(all_collections),
+        'updated_collections': sorted(updated_collections),
+    }
+    manifest_path = file_utils.save_manifest(manifest, DIR_DICTIONARIES, new_version)
+    logging.info(f'Manifesto gravado em {manifest_path}')
+
+    return manifest
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -51,6 +254,13 @@ def main():
         help='Data da nova versão dos dicionários (YYYY-MM-DD)'
     )
 
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        default=False,
+        help='Aplica apenas os arquivos JSON novos ou alterados desde a versão atual e regrava apenas as coleções afetadas'
+    )
+
     parser.add_argument(
         '--logging_level',
         choices=['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET'],
@@ -60,43 +270,12 @@ def main():
 
     params = parser.parse_args()
 
+    # A versão incremental reaproveita os arquivos da versão atual e, por isso, precisa ter outra data
+    if params.incremental and params.current_version_date == params.new_version_date:
+        parser.error(f'--new_version_date deve ser diferente de --current_version_date ({params.current_version_date}) no modo incremental')
+
     logging.basicConfig(level=LOGGING_LEVEL,
                         format='[%(asctime)s] %(levelname)s %(message)s',
                         datefmt='%d/%b/%Y %H:%M:%S')
 
-    if not os.path.exists(DIR_DICTIONARIES):
-        os.makedirs(DIR_DICTIONARIES)
-
-    logging.info('Carregando dados de dicionários atuais')
-    current_dicts = file_utils.load_dictionaries(DIR_DICTIONARIES, params.current_version_date)
-
-    logging.info('Carregando dados de OPAC')
-    opac_data = file_utils.load_data_from_opac_files(file_utils.discover_files(DIR_DICTIONARIES, OPAC_DICTIONARY_PREFIX))
-    dict_utils.add_info_to_dates_dict(opac_data, current_dicts['pid-dates'])
-    dict_utils.add_info_to_pid_format_lang(opac_data, current_dicts['pid-format-lang'])
-    del opac_data
-
-    logging.info('Carregando dados de Preprints')
-    preprint_data = file_utils.load_data_from_preprint_files(file_utils.discover_files(DIR_DICTIONARIES, PREPRINT_DICTIONARY_PREFIX))
-    dict_utils.add_info_to_dates_dict(preprint_data, current_dicts['pid-dates'])
-    dict_utils.add_info_to_pid_format_lang(preprint_data, current_dicts['pid-format-lang'])
-    del preprint_data
-
-    logging.info('Carregando dados de Articlemeta')
-    am_data = file_utils.load_data_from_articlemeta_files(file_utils.discover_files(DIR_DICTIONARIES, ARTICLEMETA_PREFIX_PREFIX))
-    dict_utils.update_dicts_with_am_counter_dict(current_dicts, am_data)
-    del am_data
-
-    logging.info('Removendo dados inválidos')
-    dict_validator.clean(current_dicts)
-
-    for d_name in [
-        'pid-issn', 
-        'pid-format-lang',
-        'pdf-pid',
-        'issn-acronym',
-        'pid-dates',
-    ]:
-        new_dict_path = file_utils.generate_file_path(DIR_DICTIONARIES, d_name, params.new_version_date, '.data')
-        logging.info(f'Gravando dicionário {d_name} em {new_dict_path}')
-        file_utils.save(current_dicts[d_name], new_dict_path)
+    create_dictionaries(params.current_version_date, params.new_version_date, params.incremental)
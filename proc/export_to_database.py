@@ -1,5 +1,4 @@
 import argparse
-import csv
 import datetime
 import logging
 import os
@@ -10,6 +9,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
 from decimal import Decimal
+from functools import lru_cache
 from libs.lib_database import (
     update_date_status,
     get_date_status,
@@ -20,7 +20,7 @@ from libs.lib_database import (
 from libs.lib_status import DATE_STATUS_COMPLETED, DATE_STATUS_COMPUTED
 from proc.calculate_metrics import get_date_from_file_path
 from utils.regular_expressions import REGEX_ISSN, REGEX_ARTICLE_PID
-from libs import lib_database
+from libs import lib_database, lib_r5_metrics
 from models.declarative import (
     Journal,
     JournalCollection,
@@ -50,6 +50,17 @@ ENGINE = create_engine(MATOMO_DATABASE_STRING, pool_recycle=1800)
 SESSION_FACTORY = sessionmaker(bind=ENGINE)
 SESSION_BULK_LIMIT = int(os.environ.get('SESSION_BULK_LIMIT', '500'))
 
+# Número máximo de coordenadas arredondadas mantidas em cache
+COORDINATE_CACHE_SIZE = 100000
+
+
+@lru_cache(maxsize=COORDINATE_CACHE_SIZE)
+def round_coordinate(value):
+    """
+    Arredonda uma coordenada (latitude ou longitude) para três casas decimais, mantendo o valor NULL
+    """
+    return round(Decimal(value), 3) if value != 'NULL' else value
+
 
 class R5Metrics:
     def __init__(self, **kargs):
@@ -57,8 +68,8 @@ class R5Metrics:
         self.pid = kargs['pid']
         self.format_name = kargs['format_name']
         self.language_name = kargs['language_name'] if kargs['language_name'] else 'und'
-        self.latitude = round(Decimal(kargs['latitude']), 3) if kargs['latitude'] != 'NULL' else kargs['latitude']
-        self.longitude = round(Decimal(kargs['longitude']), 3) if kargs['longitude'] != 'NULL' else kargs['longitude']
+        self.latitude = round_coordinate(kargs['latitude'])
+        self.longitude = round_coordinate(kargs['longitude'])
         self.year_of_publication = int(kargs['year_of_publication']) if kargs['year_of_publication'].isdigit() else kargs['year_of_publication']
         self.issn = kargs['issn']
         self.year_month_day = kargs['year_month_day']
@@ -199,30 +210,18 @@ def mount_language_map(session):
 
 def read_r5_metrics(path_file_r5_metrics):
     """
-    Processa arquivo r5_metrics para uma lista de instâncias R5Metrics
+    Processa arquivo r5_metrics (em texto ou binário, ver lib_r5_metrics) para uma lista de instâncias R5Metrics
     :param path_file_r5_metrics: Caminho de arquivo r5_metrics
     :return: Lista de instâncias R5Metrics
     """
     r5_metrics = []
-    with open(path_file_r5_metrics) as fi:
-        csv_reader = csv.DictReader(fi, delimiter='|', fieldnames=['pid',
-                                                                   'format_name',
-                                                                   'language_name',
-                                                                   'latitude',
-                                                                   'longitude',
-                                                                   'year_of_publication',
-                                                                   'issn',
-                                                                   'year_month_day',
-                                                                   'total_item_investigations',
-                                                                   'total_item_requests',
-                                                                   'unique_item_investigations',
-                                                                   'unique_item_requests'])
-        for row in csv_reader:
-            r5 = R5Metrics(**row)
-            if r5.is_valid_metric():
-                r5_metrics.append(R5Metrics(**row))
-            else:
-                logging.debug('Métrica ignorada: %s' % r5.__str__())
+    for row in lib_r5_metrics.iter_rows(path_file_r5_metrics):
+        r5 = R5Metrics(**dict(zip(lib_r5_metrics.R5_METRICS_COLUMNS, row)))
+        if r5.is_valid_metric():
+            r5_metrics.append(r5)
+        else:
+            # Mensagem formatada apenas se o nível de log for DEBUG
+            logging.debug('Métrica ignorada: %s', r5)
 
     return r5_metrics
 
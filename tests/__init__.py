@@ -0,0 +1,4 @@
+import os
+
+# proc.calculate_metrics cria a conexão com a base Matomo na importação; os testes usam SQLite em memória
+os.environ.setdefault('MATOMO_DATABASE_STRING', 'sqlite://')
@@ -0,0 +1,89 @@
+import random
+
+from libs import lib_pretable
+from models.hit import HitManager
+
+
+COLLECTION = 'scl'
+DOMAIN = 'www.scielo.br'
+
+# PID fora do padrão S + ISSN + código, cujo ISSN é obtido dos hits de URLs novas (ver HitManager.pid_to_issn)
+NON_STRUCTURAL_PID = '1234567'
+
+PID_FORMAT_LANG = {
+    'scl': {
+        'S0102-67202020000100001': {'default': 'pt', 'html': ['pt', 'en'], 'pdf': ['pt']},
+        'S1234-56782019000300010': {'default': 'en', 'html': ['en', 'es'], 'pdf': ['en']},
+        NON_STRUCTURAL_PID: {'default': 'en', 'html': ['en'], 'pdf': ['en']},
+    },
+}
+
+PID_DATES = {
+    'scl': {
+        'S0102-67202020000100001': {'publication_year': '2020'},
+        'S1234-56782019000300010': {'publication_year': '2019'},
+        NON_STRUCTURAL_PID: {'publication_year': '2019'},
+    },
+}
+
+ISSN_ACRONYM = {'scl': {'0102-6720': 'abcd', '1234-5678': 'xyz'}}
+
+PDF_PID = {'scl': {}}
+
+ACTION_NAMES = [
+    'www.scielo.br/scielo.php?script=sci_arttext&pid=S0102-67202020000100001&lng=pt&tlng=pt',
+    'www.scielo.br/scielo.php?script=sci_arttext&pid=S0102-67202020000100001&tlng=en',
+    'www.scielo.br/scielo.php?script=sci_pdf&pid=S0102-67202020000100001&tlng=pt',
+    'www.scielo.br/scielo.php?script=sci_abstract&pid=S1234-56782019000300010&tlng=es',
+    'www.scielo.br/scielo.php?script=sci_arttext&pid=S1234-56782019000300010&tlng=en',
+    'www.scielo.br/scielo.php?script=sci_arttext&pid=%s&tlng=en' % NON_STRUCTURAL_PID,
+    'www.scielo.br/scielo.php?script=sci_pdf&pid=%s&tlng=en' % NON_STRUCTURAL_PID,
+    'www.scielo.br/j/abcd/a/%s/?lang=en' % NON_STRUCTURAL_PID,
+    'www.scielo.br/j/xyz/a/%s/?format=pdf&lang=en' % NON_STRUCTURAL_PID,
+    'www.scielo.br/j/abcd/i/2020.v54n1/',
+    'www.scielo.br/scielo.php?script=sci_serial&pid=0102-6720&lng=pt',
+    'www.scielo.br/',
+    'NULL',
+]
+
+
+def create_hit_manager(**kwargs):
+    """
+    Cria HitManager com os dicionários de teste
+    """
+    return HitManager(PDF_PID, ISSN_ACRONYM, PID_FORMAT_LANG, PID_DATES, **kwargs)
+
+
+def generate_records(date_value, n_records, seed):
+    """
+    Gera registros de pré-tabela de um dia, ordenados por IP (como as pré-tabelas extraídas da base de dados Matomo)
+
+    @param date_value: data em formato YYYY-MM-DD
+    @param n_records: número de registros
+    @param seed: semente do gerador de números aleatórios
+    @return: lista de objetos PretableRecord
+    """
+    rnd = random.Random(seed)
+    records = []
+
+    for _ in range(n_records):
+        records.append(lib_pretable.PretableRecord(
+            '%s %02d:%02d:%02d' % (date_value, rnd.randint(0, 23), rnd.randint(0, 59), rnd.randint(0, 59)),
+            rnd.choice(['Chrome', 'Firefox', '']),
+            rnd.choice(['90', '88', '']),
+            '10.0.%d.%d' % (rnd.randint(0, 3), rnd.randint(0, 20)),
+            rnd.choice(['-23.5', '-22.9', 'NULL']),
+            rnd.choice(['-46.6', '-43.2']),
+            rnd.choice(ACTION_NAMES)))
+
+    return sorted(records, key=lambda r: r.ip)
+
+
+def write_pretable(path, records):
+    """
+    Salva registros em pré-tabela (com cabeçalho, como a saída do cliente mysql)
+    """
+    with lib_pretable.open_pretable_writer(path) as f:
+        f.write('\t'.join(lib_pretable.PRETABLE_COLUMNS) + '\n')
+        for record in records:
+            f.write(lib_pretable.format_record(record))
@@ -0,0 +1,343 @@
+import argparse
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from libs import lib_pretable, lib_r5_metrics
+from models.hit import CountedHit
+from proc import calculate_metrics
+from tests import fixtures
+
+
+DATES = ['2021-03-01', '2021-03-02', '2021-03-03']
+
+
+class CalculateMetricsTestCase(unittest.TestCase):
+    """
+    Executa calculate_metrics sobre pré-tabelas geradas em diretório temporário
+    """
+    def setUp(self):
+        self.dir_data = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_data)
+
+        self.dir_pretables = os.path.join(self.dir_data, 'pretables')
+        os.makedirs(self.dir_pretables)
+
+        self.pretables = []
+        for i, date_value in enumerate(DATES):
+            pretable = os.path.join(self.dir_pretables, date_value + '.tsv')
+            fixtures.write_pretable(pretable, fixtures.generate_records(date_value, 600, seed=i))
+            self.pretables.append(pretable)
+
+        # Buckets pequenos, para que cada pré-tabela seja computada em várias descargas
+        for patcher in [mock.patch.object(calculate_metrics, 'DIR_R5_HITS', os.path.join(self.dir_data, 'r5/hits')),
+                        mock.patch.object(calculate_metrics, 'DIR_R5_METRICS', os.path.join(self.dir_data, 'r5/metrics')),
+                        mock.patch.object(calculate_metrics, 'DIR_PRETABLES_COLUMNAR', os.path.join(self.dir_data, 'columnar')),
+                        mock.patch.object(calculate_metrics, 'update_date_status'),
+                        mock.patch.object(calculate_metrics, 'WORKER_HIT_MANAGER', None),
+                        mock.patch.object(calculate_metrics.iter_rows_with_flush, '__defaults__', (10, 0, 0))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.results = {}
+
+    def get_params(self, **kwargs):
+        params = argparse.Namespace(collection=fixtures.COLLECTION,
+                                    domain=fixtures.DOMAIN,
+                                    dict_date='2021-12-31',
+                                    action_cache_size=1000,
+                                    action_table_size=calculate_metrics.ACTION_TABLE_SIZE,
+                                    counter_engine='python',
+                                    columnar_cache=False,
+                                    streaming=False,
+                                    hits_output='full',
+                                    metrics_format='csv',
+                                    workers=1,
+                                    shards=1)
+        vars(params).update(kwargs)
+        return params
+
+    def create_hit_manager(self, params):
+        return fixtures.create_hit_manager(action_cache_size=params.action_cache_size,
+                                           action_table_size=params.action_table_size,
+                                           streaming=params.streaming,
+                                           keep_hits=params.hits_output != 'none')
+
+    def compute_sequentially(self, params):
+        hit_manager = self.create_hit_manager(params)
+
+        for pretable in self.pretables:
+            calculate_metrics.compute_pretable(pretable=pretable,
+                                               hit_manager=hit_manager,
+                                               db_session=None,
+                                               collection=params.collection,
+                                               domain=params.domain,
+                                               counter_engine=params.counter_engine,
+                                               columnar_cache=params.columnar_cache,
+                                               hits_output=params.hits_output,
+                                               metrics_format=params.metrics_format)
+
+    def read_results(self):
+        """
+        Lê e remove os arquivos de resultados, retornando dicionário nome -> conteúdo
+        """
+        results = {}
+
+        for dir_path in [calculate_metrics.DIR_R5_HITS, calculate_metrics.DIR_R5_METRICS]:
+            if not os.path.isdir(dir_path):
+                continue
+
+            for name in calculate_metrics._list_files(dir_path):
+                # Cabeçalhos gzip contêm horário e nome do arquivo; apenas o conteúdo é comparado
+                with (gzip.open if name.endswith('.gz') else open)(os.path.join(dir_path, name), 'rb') as f:
+                    results[name] = f.read()
+
+            shutil.rmtree(dir_path)
+
+        return results
+
+    def assertSameResults(self, expected, results):
+        self.assertEqual(sorted(expected), sorted(results))
+        for name in expected:
+            self.assertEqual(expected[name], results[name], name)
+
+
+class ParallelComputingTests(CalculateMetricsTestCase):
+
+    def test_workers_match_sequential_computing(self):
+        params = self.get_params(workers=2)
+
+        self.compute_sequentially(params)
+        expected = self.read_results()
+
+        calculate_metrics.compute_pretables_in_parallel(self.pretables, self.create_hit_manager(params), params)
+
+        self.assertEqual(len(expected), 2 * len(DATES))
+        self.assertSameResults(expected, self.read_results())
+
+    def test_pretable_does_not_depend_on_previous_pretables(self):
+        params = self.get_params()
+
+        self.compute_sequentially(params)
+        expected = self.read_results()
+
+        hit_manager = self.create_hit_manager(params)
+        for pretable in reversed(self.pretables):
+            calculate_metrics.compute_pretable(pretable, hit_manager, None, params.collection, params.domain, params.counter_engine)
+
+        self.assertSameResults(expected, self.read_results())
+
+
+class StreamingTests(CalculateMetricsTestCase):
+
+    def test_streaming_matches_sequential_computing(self):
+        self.compute_sequentially(self.get_params())
+        expected = self.read_results()
+
+        self.compute_sequentially(self.get_params(streaming=True))
+        results = self.read_results()
+
+        # Hits de PIDs fora do padrão são salvos ao final de cada bucket, após os dos demais PIDs
+        self.assertEqual(sorted(expected), sorted(results))
+        for name in expected:
+            self.assertEqual(sorted(expected[name].splitlines()), sorted(results[name].splitlines()), name)
+
+    def test_streaming_keeps_only_hits_of_pids_without_issn(self):
+        params = self.get_params(streaming=True)
+        hit_manager = self.create_hit_manager(params)
+        exported_hits = []
+        hit_manager.hits_exporter = exported_hits.append
+
+        with lib_pretable.open_pretable(self.pretables[0]) as data:
+            for record in lib_pretable.iter_records(data):
+                hit = hit_manager.create_hit(record, params.collection, params.domain)
+                if hit:
+                    hit_manager.add_hit(hit)
+
+        self.assertTrue(exported_hits)
+        self.assertTrue(hit_manager.counted_hits['article'])
+        self.assertEqual({k[0] for key_hits in hit_manager.counted_hits['article'].values() for k in key_hits},
+                         {fixtures.NON_STRUCTURAL_PID})
+        self.assertFalse(any(hit_manager.counted_hits[g] for g in hit_manager.counted_hits if g != 'article'))
+
+
+class HitsOutputTests(CalculateMetricsTestCase):
+
+    def test_metrics_do_not_depend_on_hits_output(self):
+        self.compute_sequentially(self.get_params())
+        expected = {n: r for n, r in self.read_results().items() if n.startswith('r5-metrics')}
+
+        for streaming in [False, True]:
+            self.compute_sequentially(self.get_params(hits_output='none', streaming=streaming))
+            self.assertSameResults(expected, self.read_results())
+
+    def test_hits_are_not_kept_for_export(self):
+        hit_manager = self.create_hit_manager(self.get_params(hits_output='none'))
+
+        with lib_pretable.open_pretable(self.pretables[0]) as data:
+            for record in lib_pretable.iter_records(data):
+                hit = hit_manager.create_hit(record, fixtures.COLLECTION, fixtures.DOMAIN)
+                if hit:
+                    hit_manager.add_hit(hit)
+
+        hits = [h for key_hits in hit_manager.hits['article'].values() for hits in key_hits.values() for h in hits]
+        self.assertTrue(hits)
+        self.assertTrue(all(isinstance(h, CountedHit) for h in hits))
+
+
+class MetricsFormatTests(CalculateMetricsTestCase):
+
+    def read_metrics_rows(self, metrics_format):
+        rows = {}
+        for date_value in DATES:
+            metrics_path, _ = calculate_metrics.get_result_paths(date_value, metrics_format=metrics_format)
+            rows[date_value] = [[str(v) for v in r] for r in lib_r5_metrics.iter_rows(metrics_path)]
+        return rows
+
+    def test_binary_metrics_match_text_metrics(self):
+        self.compute_sequentially(self.get_params())
+        expected = self.read_metrics_rows('csv')
+
+        self.compute_sequentially(self.get_params(metrics_format='binary'))
+
+        self.assertTrue(all(expected.values()))
+        self.assertEqual(expected, self.read_metrics_rows('binary'))
+
+
+class CounterEngineTests(CalculateMetricsTestCase):
+
+    def test_numpy_engine_matches_python_engine(self):
+        self.compute_sequentially(self.get_params())
+        expected = self.read_results()
+
+        self.compute_sequentially(self.get_params(counter_engine='numpy'))
+
+        self.assertSameResults(expected, self.read_results())
+
+
+class ActionTableTests(CalculateMetricsTestCase):
+
+    def test_action_table_size_does_not_change_results(self):
+        self.compute_sequentially(self.get_params())
+        expected = self.read_results()
+
+        # Tabela desabilitada e tabela que fica cheia durante a pré-tabela
+        for action_table_size in [0, 3]:
+            self.compute_sequentially(self.get_params(action_table_size=action_table_size))
+            self.assertSameResults(expected, self.read_results())
+
+
+class ShardedComputingTests(CalculateMetricsTestCase):
+
+    def compute_in_shards(self, params):
+        with calculate_metrics.create_worker_pool(params.shards, self.create_hit_manager(params), params) as pool:
+            for pretable in self.pretables:
+                calculate_metrics.compute_pretable_in_shards(pretable, pool, params.shards, params)
+
+    def assertShardsMatchSequentialComputing(self, params):
+        self.compute_sequentially(params)
+        expected = self.read_results()
+
+        with self.assertLogs(level='INFO') as logs:
+            self.compute_in_shards(params)
+
+        self.assertSameResults(expected, self.read_results())
+        return logs.output
+
+    def test_shards_match_sequential_computing(self):
+        output = self.assertShardsMatchSequentialComputing(self.get_params(shards=4))
+
+        # Hits de URLs novas associam o PID fora do padrão a ISSNs distintos em fatias distintas
+        self.assertTrue(any('calculada sem divisão' in line for line in output))
+
+    def write_pretables_without_pid_to_issn_lookups(self):
+        for i, pretable in enumerate(self.pretables):
+            records = fixtures.generate_records(DATES[i], 600, seed=i)
+            fixtures.write_pretable(pretable, [r for r in records if fixtures.NON_STRUCTURAL_PID not in r.actionName])
+
+    def assertComputedInShards(self, output):
+        self.assertFalse(any('calculada sem divisão' in line for line in output))
+        self.assertEqual(sum('dividido em 4 fatia(s)' in line for line in output), len(self.pretables))
+
+    def test_shards_without_pid_to_issn_lookups(self):
+        self.write_pretables_without_pid_to_issn_lookups()
+
+        output = self.assertShardsMatchSequentialComputing(self.get_params(shards=4))
+        self.assertComputedInShards(output)
+
+    def test_shards_read_lines_as_sequential_computing(self):
+        self.write_pretables_without_pid_to_issn_lookups()
+
+        # Quebras de linha \r e \r\n, bytes inválidos e última linha sem quebra de linha
+        for pretable in self.pretables:
+            with open(pretable, 'rb') as f:
+                lines = f.read().split(b'\n')
+
+            for i in range(2, len(lines) - 1, 11):
+                lines[i] += b'\r'
+            for i in range(3, len(lines) - 1, 13):
+                lines[i] = lines[i].replace(b'scielo', b'sci\xffelo', 1)
+
+            # Linhas separadas apenas por \r, que não podem iniciar uma fatia
+            for i in range(len(lines) - 2, 0, -7):
+                lines[i:i + 2] = [lines[i].rstrip(b'\r') + b'\r' + lines[i + 1]]
+
+            with open(pretable, 'wb') as f:
+                f.write(b'\n'.join(lines).rstrip(b'\n'))
+
+        output = self.assertShardsMatchSequentialComputing(self.get_params(shards=4, hits_output='gzip', metrics_format='binary'))
+        self.assertComputedInShards(output)
+
+    def test_compressed_pretables_are_computed_in_shards(self):
+        self.write_pretables_without_pid_to_issn_lookups()
+
+        for i, pretable in enumerate(self.pretables):
+            compressed_pretable = pretable + ('.gz' if i % 2 == 0 or lib_pretable.zstandard is None else '.zst')
+            with open(pretable) as f:
+                fixtures.write_pretable(compressed_pretable, lib_pretable.iter_records(f))
+            os.remove(pretable)
+            self.pretables[i] = compressed_pretable
+
+        output = self.assertShardsMatchSequentialComputing(self.get_params(shards=4))
+        self.assertComputedInShards(output)
+
+        # A pré-tabela descomprimida para a divisão em fatias é removida
+        self.assertEqual(calculate_metrics._list_files(os.path.join(self.dir_pretables, calculate_metrics.RESULT_TMP_SUBDIR)), [])
+
+    def test_shard_results_are_not_left_in_result_directories(self):
+        params = self.get_params(shards=4)
+        self.compute_in_shards(params)
+
+        for dir_path in [calculate_metrics.DIR_R5_HITS, calculate_metrics.DIR_R5_METRICS]:
+            self.assertEqual(sorted(calculate_metrics._list_files(dir_path)),
+                             sorted(os.path.basename(p) for d in DATES for p in calculate_metrics.get_result_paths(d) if os.path.dirname(p) == dir_path))
+            self.assertEqual(calculate_metrics._list_files(os.path.join(dir_path, calculate_metrics.RESULT_TMP_SUBDIR)), [])
+
+    def test_find_pid_to_issn_conflict(self):
+        def shard(pid_to_min_issn, pid_to_issn_lookups):
+            return 'shard', pid_to_min_issn, pid_to_issn_lookups
+
+        # PID não associado a ISSN nas fatias anteriores
+        self.assertIsNone(calculate_metrics.find_pid_to_issn_conflict([shard({'1': '0002-0002'}, {}),
+                                                                       shard({}, {'2': {''}})]))
+
+        # ISSN obtido pela fatia não é maior do que o menor ISSN das fatias anteriores
+        self.assertIsNone(calculate_metrics.find_pid_to_issn_conflict([shard({'1': '0002-0002'}, {}),
+                                                                       shard({'1': '0001-0001'}, {'1': {'0001-0001'}})]))
+
+        # Fatia não conhece o PID, associado a ISSN em fatia anterior
+        self.assertEqual(calculate_metrics.find_pid_to_issn_conflict([shard({'1': '0002-0002'}, {}),
+                                                                      shard({}, {}),
+                                                                      shard({}, {'1': {''}})]), 2)
+
+        # Fatia obteve ISSN maior do que o de fatia anterior
+        self.assertEqual(calculate_metrics.find_pid_to_issn_conflict([shard({'1': '0001-0001'}, {}),
+                                                                      shard({'1': '0002-0002'}, {'1': {'0002-0002'}})]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from libs import lib_counter
+from models.counter import ColumnarCounterStat, CounterStat
+from others.benchmark_counter import LegacyCounterStat, generate_hits
+from tests import fixtures
+
+
+def compute_metrics(counter_stat_class, hits):
+    counter_stat = counter_stat_class()
+    counter_stat.calculate_metrics(hits)
+    return counter_stat.metrics
+
+
+class CounterStatTests(unittest.TestCase):
+
+    def test_single_pass_matches_legacy_on_synthetic_hits(self):
+        hits, _ = generate_hits(n_hits=20000, n_keys=500, n_days=3, seed=1)
+
+        expected = compute_metrics(LegacyCounterStat, hits)
+        self.assertTrue(expected['article'])
+        self.assertEqual(expected, compute_metrics(CounterStat, hits))
+
+    def test_single_pass_matches_legacy_on_pretable_hits(self):
+        hit_manager = fixtures.create_hit_manager()
+
+        for date_value in ['2021-03-01', '2021-03-02']:
+            for record in fixtures.generate_records(date_value, 600, seed=0):
+                hit = hit_manager.create_hit(record, fixtures.COLLECTION, fixtures.DOMAIN)
+                if hit:
+                    hit_manager.add_hit(hit)
+
+        hit_manager.remove_double_clicks()
+
+        expected = compute_metrics(LegacyCounterStat, {'article': hit_manager.hits['article']})
+        self.assertTrue(expected['article'])
+        self.assertEqual(expected, compute_metrics(CounterStat, {'article': hit_manager.hits['article']}))
+
+    def test_columnar_matches_single_pass(self):
+        hits, _ = generate_hits(n_hits=20000, n_keys=500, n_days=3, seed=2)
+
+        expected = compute_metrics(CounterStat, hits)
+        self.assertTrue(expected['article'])
+        self.assertEqual(expected, compute_metrics(ColumnarCounterStat, hits))
+        self.assertEqual(list(expected['article']), list(compute_metrics(ColumnarCounterStat, hits)['article']))
+
+    def test_columnar_matches_single_pass_on_empty_hits(self):
+        self.assertEqual(compute_metrics(CounterStat, {'article': {}}), compute_metrics(ColumnarCounterStat, {'article': {}}))
+
+
+def legacy_remove_double_clicks(hits):
+    """
+    Reprodução da remoção de cliques duplos anterior à detecção incremental: cada lista de hits é ordenada por horário
+    e cada hit é comparado ao seguinte
+    """
+    for group, session_key_hits in hits.items():
+        for session, key_hits in session_key_hits.items():
+            for key, key_hits_list in key_hits.items():
+                cleaned_hits = []
+
+                if len(key_hits_list) > 1:
+                    sorted_hits = sorted(key_hits_list, key=lambda x: x.server_time)
+
+                    for i in range(len(sorted_hits) - 1):
+                        if not lib_counter.is_double_click(group, sorted_hits[i], sorted_hits[i + 1]):
+                            cleaned_hits.append(sorted_hits[i])
+                    cleaned_hits.append(sorted_hits[-1])
+                else:
+                    cleaned_hits.extend(key_hits_list)
+
+                key_hits[key] = cleaned_hits
+
+
+class DoubleClickTests(unittest.TestCase):
+
+    def add_hits(self, hit_manager, records):
+        for record in records:
+            hit = hit_manager.create_hit(record, fixtures.COLLECTION, fixtures.DOMAIN)
+            if hit:
+                hit_manager.add_hit(hit)
+
+    def get_hits(self, hit_manager):
+        return {(session, key): [(h.server_time, h.content_type, h.action_name) for h in hits]
+                for session, key_hits in hit_manager.hits['article'].items()
+                for key, hits in key_hits.items()}
+
+    def test_incremental_detection_matches_full_removal(self):
+        # Horários concentrados, para que haja cliques duplos; parte dos IPs com hits fora de ordem cronológica
+        records = [r._replace(serverTime=r.serverTime[:11] + '10:0' + r.serverTime[15:]) for r in fixtures.generate_records('2021-03-01', 2000, seed=3)]
+        records = sorted(records, key=lambda r: (r.ip, r.serverTime if r.ip < '10.0.2' else ''))
+
+        hit_manager = fixtures.create_hit_manager()
+        self.add_hits(hit_manager, records)
+        self.assertTrue(hit_manager.double_clicks)
+        self.assertTrue(hit_manager.unsorted_hits)
+        hit_manager.remove_double_clicks()
+
+        full_hit_manager = fixtures.create_hit_manager()
+        self.add_hits(full_hit_manager, records)
+        legacy_remove_double_clicks(full_hit_manager.hits)
+
+        self.assertEqual(self.get_hits(full_hit_manager), self.get_hits(hit_manager))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+from unittest import mock
+
+from libs import lib_dictionary
+from proc import create_dictionaries
+from utils import file_utils
+
+
+CURRENT_VERSION = '2021-03-01'
+NEW_VERSION = '2021-03-02'
+REBUILT_VERSION = '2021-03-03'
+
+
+def am_document(collection, code, issn, acronym, year, language):
+    return {
+        'collection': collection,
+        'code': code,
+        'code_title': [issn],
+        'journal_acronym': acronym,
+        'publication_date': f'{year}-05-01',
+        'publication_year': year,
+        'processing_date': f'{year}-05-02',
+        'default_language': language,
+        'text_langs': [language],
+        'pdfs': [{'lang': language, 'path': f'pdf/{acronym}/{code.lower()}.pdf'}],
+    }
+
+
+def write_am_file(directory, name, documents):
+    with open(os.path.join(directory, name), 'w') as fout:
+        for doc in documents:
+            fout.write(json.dumps(doc) + '\n')
+
+
+class IncrementalDictionariesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_dictionaries = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_dictionaries)
+
+        patcher = mock.patch.object(create_dictionaries, 'DIR_DICTIONARIES', self.dir_dictionaries)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        write_am_file(self.dir_dictionaries, 'am-counter-dict-2021-02-01.jsonl', [
+            am_document('scl', 'S0102-67202020000100001', '0102-6720', 'abcd', '2020', 'pt'),
+            am_document('scl', 'S0102-67202020000100002', '0102-6720', 'abcd', '2020', 'en'),
+        ])
+        write_am_file(self.dir_dictionaries, 'am-counter-dict-2021-02-02.jsonl', [
+            am_document('arg', 'S0325-00752019000200001', '0325-0075', 'aapc', '2019', 'es'),
+        ])
+
+        create_dictionaries.create_dictionaries(None, CURRENT_VERSION)
+
+        # Arquivo novo, apenas com documentos da coleção scl
+        write_am_file(self.dir_dictionaries, 'am-counter-dict-2021-03-01.jsonl', [
+            am_document('scl', 'S0102-67202021000100001', '0102-6720', 'abcd', '2021', 'es'),
+            am_document('scl', 'S0102-67202020000100002', '0102-6720', 'abcd', '2020', 'pt'),
+        ])
+
+    def get_collection_paths(self, collection, version):
+        paths = []
+
+        for d_name in create_dictionaries.DICTIONARY_NAMES + [lib_dictionary.PID_LOOKUP_NAME]:
+            for extension in ['.data', lib_dictionary.STORE_EXTENSION]:
+                path = file_utils.generate_file_path(self.dir_dictionaries, f'{d_name}-{collection}', version, extension)
+                if os.path.exists(path):
+                    paths.append(path)
+
+        return paths
+
+    def load_pid_lookup_table(self, collection, version):
+        path = file_utils.generate_file_path(self.dir_dictionaries, f'{lib_dictionary.PID_LOOKUP_NAME}-{collection}', version, '.data')
+        with open(path, 'rb') as fin:
+            return pickle.load(fin)
+
+    def test_incremental_build_matches_full_rebuild(self):
+        create_dictionaries.create_dictionaries(CURRENT_VERSION, NEW_VERSION, incremental=True)
+        create_dictionaries.create_dictionaries(None, REBUILT_VERSION)
+
+        self.assertEqual(
+            file_utils.load_dictionaries(self.dir_dictionaries, NEW_VERSION),
+            file_utils.load_dictionaries(self.dir_dictionaries, REBUILT_VERSION),
+        )
+
+        for collection in ['arg', 'scl']:
+            new_paths = self.get_collection_paths(collection, NEW_VERSION)
+            rebuilt_paths = self.get_collection_paths(collection, REBUILT_VERSION)
+            self.assertEqual([p.replace(NEW_VERSION, REBUILT_VERSION) for p in new_paths], rebuilt_paths)
+
+            new_table = self.load_pid_lookup_table(collection, NEW_VERSION)
+            rebuilt_table = self.load_pid_lookup_table(collection, REBUILT_VERSION)
+            self.assertEqual(vars(new_table), vars(rebuilt_table))
+
+    def test_untouched_collections_are_linked(self):
+        create_dictionaries.create_dictionaries(CURRENT_VERSION, NEW_VERSION, incremental=True)
+
+        current_paths = self.get_collection_paths('arg', CURRENT_VERSION)
+        self.assertTrue(current_paths)
+
+        for current_path in current_paths:
+            new_path = current_path.replace(CURRENT_VERSION, NEW_VERSION)
+            self.assertTrue(os.path.samefile(current_path, new_path))
+
+        for current_path in self.get_collection_paths('scl', CURRENT_VERSION):
+            new_path = current_path.replace(CURRENT_VERSION, NEW_VERSION)
+            self.assertFalse(os.path.samefile(current_path, new_path))
+
+    def test_manifest_describes_sources_and_collections(self):
+        manifest = create_dictionaries.create_dictionaries(CURRENT_VERSION, NEW_VERSION, incremental=True)
+
+        self.assertEqual(manifest, file_utils.load_manifest(self.dir_dictionaries, NEW_VERSION))
+        self.assertTrue(manifest['incremental'])
+        self.assertEqual(manifest['base_version'], CURRENT_VERSION)
+        self.assertEqual(manifest['collections'], ['arg', 'scl'])
+        self.assertEqual(manifest['updated_collections'], ['scl'])
+
+        am_files = sorted(f for f in os.listdir(self.dir_dictionaries) if f.startswith('am-counter-dict'))
+        self.assertEqual(sorted(manifest['sources']), am_files)
+        self.assertEqual(manifest['sources'], file_utils.describe_files([os.path.join(self.dir_dictionaries, f) for f in am_files]))
+
+        # Sem arquivos novos, nenhuma coleção é regravada
+        manifest = create_dictionaries.create_dictionaries(NEW_VERSION, REBUILT_VERSION, incremental=True)
+        self.assertEqual(manifest['collections'], ['arg', 'scl'])
+        self.assertEqual(manifest['updated_collections'], [])
+
+    def test_incremental_build_rejects_current_version(self):
+        current_paths = self.get_collection_paths('arg', CURRENT_VERSION)
+        contents = [open(p, 'rb').read() for p in current_paths]
+
+        argv = ['create_dictionaries', '--incremental', '--current_version_date', CURRENT_VERSION, '--new_version_date', CURRENT_VERSION]
+        with mock.patch.object(sys, 'argv', argv), mock.patch('sys.stderr'):
+            with self.assertRaises(SystemExit):
+                create_dictionaries.main()
+
+        self.assertEqual([open(p, 'rb').read() for p in current_paths], contents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from utils import dict_utils
+
+
+PID = 'bRdGyqYc9JpyhjF4BwPZ4Qy'
+
+
+class PutDateTests(unittest.TestCase):
+
+    def test_date_is_put_under_collection_and_pid(self):
+        data = {'nbr': {PID: {'publication_date': '2020-05-01'}}}
+
+        dict_utils._put_date('2020-05-02T10:30:00', 'created_at', data, 'nbr', PID)
+        dict_utils._put_date('2021-01-03', 'updated_at', data, 'nbr', PID)
+
+        self.assertEqual(data, {'nbr': {PID: {'publication_date': '2020-05-01',
+                                              'created_at': '2020-05-02 10:30:00',
+                                              'updated_at': '2021-01-03 00:00:00'}}})
+
+    def test_invalid_date_is_not_put(self):
+        data = {'nbr': {PID: {'created_at': '2020-05-02 10:30:00'}}}
+
+        dict_utils._put_date('not a date', 'created_at', data, 'nbr', PID)
+
+        self.assertEqual(data, {'nbr': {PID: {'created_at': '2020-05-02 10:30:00'}}})
+
+    def test_opac_documents_keep_dates_under_pid(self):
+        current_dicts = {'pid-dates': {}, 'pid-format-lang': {}}
+        values = {'publication_date': '2020-05-01', 'create': '2020-05-02T10:30:00', 'update': '2021-01-03T08:00:00', 'default_language': 'pt'}
+
+        dict_utils.add_info_from_documents(current_dicts, [('nbr', PID, values)])
+
+        self.assertEqual(list(current_dicts['pid-dates']), ['nbr'])
+        self.assertEqual(current_dicts['pid-dates']['nbr'][PID], {'publication_date': '2020-05-01',
+                                                                  'publication_year': '2020',
+                                                                  'created_at': '2020-05-02 10:30:00',
+                                                                  'updated_at': '2021-01-03 08:00:00'})
+
+
+if __name__ == '__main__':
+    unittest.main()
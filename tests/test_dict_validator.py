@@ -0,0 +1,38 @@
+import unittest
+
+from utils import dict_validator
+
+
+class CleanPidDatesTests(unittest.TestCase):
+
+    def test_legacy_top_level_dates_are_removed(self):
+        # Versões anteriores de dict_utils._put_date gravavam created_at e updated_at fora das coleções
+        data = {
+            'scl': {'S0102-67202020000100001': {'publication_year': '2020'}},
+            'nbr': {'bRdGyqYc9JpyhjF4BwPZ4Qy': {'created_at': '2020-05-02 10:30:00'}},
+            'created_at': '2020-05-02 10:30:00',
+            'updated_at': '2021-01-03 08:00:00',
+        }
+
+        dict_validator.clean_pid_dates(data)
+
+        self.assertEqual(data, {
+            'scl': {'S0102-67202020000100001': {'publication_year': '2020'}},
+            'nbr': {'bRdGyqYc9JpyhjF4BwPZ4Qy': {'created_at': '2020-05-02 10:30:00'}},
+        })
+
+    def test_clean_removes_legacy_top_level_dates(self):
+        data = {
+            'pid-issn': {},
+            'issn-acronym': {},
+            'pid-format-lang': {},
+            'pid-dates': {'scl': {'S0102-67202020000100001': {'publication_year': '2020'}}, 'updated_at': '2021-01-03 08:00:00'},
+        }
+
+        dict_validator.clean(data)
+
+        self.assertEqual(data['pid-dates'], {'scl': {'S0102-67202020000100001': {'publication_year': '2020'}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import datetime
+import ipaddress
+import os
+import shutil
+import tempfile
+import unittest
+
+from libs import lib_pretable
+from proc import extract_pretables
+from sqlalchemy import create_engine
+
+
+DATE = datetime.date(2021, 3, 1)
+
+# (idvisit, config_browser_name, config_browser_version, location_ip, location_latitude, location_longitude)
+VISITS = [
+    (1, 'Chrome', '90.0', ipaddress.ip_address('10.0.0.2').packed, '-23.5000', '-46.6000'),
+    (2, 'Firefox', None, ipaddress.ip_address('10.0.0.1').packed, None, None),
+    (3, 'Tab\tBrowser', '1\\2', ipaddress.ip_address('2001:db8::1').packed, '48.8500', '2.3500'),
+    (4, 'Safari', '14', b'\x01\x02\x03', '0.0000', '0.0000'),
+]
+
+# (idaction, name)
+ACTIONS = [
+    (1, 'www.scielo.br/scielo.php?script=sci_arttext&pid=S0102-67202020000100001'),
+    (2, 'www.scielo.br/j/abcd/a/xyz/\t?lang=pt\nnext'),
+    (3, 'www.scielo.br/search?q=a\\b\0'),
+]
+
+# (idlink_va, idsite, idvisit, idaction_url, server_time)
+VISIT_ACTIONS = [
+    (1, 1, 1, 1, '2021-03-01 10:00:00'),
+    (2, 1, 2, 2, '2021-03-01 00:00:00'),
+    (3, 1, 3, 3, '2021-03-01 23:59:59'),
+    (4, 1, 4, 9, '2021-03-01 12:00:00'),
+    (5, 1, 1, 1, '2021-03-02 00:00:00'),
+    (6, 2, 1, 1, '2021-03-01 11:00:00'),
+]
+
+# Pré-tabela esperada, ordenada por IP (binário), como a saída do cliente mysql em modo batch
+EXPECTED_LINES = [
+    '\t'.join(lib_pretable.PRETABLE_COLUMNS),
+    '2021-03-01 12:00:00\tSafari\t14\t010203\t0.0000\t0.0000\tNULL',
+    '2021-03-01 00:00:00\tFirefox\tNULL\t10.0.0.1\tNULL\tNULL\twww.scielo.br/j/abcd/a/xyz/\\t?lang=pt\\nnext',
+    '2021-03-01 10:00:00\tChrome\t90.0\t10.0.0.2\t-23.5000\t-46.6000\twww.scielo.br/scielo.php?script=sci_arttext&pid=S0102-67202020000100001',
+    '2021-03-01 23:59:59\tTab\\tBrowser\t1\\\\2\t2001:db8::1\t48.8500\t2.3500\twww.scielo.br/search?q=a\\\\b\\0',
+]
+
+
+class ExtractPretableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_data = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_data)
+
+        self.db_engine = create_engine('sqlite:///' + os.path.join(self.dir_data, 'matomo.sqlite'))
+        with self.db_engine.begin() as connection:
+            connection.execute('CREATE TABLE matomo_log_visit (idvisit INTEGER PRIMARY KEY, config_browser_name TEXT, '
+                               'config_browser_version TEXT, location_ip BLOB, location_latitude TEXT, location_longitude TEXT)')
+            connection.execute('CREATE TABLE matomo_log_action (idaction INTEGER PRIMARY KEY, name TEXT)')
+            connection.execute('CREATE TABLE matomo_log_link_visit_action (idlink_va INTEGER PRIMARY KEY, idsite INTEGER, '
+                               'idvisit INTEGER, idaction_url INTEGER, server_time TEXT)')
+
+            connection.execute('INSERT INTO matomo_log_visit VALUES (?, ?, ?, ?, ?, ?)', VISITS)
+            connection.execute('INSERT INTO matomo_log_action VALUES (?, ?)', ACTIONS)
+            connection.execute('INSERT INTO matomo_log_link_visit_action VALUES (?, ?, ?, ?, ?)', VISIT_ACTIONS)
+
+    def extract(self, compression, batch_size=2):
+        pretable = extract_pretables.get_pretable_path(self.dir_data, DATE, compression)
+        lines_counter = extract_pretables.extract_pretable(self.db_engine, '1', DATE, pretable, batch_size)
+        return pretable, lines_counter
+
+    def read_lines(self, pretable):
+        with lib_pretable.open_pretable(pretable) as f:
+            return [line.rstrip('\n') for line in f]
+
+    def test_pretable_matches_mysql_batch_output(self):
+        for compression in ['none', 'gz']:
+            pretable, lines_counter = self.extract(compression)
+
+            self.assertEqual(lines_counter, len(EXPECTED_LINES) - 1)
+            self.assertEqual(self.read_lines(pretable), EXPECTED_LINES)
+            self.assertEqual(os.listdir(os.path.join(self.dir_data, 'tmp')), [])
+
+    def test_escaped_fields_are_read_as_single_columns(self):
+        pretable, _ = self.extract('none')
+
+        with lib_pretable.open_pretable(pretable) as f:
+            records = list(lib_pretable.iter_records(f))
+
+        self.assertEqual([r.ip for r in records], ['010203', '10.0.0.1', '10.0.0.2', '2001:db8::1'])
+        self.assertEqual(records[3].browserName, 'Tab\\tBrowser')
+        self.assertEqual(records[1].actionName, 'www.scielo.br/j/abcd/a/xyz/\\t?lang=pt\\nnext')
+
+    def test_failed_extraction_does_not_leave_pretable(self):
+        with self.db_engine.begin() as connection:
+            connection.execute('DROP TABLE matomo_log_action')
+
+        with self.assertRaises(Exception):
+            self.extract('gz')
+
+        self.assertEqual(sorted(os.listdir(self.dir_data)), ['matomo.sqlite', 'tmp'])
+        self.assertEqual(os.listdir(os.path.join(self.dir_data, 'tmp')), [])
+
+
+class RecordFromMatomoRowTests(unittest.TestCase):
+
+    def test_record_from_matomo_row(self):
+        row = (datetime.datetime(2021, 3, 1, 10, 0, 0), None, 'a\\b', memoryview(ipaddress.ip_address('::1').packed), None, 2.5, 'x\ty\nz\0')
+        record = lib_pretable.record_from_matomo_row(row)
+
+        self.assertEqual(record, ('2021-03-01 10:00:00', 'NULL', 'a\\\\b', '::1', 'NULL', '2.5', 'x\\ty\\nz\\0'))
+        self.assertEqual(lib_pretable.format_record(record).count('\t'), len(lib_pretable.PRETABLE_COLUMNS) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
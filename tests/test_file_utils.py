@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+from utils import file_utils
+
+
+class LinkFileTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.source_path = os.path.join(self.directory, 'pid-dates-scl-2021-03-01.data')
+        self.target_path = os.path.join(self.directory, 'pid-dates-scl-2021-03-02.data')
+
+        with open(self.source_path, 'wb') as fout:
+            fout.write(b'current')
+
+    def read(self, path):
+        with open(path, 'rb') as fin:
+            return fin.read()
+
+    def test_links_source(self):
+        file_utils.link_file(self.source_path, self.target_path)
+
+        self.assertTrue(os.path.samefile(self.source_path, self.target_path))
+        self.assertFalse(os.path.exists(self.target_path + '.tmp'))
+
+    def test_same_path_keeps_file(self):
+        file_utils.link_file(self.source_path, self.source_path)
+        self.assertEqual(self.read(self.source_path), b'current')
+
+        file_utils.link_file(self.source_path, self.target_path)
+        file_utils.link_file(self.source_path, self.target_path)
+        self.assertEqual(self.read(self.target_path), b'current')
+
+    def test_replaces_existing_target(self):
+        with open(self.target_path, 'wb') as fout:
+            fout.write(b'outdated')
+
+        file_utils.link_file(self.source_path, self.target_path)
+
+        self.assertTrue(os.path.samefile(self.source_path, self.target_path))
+
+    def test_copies_when_link_fails(self):
+        with mock.patch.object(os, 'link', side_effect=OSError):
+            file_utils.link_file(self.source_path, self.target_path)
+
+        self.assertFalse(os.path.samefile(self.source_path, self.target_path))
+        self.assertEqual(self.read(self.target_path), b'current')
+
+    def test_keeps_target_when_copy_fails(self):
+        with open(self.target_path, 'wb') as fout:
+            fout.write(b'outdated')
+
+        with mock.patch.object(os, 'link', side_effect=OSError), mock.patch.object(shutil, 'copyfile', side_effect=OSError):
+            with self.assertRaises(OSError):
+                file_utils.link_file(self.source_path, self.target_path)
+
+        self.assertEqual(self.read(self.target_path), b'outdated')
+
+
+AM_DOCUMENTS = [
+    {'collection': 'scl', 'code': 'S0102-67202020000100001', 'code_title': ['0102-6720'], 'default_language': 'pt'},
+    {'collection': '', 'code': 'S0102-67202020000100002', 'code_title': ['0102-6720'], 'default_language': 'en'},
+    {'collection': 'arg', 'code': 'S0325-00752019000200001', 'code_title': ['0325-0075'], 'default_language': 'es'},
+]
+
+OPAC_DOCUMENTS = {
+    'bRdGyqYc9JpyhjF4BwPZ4Qy': {'publication_date': '2020-05-01', 'create': '2020-05-02T10:00:00', 'default_language': 'pt'},
+    'ZMgL9SvFMgNxsmbdpLwWYkc': {'publication_date': '2021', 'create': '2021-01-02T10:00:00', 'default_language': 'en'},
+}
+
+PREPRINT_DOCUMENTS = {
+    '1034': {'publication_date': '2020-05-01', 'default_language': 'pt'},
+    '2087': {'publication_date': '2021-02-03', 'default_language': 'es'},
+}
+
+
+class DocumentReadersTests(unittest.TestCase):
+    """
+    Arquivos .json (páginas gravadas pelas versões anteriores dos coletores) e .jsonl (um registro por linha) com os
+    mesmos documentos são lidos da mesma forma
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_json(self, name, record):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as fout:
+            json.dump(record, fout)
+        return path
+
+    def write_jsonl(self, name, records):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as fout:
+            for record in records:
+                fout.write(json.dumps(record) + '\n')
+        return path
+
+    def assertSameDocuments(self, iter_documents, json_files, jsonl_files):
+        documents = list(iter_documents(json_files))
+
+        self.assertTrue(documents)
+        self.assertEqual(documents, list(iter_documents(jsonl_files)))
+
+    def test_articlemeta_readers(self):
+        json_files = [self.write_json('am-counter-dict-2021-03-01-0.json', {'objects': AM_DOCUMENTS[:2]}),
+                      self.write_json('am-counter-dict-2021-03-01-1.json', {'objects': AM_DOCUMENTS[2:]})]
+        jsonl_files = [self.write_jsonl('am-counter-dict-2021-03-01.jsonl', AM_DOCUMENTS)]
+
+        self.assertSameDocuments(file_utils.iter_articlemeta_documents, json_files, jsonl_files)
+
+        # Documentos sem coleção são ignorados
+        self.assertEqual([pid for collection, pid, doc in file_utils.iter_articlemeta_documents(jsonl_files)],
+                         ['S0102-67202020000100001', 'S0325-00752019000200001'])
+
+    def test_opac_readers(self):
+        pids = sorted(OPAC_DOCUMENTS)
+        json_files = [self.write_json(f'opac-counter-dict-2021-03-01-{i}.json', {'documents': {pid: OPAC_DOCUMENTS[pid]}})
+                      for i, pid in enumerate(pids)]
+        jsonl_files = [self.write_jsonl('opac-counter-dict-2021-03-01.jsonl', [{pid: OPAC_DOCUMENTS[pid]} for pid in pids])]
+
+        self.assertSameDocuments(file_utils.iter_opac_documents, json_files, jsonl_files)
+
+    def test_preprint_readers(self):
+        json_files = [self.write_json('pre-counter-dict-2021-03-01.json', PREPRINT_DOCUMENTS)]
+        jsonl_files = [self.write_jsonl('pre-counter-dict-2021-03-01.jsonl', [{pid: values} for pid, values in PREPRINT_DOCUMENTS.items()])]
+
+        self.assertSameDocuments(file_utils.iter_preprint_documents, json_files, jsonl_files)
+
+    def test_jsonl_blank_lines_are_ignored(self):
+        path = self.write_jsonl('pre-counter-dict-2021-03-01.jsonl', [{pid: values} for pid, values in PREPRINT_DOCUMENTS.items()])
+        with open(path, 'a') as fout:
+            fout.write('\n  \n')
+
+        self.assertEqual(len(list(file_utils.iter_preprint_documents([path]))), len(PREPRINT_DOCUMENTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from libs import lib_pretable
+from models.hit import ActionNameTable
+from tests import fixtures
+
+
+def create_record(action_name):
+    return lib_pretable.PretableRecord('2021-03-01 10:00:00', 'Chrome', '90', '10.0.0.1', '-23.5', '-46.6', action_name)
+
+
+class ActionNameTableTests(unittest.TestCase):
+
+    def test_hits_keep_only_action_id(self):
+        hit_manager = fixtures.create_hit_manager(action_cache_size=10)
+        hits = [hit_manager.create_hit(create_record(fixtures.ACTION_NAMES[0]), fixtures.COLLECTION, fixtures.DOMAIN)
+                for _ in range(2)]
+
+        self.assertIs(hits[0].action_table, hit_manager.action_table)
+        self.assertEqual(hits[0].action_id, hits[1].action_id)
+        self.assertIs(hits[0].action_name, hits[1].action_name)
+        self.assertEqual(hits[0].action_name, 'www.scielo.br/scielo.php?script=sci_arttext&pid=s0102-67202020000100001&lng=pt&tlng=pt')
+
+    def test_table_is_not_cleared_while_hits_use_it(self):
+        hit_manager = fixtures.create_hit_manager(action_table_size=2)
+        hits = [hit_manager.create_hit(create_record(a), fixtures.COLLECTION, fixtures.DOMAIN) for a in fixtures.ACTION_NAMES[:5]]
+        names = [h.action_name for h in hits]
+
+        # Tabela cheia: os hits seguintes guardam a própria URL
+        self.assertEqual(len(hit_manager.action_table), 2)
+        self.assertIsNone(hits[-1].action_table)
+
+        hit_manager.reset()
+        hit_manager.create_hit(create_record(fixtures.ACTION_NAMES[5]), fixtures.COLLECTION, fixtures.DOMAIN)
+
+        self.assertIsNot(hits[0].action_table, hit_manager.action_table)
+        self.assertEqual(names, [h.action_name for h in hits])
+
+    def test_get_lower_id(self):
+        table = ActionNameTable(fixtures.DOMAIN, 10)
+        upper_id = table.get_id('www.scielo.br/J/ABCD/')
+        lower_id = table.get_lower_id(upper_id)
+
+        self.assertEqual(table.names[upper_id], 'www.scielo.br/J/ABCD/')
+        self.assertEqual(table.names[lower_id], 'www.scielo.br/j/abcd/')
+        self.assertEqual(table.get_lower_id(lower_id), lower_id)
+        self.assertEqual(table.get_id('www.scielo.br/J/ABCD/'), upper_id)
+        self.assertEqual(len(table), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from libs import lib_columnar, lib_pretable
+from tests import fixtures
+
+
+class ColumnarPretableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_data = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_data)
+        self.columnar_path = os.path.join(self.dir_data, '2021-03-01')
+
+    def test_columnar_records_match_pretable_records(self):
+        records = fixtures.generate_records('2021-03-01', 600, seed=0)
+        records.append(lib_pretable.PretableRecord('2021-03-01 23:59:59', '', '', '10.0.9.9', 'NULL', 'NULL', 'www.scielo.br/j/abcd/a/ção/'))
+
+        self.assertEqual(lib_columnar.write_columnar_pretable(records, self.columnar_path), len(records))
+
+        # Blocos menores do que a pré-tabela, com valores repetidos entre blocos
+        columnar_records = list(lib_columnar.iter_columnar_records(self.columnar_path, chunk_size=64))
+
+        self.assertEqual(len(columnar_records), len(records))
+        for record, columnar_record in zip(records, columnar_records):
+            self.assertEqual(lib_pretable.parse_server_time(record.serverTime), columnar_record.serverTime)
+            self.assertEqual(record[1:], columnar_record[1:])
+
+    def test_empty_pretable(self):
+        self.assertEqual(lib_columnar.write_columnar_pretable([], self.columnar_path), 0)
+        self.assertEqual(list(lib_columnar.iter_columnar_records(self.columnar_path)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
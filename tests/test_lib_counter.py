@@ -0,0 +1,31 @@
+import random
+import unittest
+
+from datetime import datetime, timedelta
+
+from libs import lib_counter
+
+
+class SessionKeyTests(unittest.TestCase):
+
+    def test_session_key_formats_as_session_id(self):
+        rnd = random.Random(1)
+        dates = [datetime(2021, 1, 1, 0, 0, 0), datetime(2021, 12, 31, 23, 59, 59), datetime(2020, 2, 29, 12, 30, 0)]
+        dates += [datetime(2019, 1, 1) + timedelta(seconds=rnd.randint(0, 3 * 365 * 86400)) for _ in range(200)]
+
+        for date in dates:
+            args = ('10.0.0.%d' % rnd.randint(0, 255), rnd.choice(['chrome', 'firefox', '']), rnd.choice(['90', '']), date)
+            self.assertEqual(lib_counter.generate_session_id(*args), lib_counter.format_session_key(lib_counter.generate_session_key(*args)))
+
+    def test_session_keys_group_hits_as_session_ids(self):
+        base = datetime(2021, 3, 1, 10, 0, 0)
+        dates = [base, base + timedelta(minutes=59), base + timedelta(hours=1), base + timedelta(days=1)]
+
+        session_ids = [lib_counter.generate_session_id('10.0.0.1', 'chrome', '90', d) for d in dates]
+        session_keys = [lib_counter.generate_session_key('10.0.0.1', 'chrome', '90', d) for d in dates]
+
+        self.assertEqual([session_ids.index(s) for s in session_ids], [session_keys.index(k) for k in session_keys])
+
+
+if __name__ == '__main__':
+    unittest.main()
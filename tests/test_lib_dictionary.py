@@ -0,0 +1,80 @@
+import itertools
+import unittest
+
+from types import SimpleNamespace
+
+from libs import lib_dictionary, lib_hit, lib_pretable
+from models.hit import HitManager
+
+
+PID_FORMAT_LANG = {
+    'scl': {'S0102-67202020000100001': {'default': 'pt', 'html': ['pt', 'en'], 'pdf': ['pt']}},
+    'spa': {'rsp:2020.v54:12': {'default': 'pt', 'html': ['pt', 'en']}},
+}
+
+PID_DATES = {
+    'scl': {'S0102-67202020000100001': {'publication_year': '2020'}},
+    'spa': {'rsp:2020.v54:12': {'publication_year': '2020'}},
+}
+
+ISSN_ACRONYM = {'spa': {'0034-8910': 'rsp'}}
+
+
+def create_ssp_hit(pid_format_lang, pid_dates):
+    hit_manager = HitManager({}, ISSN_ACRONYM, pid_format_lang, pid_dates)
+    record = lib_pretable.PretableRecord('2021-03-01 10:00:00', 'Chrome', '90', '10.0.0.1', '1', '2',
+                                         'scielosp.org/article/rsp/2020.v54/12/')
+    return hit_manager.create_hit(record, 'ssp', 'scielosp.org')
+
+
+class CompactPidDictionariesTests(unittest.TestCase):
+
+    def test_compacts_collections(self):
+        pid_format_lang, pid_dates = lib_dictionary.compact_pid_dictionaries(PID_FORMAT_LANG, PID_DATES)
+
+        self.assertIsInstance(pid_format_lang['scl'], lib_dictionary.PidLookupTable)
+        self.assertIs(pid_format_lang['scl'], pid_dates['scl'])
+
+    def test_keeps_excluded_collections(self):
+        pid_format_lang, pid_dates = lib_dictionary.compact_pid_dictionaries(PID_FORMAT_LANG, PID_DATES)
+
+        self.assertIs(pid_format_lang['spa'], PID_FORMAT_LANG['spa'])
+        self.assertIs(pid_dates['spa'], PID_DATES['spa'])
+
+    def test_ssp_hit_with_compacted_dictionaries(self):
+        expected = create_ssp_hit(PID_FORMAT_LANG, PID_DATES)
+        hit = create_ssp_hit(*lib_dictionary.compact_pid_dictionaries(PID_FORMAT_LANG, PID_DATES))
+
+        self.assertEqual(hit.pid, 'rsp:2020.v54:12')
+        self.assertEqual(hit.issn, '0034-8910')
+        self.assertEqual(hit.lang, expected.lang)
+        self.assertEqual(hit.yop, expected.yop)
+
+
+class PidLookupTableTests(unittest.TestCase):
+
+    def test_lookups_match_dictionaries(self):
+        pid_format_lang = {'scl': {'S0102-67202020000100001': {'default': 'pt', 'html': ['pt', 'en'], 'pdf': ['pt']},
+                                   'S1234-56782019000300010': {'html': ['es']},
+                                   'S1234-56782019000300011': {'default': 'en', 'html': []}}}
+        pid_dates = {'scl': {'S0102-67202020000100001': {'publication_year': '2020'},
+                             'S1234-56782019000300011': {'publication_year': '0000'},
+                             'S9999-99992019000300012': {'publication_year': '2019'}}}
+        compact_format_lang, compact_dates = lib_dictionary.compact_pid_dictionaries(pid_format_lang, pid_dates)
+        self.assertIsInstance(compact_format_lang['scl'], lib_dictionary.PidLookupTable)
+
+        pids = list(pid_format_lang['scl']) + ['S9999-99992019000300012', 'S0000-00002019000300013']
+        for pid, fmt, lang in itertools.product(pids, ['html', 'pdf', 'xml'], ['pt', 'en', 'es', 'fr']):
+            hit = SimpleNamespace(collection='scl', pid=pid, format=fmt, lang=lang, action_name='')
+
+            for get_value, dictionary, compact in [(lib_hit.get_language, pid_format_lang, compact_format_lang),
+                                                   (lib_hit.get_language_new_url, pid_format_lang, compact_format_lang),
+                                                   (lib_hit.get_language_preprints, pid_format_lang, compact_format_lang),
+                                                   (lib_hit.get_year_of_publication, pid_dates, compact_dates),
+                                                   (lib_hit.get_year_of_publication_new_url, pid_dates, compact_dates),
+                                                   (lib_hit.get_year_of_publication_preprints, pid_dates, compact_dates)]:
+                self.assertEqual(get_value(hit, dictionary), get_value(hit, compact), (get_value.__name__, pid, fmt, lang))
+
+
+if __name__ == '__main__':
+    unittest.main()
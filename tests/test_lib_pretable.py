@@ -0,0 +1,115 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from libs import lib_pretable
+from tests import fixtures
+
+
+class OpenPretableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_data = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_data)
+
+    def write_copies(self, data):
+        """
+        Salva os mesmos bytes em pré-tabelas não comprimida, .gz e .zst
+        """
+        path = os.path.join(self.dir_data, '2021-03-01.tsv')
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        with gzip.open(path + '.gz', 'wb') as f:
+            f.write(data)
+
+        paths = [path, path + '.gz']
+
+        if lib_pretable.zstandard is not None:
+            with open(path + '.zst', 'wb') as f:
+                f.write(lib_pretable.zstandard.ZstdCompressor().compress(data))
+            paths.append(path + '.zst')
+
+        return paths
+
+    def read(self, path, block_size=None):
+        if block_size is None:
+            data = lib_pretable.open_pretable(path)
+        else:
+            data = lib_pretable.DecompressedLines(path, block_size=block_size)
+
+        with data as f:
+            lines = list(f)
+
+        return lines, list(lib_pretable.iter_records(lines))
+
+    def write_fixture_copies(self):
+        """
+        Salva, em pré-tabelas não comprimida, .gz e .zst, registros com quebras de linha \r\n e \r, bytes inválidos e
+        última linha terminada em \r
+        """
+        with open(os.path.join(self.dir_data, 'base.tsv'), 'w') as f:
+            f.write('\t'.join(lib_pretable.PRETABLE_COLUMNS) + '\n')
+            f.writelines(lib_pretable.format_record(r) for r in fixtures.generate_records('2021-03-01', 200, seed=0))
+
+        with open(os.path.join(self.dir_data, 'base.tsv'), 'rb') as f:
+            lines = f.read().split(b'\n')
+
+        for i in range(2, len(lines) - 1, 7):
+            lines[i] += b'\r'
+        for i in range(3, len(lines) - 1, 11):
+            lines[i] = lines[i].replace(b'scielo', b'sci\xff\xc3elo', 1)
+        data = b'\n'.join(lines[:100]) + b'\r' + b'\n'.join(lines[100:]).rstrip(b'\n') + b'\r'
+
+        return self.write_copies(data)
+
+    def test_compressed_pretables_match_plain_pretable(self):
+        plain, *compressed = self.write_fixture_copies()
+        expected_lines, expected_records = self.read(plain)
+        self.assertEqual(len(expected_records), 200)
+
+        for path in compressed:
+            # Blocos pequenos, para que quebras \r\n e caracteres multibyte fiquem divididos entre blocos
+            for block_size in [None, 7]:
+                lines, records = self.read(path, block_size)
+                self.assertEqual(expected_lines, lines, path)
+                self.assertEqual(expected_records, records, path)
+
+    def test_decompressed_pretables_match_compressed_pretables(self):
+        plain, *compressed = self.write_fixture_copies()
+        expected_lines, expected_records = self.read(plain)
+
+        for path in compressed:
+            decompressed = os.path.join(self.dir_data, 'decompressed.tsv')
+            lib_pretable.decompress_pretable(path, decompressed)
+
+            self.assertEqual((expected_lines, expected_records), self.read(decompressed), path)
+            self.assertEqual(expected_lines, [line for offset, line in lib_pretable.iter_lines_with_offsets(decompressed)], path)
+
+
+class IterIpsTests(unittest.TestCase):
+
+    def test_ips_match_records(self):
+        header = list(lib_pretable.PRETABLE_COLUMNS)
+        lines = [lib_pretable.format_record(r) for r in fixtures.generate_records('2021-03-01', 200, seed=0)]
+
+        # Linhas vazias e linhas com menos campos do que o cabeçalho
+        lines[10:10] = ['\n', '\r\n']
+        lines[20] = '\t'.join(lines[20].split('\t')[:3]) + '\n'
+        lines[30] = '\t'.join(lines[30].split('\t')[:4]) + '\r\n'
+
+        expected = [r.ip for r in lib_pretable.iter_records(lines, header=header)]
+        self.assertEqual(expected, list(lib_pretable.iter_ips(lines, header)))
+        self.assertEqual(expected[18], '')
+
+    def test_ips_without_ip_column(self):
+        header = ['serverTime', 'actionName']
+        lines = ['2021-03-01 10:00:00\twww.scielo.br\n', '\n', '2021-03-01 10:00:01\twww.scielo.br\n']
+
+        self.assertEqual([r.ip for r in lib_pretable.iter_records(lines, header=header)], list(lib_pretable.iter_ips(lines, header)))
+
+
+if __name__ == '__main__':
+    unittest.main()
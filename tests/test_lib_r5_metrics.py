@@ -0,0 +1,63 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from libs import lib_r5_metrics
+
+
+ROWS = [
+    ('S0102-67202020000100001', 'html', 'pt', '-23.5', '-46.6', '2020', '0102-6720', '2021-03-01', 3, 2, 1, 1),
+    ('S0102-67202020000100001', 'pdf', 'pt', '-23.5', '-46.6', '2020', '0102-6720', '2021-03-01', 0, 5, 0, 4),
+    ('1234567', 'html', 'en', '', '', '', '', '2021-03-02', 1, 0, 1, 0),
+    ('S1234-56782019000300010', 'html', 'es', '48.85', '2.35', '2019', '1234-5678', '2021-03-02', 4294967295, 0, 7, 0),
+    ('S1234-56782019000300010', 'html', 'português', 'ção', '2.35', '2019', '1234-5678', '2021-03-03', 1, 1, 1, 1),
+]
+
+
+class R5MetricsFormatTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_data = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir_data)
+
+    def write(self, metrics_format, blocks):
+        path = os.path.join(self.dir_data, 'r5-metrics-2021-03-01' + lib_r5_metrics.FORMAT_TO_EXTENSION[metrics_format])
+
+        with open(path, 'wb' if metrics_format == 'binary' else 'w') as f:
+            writer = lib_r5_metrics.FORMAT_TO_WRITER[metrics_format](f)
+            for rows in blocks:
+                writer.writerows(rows)
+
+        return path
+
+    def test_binary_rows_match_text_rows(self):
+        # Um bloco por descarga, incluindo bloco vazio
+        blocks = [ROWS[:2], [], ROWS[2:]]
+
+        text_rows = list(lib_r5_metrics.iter_rows(self.write('csv', blocks)))
+        binary_rows = list(lib_r5_metrics.iter_rows(self.write('binary', blocks)))
+
+        self.assertEqual(binary_rows, ROWS)
+        self.assertEqual([[str(v) for v in r] for r in binary_rows], text_rows)
+
+    def test_concatenated_binary_files(self):
+        data = io.BytesIO()
+        for rows in [ROWS[:3], ROWS[3:]]:
+            lib_r5_metrics.R5MetricsBinaryWriter(data).writerows(rows)
+
+        data.seek(0)
+        self.assertEqual(list(lib_r5_metrics.iter_binary_rows(data)), ROWS)
+
+    def test_incomplete_binary_file(self):
+        data = io.BytesIO()
+        lib_r5_metrics.R5MetricsBinaryWriter(data).writerows(ROWS)
+
+        for size in [3, 20, len(data.getvalue()) - 1]:
+            with self.assertRaises(ValueError):
+                list(lib_r5_metrics.iter_binary_rows(io.BytesIO(data.getvalue()[:size])))
+
+
+if __name__ == '__main__':
+    unittest.main()
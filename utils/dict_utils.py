@@ -179,6 +179,17 @@ def update_dicts_with_am_counter_dict(current_dicts, data):
             _update_dicts_with_am_counter_dict_doc(current_dicts, collection, pid, data[collection][pid])
 
 
+def update_dicts_with_am_counter_dict_documents(current_dicts, documents):
+    """
+    Atualiza os dicionários com documentos de Articlemeta, um por vez, à medida que são lidos
+
+    @param current_dicts: dicionários
+    @param documents: iterável de tuplas (coleção, pid, dados do documento)
+    """
+    for collection, pid, data in documents:
+        _update_dicts_with_am_counter_dict_doc(current_dicts, collection, pid, data)
+
+
 def _put_date(date_str, date_name, data, collection, pid):
     old_date_value = data.get(collection, {}).get(pid, {}).get(date_name)
 
@@ -188,7 +199,7 @@ def _put_date(date_str, date_name, data, collection, pid):
         if date_name != 'updated_at' and old_date_value and old_date_value != new_date_value:
             logging.warning(f'{date_name} de {collection}-{pid} mudou de {old_date_value} para {new_date_value}')
 
-        data.update({date_name: new_date_value})
+        data[collection][pid].update({date_name: new_date_value})
     except ValueError:
         ...
 
@@ -220,35 +231,61 @@ def _standardize_langcode(language):
         return langcodes.standardize_tag(inferred_lang)
 
 
+def _add_info_to_dates_dict_doc(dates_dict, collection, pid, values):
+    if collection not in dates_dict:
+        dates_dict[collection] = {}
+
+    if pid not in dates_dict[collection]:
+        dates_dict[collection][pid] = {}
+
+    new_publication_date = values.get('publication_date')
+
+    if new_publication_date:
+        old_publication_date = dates_dict[collection][pid].get('publication_date')
+        if old_publication_date and old_publication_date != new_publication_date:
+            logging.warning(f'publication_date de {collection}-{pid} mudou de {old_publication_date} para {new_publication_date}')
+
+        dates_dict[collection][pid]['publication_date'] = new_publication_date
+        new_year = _extract_year(new_publication_date)
+
+        if new_year:
+            old_year = dates_dict[collection][pid].get('publication_year')
+            if old_year and old_year != new_year:
+                logging.warning(f'publication_year de {collection}-{pid} mudou de {old_year} para {new_year}')
+
+            dates_dict[collection][pid].update({'publication_year': new_year})
+
+    if collection != 'pre':
+        _put_date(values.get('create'), 'created_at', dates_dict, collection, pid)
+        _put_date(values.get('update'), 'updated_at', dates_dict, collection, pid)
+
+
 def add_info_to_dates_dict(data, dates_dict):
     for collection, pids in data.items():
         if collection not in dates_dict:
             dates_dict[collection] = {}
 
         for pid, values in data[collection].items():
-            if pid not in dates_dict[collection]:
-                dates_dict[collection][pid] = {}
+            _add_info_to_dates_dict_doc(dates_dict, collection, pid, values)
+
 
-            new_publication_date = values.get('publication_date')
+def _add_info_to_pid_format_lang_doc(pid_format_lang_dict, collection, pid, values):
+    if collection not in pid_format_lang_dict:
+        pid_format_lang_dict[collection] = {}
 
-            if new_publication_date:
-                old_publication_date = dates_dict[collection][pid].get('publication_date')
-                if old_publication_date and old_publication_date != new_publication_date:
-                    logging.warning(f'publication_date de {collection}-{pid} mudou de {old_publication_date} para {new_publication_date}')
+    if pid not in pid_format_lang_dict[collection]:
+        pid_format_lang_dict[collection][pid] = {}
 
-                dates_dict[collection][pid]['publication_date'] = new_publication_date
-                new_year = _extract_year(new_publication_date)
+    default_lang = values.get('default_language', '').lower()
 
-                if new_year:
-                    old_year = dates_dict[collection][pid].get('publication_year')
-                    if old_year and old_year != new_year:
-                        logging.warning(f'publication_year de {collection}-{pid} mudou de {old_year} para {new_year}')
+    if default_lang:
+        default_lang_std = _standardize_langcode(default_lang)
 
-                    dates_dict[collection][pid].update({'publication_year': new_year})
+        old_default_lang = pid_format_lang_dict[collection][pid].get('default')
+        if old_default_lang and old_default_lang != default_lang_std:
+            logging.warning(f'default de {collection}-{pid} mudou de {old_default_lang} para {default_lang_std}')
 
-            if collection != 'pre':
-                _put_date(values.get('create'), 'created_at', dates_dict, collection, pid)
-                _put_date(values.get('update'), 'updated_at', dates_dict, collection, pid)
+        pid_format_lang_dict[collection][pid].update({'default': default_lang_std})
 
 
 def add_info_to_pid_format_lang(data, pid_format_lang_dict):
@@ -257,16 +294,16 @@ def add_info_to_pid_format_lang(data, pid_format_lang_dict):
             pid_format_lang_dict[collection] = {}
 
         for pid, values in pids.items():
-            if pid not in pid_format_lang_dict[collection]:
-                pid_format_lang_dict[collection][pid] = {}
-
-            default_lang = values.get('default_language', '').lower()
+            _add_info_to_pid_format_lang_doc(pid_format_lang_dict, collection, pid, values)
 
-            if default_lang:
-                default_lang_std = _standardize_langcode(default_lang)
 
-                old_default_lang = pid_format_lang_dict[collection][pid].get('default')
-                if old_default_lang and old_default_lang != default_lang_std:
-                    logging.warning(f'default de {collection}-{pid} mudou de {old_default_lang} para {default_lang_std}')
+def add_info_from_documents(current_dicts, documents):
+    """
+    Atualiza pid-dates e pid-format-lang com documentos de OPAC ou de Preprints, um por vez, à medida que são lidos
 
-                pid_format_lang_dict[collection][pid].update({'default': default_lang_std})
+    @param current_dicts: dicionários
+    @param documents: iterável de tuplas (coleção, pid, dados do documento)
+    """
+    for collection, pid, values in documents:
+        _add_info_to_dates_dict_doc(current_dicts['pid-dates'], collection, pid, values)
+        _add_info_to_pid_format_lang_doc(current_dicts['pid-format-lang'], collection, pid, values)
@@ -193,6 +193,18 @@ def clean_issn_acronym(data):
         del data[collection][issn]
 
 
+def clean_pid_dates(data):
+    items_to_remove = set()
+
+    for collection in data:
+        if not isinstance(data[collection], dict):
+            items_to_remove.add(collection)
+
+    for collection in items_to_remove:
+        logging.warning(f'Removendo registro ({collection}) de pid-dates')
+        del data[collection]
+
+
 def _standardize_langcode(language):
     if langcodes.tag_is_valid(language):
         return langcodes.standardize_tag(language)
@@ -256,3 +268,4 @@ def clean(data):
     clean_pid_issn(data['pid-issn'])
     clean_issn_acronym(data['issn-acronym'])
     clean_pid_format_lang(data['pid-format-lang'])
+    clean_pid_dates(data['pid-dates'])
@@ -45,6 +45,13 @@ collection_to_domain = {
     'wid': ['westindies.scielo.org']
 }
 
+# Mapeia acrônimo de coleção às demais coleções cujos dicionários são consultados no cálculo de suas métricas
+# (acrônimos de nbr são obtidos em scl e dados de ssp são obtidos em spa)
+collection_to_dictionary_collections = {
+    'nbr': ['scl'],
+    'ssp': ['spa'],
+}
+
 # Mapeia acrônimo do idioma ao respectivo código numérico usado na base de dados
 language_to_code = {
     'pt': 1,
@@ -97,20 +104,20 @@ group_to_hit_type = {
     'platform': ma.HIT_TYPE_PLATFORM
 }
 
-# mapeia nome do tipo de Hit a respectiva lista de métricas investigation
+# mapeia nome do tipo de Hit ao respectivo conjunto de conteúdos válidos para métricas investigation
 group_to_item_investigations = {
-    'article': mm.COUNTER_ARTICLE_ITEM_INVESTIGATIONS,
-    'issue': mm.COUNTER_ISSUE_ITEM_INVESTIGATIONS,
-    'journal': mm.COUNTER_JOURNAL_ITEM_INVESTIGATIONS,
-    'platform': mm.COUNTER_PLATFORM_ITEM_INVESTIGATIONS
+    'article': frozenset(mm.COUNTER_ARTICLE_ITEM_INVESTIGATIONS),
+    'issue': frozenset(mm.COUNTER_ISSUE_ITEM_INVESTIGATIONS),
+    'journal': frozenset(mm.COUNTER_JOURNAL_ITEM_INVESTIGATIONS),
+    'platform': frozenset(mm.COUNTER_PLATFORM_ITEM_INVESTIGATIONS)
 }
 
-# mapeia nome do tipo de Hit a respectiva lista de métricas request
+# mapeia nome do tipo de Hit ao respectivo conjunto de conteúdos válidos para métricas request
 group_to_item_requests = {
-    'article': mm.COUNTER_ARTICLE_ITEM_REQUESTS,
-    'issue': mm.COUNTER_ISSUE_ITEM_REQUESTS,
-    'journal': mm.COUNTER_JOURNAL_ITEM_REQUESTS,
-    'platform': mm.COUNTER_PLATFORM_ITEM_REQUESTS
+    'article': frozenset(mm.COUNTER_ARTICLE_ITEM_REQUESTS),
+    'issue': frozenset(mm.COUNTER_ISSUE_ITEM_REQUESTS),
+    'journal': frozenset(mm.COUNTER_JOURNAL_ITEM_REQUESTS),
+    'platform': frozenset(mm.COUNTER_PLATFORM_ITEM_REQUESTS)
 }
 
 # métricas COUNTER
@@ -1,7 +1,10 @@
+import glob
 import json
+import logging
 import os
 import pickle
 import re
+import shutil
 
 
 def generate_file_path(directory, name, version, extension):
@@ -9,7 +12,28 @@ def generate_file_path(directory, name, version, extension):
     return os.path.join(directory, filename)
     
 
-def load_dictionaries(directory, version):
+def discover_collection_partitions(directory, name, version):
+    """
+    Obtém as partições por coleção (em pickle) de um dicionário
+
+    @param directory: diretório de dicionários
+    @param name: nome do dicionário (por exemplo, pid-dates)
+    @param version: versão dos dicionários (YYYY-MM-DD)
+    @return: dicionário de acrônimo de coleção para caminho da partição
+    """
+    prefix = name + '-'
+    suffix = f'-{version}.data'
+
+    partitions = {}
+    for path in glob.glob(generate_file_path(directory, name + '-*', version, '.data')):
+        collection = os.path.basename(path)[len(prefix):-len(suffix)]
+        if collection and '-' not in collection:
+            partitions[collection] = path
+
+    return partitions
+
+
+def load_dictionaries(directory, version, collections=None):
     dictionaries = {
         'pid-dates': {},
         'issn-acronym': {},
@@ -18,71 +42,169 @@ def load_dictionaries(directory, version):
         'pid-issn': {}
     }
 
-    dicts_names = os.listdir(directory)
+    # Dicionários completos em pickle (.data) ou, na ausência deles ou quando há coleções informadas, partições por
+    # coleção; bases de chaves (.db) são ignoradas
+    for name in dictionaries.keys():
+        d_path = generate_file_path(directory, name, version, '.data')
+        partitions = discover_collection_partitions(directory, name, version)
 
-    for d in dicts_names:
-        for name in dictionaries.keys():
-            if name in d and version in d:
-                dictionaries[name] = pickle.load(open(os.path.join(directory, d), 'rb'))
+        if (collections is None and os.path.exists(d_path)) or not partitions:
+            if os.path.exists(d_path):
+                dictionaries[name] = pickle.load(open(d_path, 'rb'))
+
+            if collections is not None:
+                dictionaries[name] = {c: v for c, v in dictionaries[name].items() if c in collections}
+
+            continue
+
+        for collection, path in sorted(partitions.items()):
+            if collections is None or collection in collections:
+                dictionaries[name].update(pickle.load(open(path, 'rb')))
 
     return dictionaries
 
 
+def describe_files(files):
+    """
+    Obtém tamanho e data de modificação de arquivos, usados para identificar arquivos novos ou alterados
+
+    @param files: lista de caminhos de arquivos
+    @return: dicionário de nome de arquivo para tamanho e data de modificação
+    """
+    descriptions = {}
+
+    for f in files:
+        f_stat = os.stat(f)
+        descriptions[os.path.basename(f)] = {'size': f_stat.st_size, 'mtime': f_stat.st_mtime}
+
+    return descriptions
+
+
+def load_manifest(directory, version):
+    m_path = generate_file_path(directory, 'manifest', version, '.json')
+    if os.path.exists(m_path):
+        with open(m_path) as fin:
+            return json.load(fin)
+
+
+def save_manifest(manifest, directory, version):
+    m_path = generate_file_path(directory, 'manifest', version, '.json')
+    tmp_path = m_path + '.tmp'
+
+    with open(tmp_path, 'w') as fout:
+        json.dump(manifest, fout, indent=2, sort_keys=True)
+
+    os.replace(tmp_path, m_path)
+
+    return m_path
+
+
 def discover_files(directory, prefix):
     files = []
 
-    for jf in [f for f in os.listdir(directory) if f.endswith('.json')]:
+    for jf in [f for f in os.listdir(directory) if f.endswith(('.json', '.jsonl'))]:
         if re.match(prefix, jf):
             files.append(os.path.join(directory, jf))
 
     return files
 
 
-def load_data_from_opac_files(files):
-    opac_data = {'nbr': {}}
+def iter_json_records(file):
+    """
+    Lê registros de um arquivo JSON. Arquivos .jsonl (um registro por linha, gravados pelos coletores) são lidos linha a
+    linha; arquivos .json são lidos por completo, como um único registro
 
-    for f in sorted(files):
-        with open(f) as fin:
-            fj = json.load(fin)
+    @param file: caminho do arquivo
+    @return: gerador de registros
+    """
+    with open(file) as fin:
+        if file.endswith('.jsonl'):
+            for line in fin:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield json.load(fin)
 
-            for pid, values in fj.get('documents', {}).items():
-                opac_data['nbr'][pid] = values
 
-    return opac_data
+def iter_opac_documents(files):
+    """
+    Lê documentos de arquivos de OPAC (registros {pid: dados} em .jsonl ou páginas com chave documents em .json)
 
+    @param files: lista de caminhos de arquivos
+    @return: gerador de tuplas (coleção, pid, dados do documento)
+    """
+    for f in sorted(files):
+        for record in iter_json_records(f):
+            documents = record if f.endswith('.jsonl') else record.get('documents', {})
 
-def load_data_from_preprint_files(files):
-    preprint_data = {'pre': {}}
+            for pid, values in documents.items():
+                yield 'nbr', pid, values
 
-    for file in sorted(files):
-        with open(file) as fin:
-            preprint_metadata = json.load(fin)
 
-            for pid, values in preprint_metadata.items():
-                preprint_data['pre'][pid] = values
+def iter_preprint_documents(files):
+    """
+    Lê documentos de arquivos de Preprints (registros {pid: dados} em .jsonl ou um único dicionário em .json)
 
-    return preprint_data
+    @param files: lista de caminhos de arquivos
+    @return: gerador de tuplas (coleção, pid, dados do documento)
+    """
+    for f in sorted(files):
+        for record in iter_json_records(f):
+            for pid, values in record.items():
+                yield 'pre', pid, values
 
 
-def load_data_from_articlemeta_files(articlemeta_files):
-    am_data = {}
+def iter_articlemeta_documents(files):
+    """
+    Lê documentos de arquivos de Articlemeta (um documento por linha em .jsonl ou páginas com chave objects em .json)
 
-    for file in sorted(articlemeta_files):
-        with open(file) as fin:
-            am_metadata = json.load(fin)
+    @param files: lista de caminhos de arquivos
+    @return: gerador de tuplas (coleção, pid, dados do documento)
+    """
+    for f in sorted(files):
+        for record in iter_json_records(f):
+            documents = [record] if f.endswith('.jsonl') else record.get('objects')
 
-            for doc in am_metadata.get('objects'):
+            for doc in documents:
                 collection = doc['collection']
-                pid = doc['code']
-
-                if collection and collection not in am_data:
-                    am_data[collection] = {}
-
-                am_data[collection][pid] = doc
+                if not collection:
+                    logging.warning(f'Documento {doc.get("code")} de {f} não tem coleção')
+                    continue
 
-    return am_data
+                yield collection, doc['code'], doc
 
 
 def save(data, filepath):
-    with open(filepath, 'wb') as fout:
+    # Gravação em arquivo temporário seguida de substituição, para não alterar arquivos compartilhados entre versões
+    # (ver link_file)
+    tmp_filepath = filepath + '.tmp'
+
+    with open(tmp_filepath, 'wb') as fout:
         pickle.dump(data, fout)
+
+    os.replace(tmp_filepath, filepath)
+
+
+def link_file(source_path, target_path):
+    """
+    Disponibiliza um arquivo com outro nome, por link físico ou, se não for possível, por cópia
+
+    @param source_path: caminho do arquivo existente
+    @param target_path: novo caminho
+    """
+    # O arquivo já está disponível com o novo nome (por exemplo, versões de mesma data)
+    if os.path.exists(target_path) and os.path.samefile(source_path, target_path):
+        return
+
+    # Link ou cópia em arquivo temporário seguido de substituição, para não remover o arquivo de destino antes que o
+    # novo esteja gravado
+    tmp_path = target_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        os.link(source_path, tmp_path)
+    except OSError:
+        shutil.copyfile(source_path, tmp_path)
+
+    os.replace(tmp_path, target_path)